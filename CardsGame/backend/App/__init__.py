@@ -1,11 +1,139 @@
-from flask import Flask
+import time
+import traceback
+from flask import Flask, Response, g, request
 from flask_cors import CORS
 from App.controllers import game_controllers
+from App.controllers.game_events import publish_deleted
+from App.database import db, server
+from App.database.archiver import archiver
+from App.util.broker import broker
+from App.util.metrics import format_server_timing, metrics, request_phases
+from config import STORAGE_BACKEND
 
 
 def create_app():
     app = Flask(__name__)
     CORS(app)
     app.register_blueprint(game_controllers)
+    register_request_metrics(app)
+    register_archiver(app)
+    try:
+        # Opens the connection pool (or the storage file) before the first request arrives
+        db.warm_up()
+        server.ensure_indexes()
+    except Exception:
+        traceback.print_exc()
     return app
 
+
+def init_worker() -> None:
+    """
+    Prepares a worker forked from a process that already created the app (e.g. gunicorn with preload_app): the storage
+    connections and the broker state inherited from the parent are dropped and the worker opens its own connections
+    before its first request
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    db.get_storage().reset()
+    broker.reset()
+    try:
+        db.warm_up()
+    except Exception:
+        traceback.print_exc()
+
+
+def register_archiver(app: Flask) -> None:
+    """
+    Starts the archiver of the game collection with the first request served by the process, so the abandoned games it
+    deletes are pushed to the lobby as deleted
+
+    Args:
+        app (Flask): Flask application
+
+    Returns:
+        None
+    """
+    archiver.on_expired = publish_deleted
+
+    @app.before_request
+    def start_archiver():
+        archiver.start()
+
+
+def register_request_metrics(app: Flask) -> None:
+    """
+    Times every request of the app: the latency goes to the histogram of its route (see /metrics) and the phases timed
+    while serving it (database read, play_turn, database write...) go to its Server-Timing header
+
+    Args:
+        app (Flask): Flask application
+
+    Returns:
+        None
+    """
+
+    @app.before_request
+    def start_request_timer():
+        g.request_start = time.perf_counter()
+        request_phases.set(dict())
+
+    @app.after_request
+    def observe_request(response: Response) -> Response:
+        elapsed = time.perf_counter() - g.request_start
+        # The route rule (e.g. /game/<string:id_game>/hand) keeps one series per endpoint, not per game
+        route = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        metrics.observe_request(request.method, route, response.status_code, elapsed)
+        phases = {**(request_phases.get() or dict()), 'total': elapsed}
+        response.headers['Server-Timing'] = format_server_timing(phases)
+        return response
+
+    @app.teardown_request
+    def clear_request_phases(error: BaseException = None):
+        request_phases.set(None)
+
+
+def create_async_app():
+    """
+    Creates the asyncio (ASGI) variant of the API: the same routes served by Quart with the motor driver. Quart,
+    quart-cors and motor are only needed by this app
+
+    Args:
+        None
+
+    Raises:
+        Exception: If the storage backend is not mongo, the embedded storages have no asyncio driver
+
+    Returns:
+        Quart: ASGI application
+    """
+    if STORAGE_BACKEND != 'mongo':
+        raise Exception(f'The async app needs the mongo storage, STORAGE_BACKEND is "{STORAGE_BACKEND}"')
+    from quart import Quart
+    from quart_cors import cors
+    from App.controllers.async_game_controller import async_game_controllers
+    from App.database import async_server
+    from App.database.async_db import AsyncMongoManager
+
+    app = cors(Quart(__name__))
+    app.register_blueprint(async_game_controllers)
+
+    @app.before_serving
+    async def warm_up():
+        try:
+            await AsyncMongoManager.ping()
+            await async_server.ensure_indexes()
+        except Exception:
+            traceback.print_exc()
+        # The sweeps use the synchronous storage, from their own thread
+        archiver.on_expired = publish_deleted
+        archiver.start()
+
+    @app.after_serving
+    async def close_client():
+        AsyncMongoManager.close()
+
+    return app
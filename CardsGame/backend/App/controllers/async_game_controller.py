@@ -0,0 +1,232 @@
+import traceback
+from quart import Blueprint, Response, abort, jsonify, make_response, request
+from App.models import InteractiveGame
+from App.util.broker import LOBBY_TOPIC, broker, game_topic
+from App.database import async_server
+from App.database.archiver import archiver
+from App.database.server import ConcurrentUpdateError, get_game_cache_stats, get_response_cache_stats, release_game
+from App.database.server import HISTORY_FIELD, response_cache
+from App.database.storage import DocumentNotFoundError
+from .game_responses import GAME_FIELDS, HAND_ETAG_SUFFIX, HAND_FIELDS, PLAY_FIELDS, build_game_etag
+from .game_responses import build_game_response, build_hand_etag, build_hand_response, build_list_etag
+from .game_responses import build_list_read_fields, build_new_game, build_new_game_documents, parse_card_indexes
+from .game_responses import parse_list_args, parse_list_representation, parse_representation, play_turn_response
+from .game_responses import take_list_versions
+from .game_events import SSE_HEADERS, aiter_sse, publish_created, publish_created_game, publish_deleted, publish_hand
+from .game_events import publish_turn
+from .wire_formats import DEFAULT_REPRESENTATION, NotAcceptableError, Representation, build_representation_suffix
+from .wire_formats import encode_body
+
+# Same routes as game_controllers, served by Quart with the motor driver
+async_game_controllers = Blueprint('async_game', __name__, url_prefix='')
+
+
+async def get_game_by_id(id_game: str, current_version: int = None) -> InteractiveGame:
+    try:
+        game = await async_server.get_game(id_game, current_version)
+        return game
+    except Exception:
+        traceback.print_exc()
+        abort(404)
+
+
+def not_modified(etag: str, weak: bool = False) -> Response:
+    response = Response('', status=304)
+    response.set_etag(etag, weak)
+    return response
+
+
+def representation_response(body: bytes, representation: Representation, etag: str = None,
+                            weak: bool = False) -> Response:
+    response = Response(body, mimetype=representation.wire_format.mimetype)
+    if etag is not None:
+        response.set_etag(etag, weak)
+    # The format depends on the Accept header, caches must not serve it to other clients
+    response.vary.add('Accept')
+    return response
+
+
+@async_game_controllers.route('/health', methods=['GET'])
+async def health():
+    body = {'status': 'pass', 'gameCache': get_game_cache_stats(), 'responseCache': get_response_cache_stats(),
+            'broker': broker.get_stats(), 'archiver': archiver.get_stats()}
+    return await make_response(jsonify(body), 200)
+
+
+@async_game_controllers.route('/', methods=['GET'])
+async def index():
+    return "Interactive Game is running!"
+
+
+@async_game_controllers.errorhandler(404)
+async def not_found(error):
+    return await make_response(jsonify({'error': 'Not found'}), 404)
+
+
+@async_game_controllers.route('/game', methods=['GET'])
+async def get_games():
+    try:
+        args = parse_list_args(request.args)
+        representation = parse_list_representation(request.accept_mimetypes)
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+
+    suffix = build_representation_suffix(representation)
+    versions = None
+    if request.if_none_match:
+        # The versions are enough to answer 304, without reading the documents
+        versions = await async_server.get_games_versions(args.finished, args.limit, args.after)
+        etag = build_list_etag(args, versions, suffix)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag, weak=True)
+    if args.only_id:
+        if versions is None:
+            versions = await async_server.get_games_versions(args.finished, args.limit, args.after)
+        games = [id_game for id_game, _ in versions]
+    else:
+        # A single read gives the documents and their versions, the page is read before the ETag header is sent
+        raw_games = async_server.get_games(args.finished, False, build_list_read_fields(args), args.limit, args.after)
+        games = [raw_game async for raw_game in raw_games]
+        versions = take_list_versions(args, games)
+    body = encode_body(games, representation)
+    return representation_response(body, representation, build_list_etag(args, versions, suffix), weak=True), 200
+
+
+@async_game_controllers.route('/game/<string:id_game>', methods=['GET'])
+async def get_game(id_game: str):
+    try:
+        representation = parse_representation(request.accept_mimetypes, request.args, GAME_FIELDS)
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    version = await async_server.get_game_version(id_game)
+    if version is None:
+        abort(404)
+    suffix = build_representation_suffix(representation)
+    etag = build_game_etag(id_game, version, suffix)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    # Only the default representation is cached, one body by game
+    cached = representation == DEFAULT_REPRESENTATION
+    body = response_cache.get(id_game, version) if cached else None
+    if body is None:
+        game = await get_game_by_id(id_game, version)
+        try:
+            if representation.fields is None or HISTORY_FIELD in representation.fields:
+                await async_server.load_game_history(game)
+        except Exception:
+            release_game(game)
+            raise
+        body = encode_body(build_game_response(game, representation), representation)
+        release_game(game)
+        if cached:
+            response_cache.put(id_game, game.get_version(), body)
+        etag = build_game_etag(id_game, game.get_version(), suffix)
+    return representation_response(body, representation, etag)
+
+
+@async_game_controllers.route('/game', methods=['POST'])
+async def create_game():
+    try:
+        game = build_new_game(await request.get_json())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    response = {
+        '_id': game.get_id()
+    }
+    await async_server.add_game(game)
+    publish_created_game(game)
+    return jsonify(response), 201
+
+
+@async_game_controllers.route('/game/batch', methods=['POST'])
+async def create_games():
+    try:
+        documents = build_new_game_documents(await request.get_json())
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    ids = await async_server.add_game_documents(documents)
+    publish_created(documents)
+    return jsonify({'_ids': ids}), 201
+
+
+@async_game_controllers.route('/game/<string:id_game>/hand', methods=['GET'])
+async def take_player_hand(id_game: str):
+    try:
+        representation = parse_representation(request.accept_mimetypes, request.args, HAND_FIELDS)
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    suffix = build_representation_suffix(representation)
+    if request.if_none_match:
+        # Unchanged since the hand was drawn, so taking the hand would draw nothing
+        version = await async_server.get_game_version(id_game)
+        etag = None if version is None else build_game_etag(id_game, version, HAND_ETAG_SUFFIX + suffix)
+        if etag is not None and request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+    try:
+        game, drawn = await async_server.apply_game_action(id_game, InteractiveGame.take_hand)
+        body = encode_body(build_hand_response(game, representation), representation)
+        publish_hand(game, drawn)
+        return representation_response(body, representation, build_hand_etag(game, suffix))
+    except DocumentNotFoundError:
+        return await make_response(jsonify({'error': f'Game {id_game} not found'}), 404)
+    except ConcurrentUpdateError as e:
+        return await make_response(jsonify({'error': str(e)}), 409)
+    except Exception as e:
+        traceback.print_exc()
+        return await make_response(jsonify({'error': str(e)}), 400)
+
+
+@async_game_controllers.route('/game/<string:id_game>/hand', methods=['PUT'])
+async def play_turn(id_game: str):
+    try:
+        representation = parse_representation(request.accept_mimetypes, request.args, PLAY_FIELDS)
+        idx_hand_p1 = parse_card_indexes(await request.get_json())
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        _, (response, event_body) = await async_server.apply_game_action(
+            id_game, lambda game: play_turn_response(game, idx_hand_p1, representation))
+        publish_turn(event_body)
+        return representation_response(encode_body(response, representation), representation)
+    except DocumentNotFoundError:
+        return await make_response(jsonify({'error': f'Game {id_game} not found'}), 404)
+    except ConcurrentUpdateError as e:
+        return await make_response(jsonify({'error': str(e)}), 409)
+    except Exception as e:
+        traceback.print_exc()
+        return await make_response(jsonify({'error': str(e)}), 400)
+
+
+@async_game_controllers.route('/game/<string:id_game>', methods=['DELETE'])
+async def delete_game(id_game: str):
+    await async_server.delete_game(id_game)
+    publish_deleted(id_game)
+    return await make_response(jsonify({'success': True}), 200)
+
+
+@async_game_controllers.route('/game/<string:id_game>/events', methods=['GET'])
+async def stream_game_events(id_game: str):
+    # Spectators get the turns pushed instead of polling the game, only this check reads the database
+    if await async_server.get_game_version(id_game) is None:
+        abort(404)
+    response = await make_response(aiter_sse(game_topic(id_game)), 200, SSE_HEADERS)
+    response.mimetype = 'text/event-stream'
+    # Streams stay open, Quart would close them after the response timeout
+    response.timeout = None
+    return response
+
+
+@async_game_controllers.route('/lobby/events', methods=['GET'])
+async def stream_lobby_events():
+    response = await make_response(aiter_sse(LOBBY_TOPIC), 200, SSE_HEADERS)
+    response.mimetype = 'text/event-stream'
+    response.timeout = None
+    return response
@@ -1,32 +1,91 @@
 import traceback
-from flask import Blueprint, jsonify, make_response, request, abort
-from typing import List
+from flask import Blueprint, Response, jsonify, make_response, request, abort
 from App.models import InteractiveGame
-from App.util.constants import CARDS_TO_USE, NUM_RANKS, SUITS, SPECIAL_RANKS
-from App.util.helpers import str_to_bool
-from App.database import server
-from App.util.helpers import to_dict
+from App.util.broker import LOBBY_TOPIC, broker, game_topic
+from App.util.metrics import metrics
+from App.database import db, server
+from App.database.archiver import archiver
+from App.database.server import ConcurrentUpdateError, release_game, response_cache
+from App.database.storage import DocumentNotFoundError
+from .game_responses import GAME_FIELDS, HAND_ETAG_SUFFIX, HAND_FIELDS, PLAY_FIELDS, build_game_etag, build_hand_etag
+from .game_responses import build_game_response, build_hand_response, build_list_etag, build_list_read_fields
+from .game_responses import build_new_game, build_new_game_documents, parse_card_indexes, parse_list_args
+from .game_responses import parse_list_representation, parse_representation, play_turn_response, take_list_versions
+from .game_events import SSE_HEADERS, STREAMS_RETRY_AFTER_SECONDS, iter_sse, publish_created, publish_created_game
+from .game_events import publish_deleted, publish_hand, publish_turn, stream_slots
+from .wire_formats import DEFAULT_REPRESENTATION, NotAcceptableError, Representation, build_representation_suffix
+from .wire_formats import encode_body
 
 game_controllers = Blueprint('game', __name__, url_prefix='')
 
-PLAYER_NAME = 'playerName'
-CARD_INDEXES = 'cardIndexes'
-FINISHED = 'finished'
-ONLY_ID = 'onlyId'
 
-
-def get_game_by_id(id_game: str) -> InteractiveGame:
+def get_game_by_id(id_game: str, current_version: int = None) -> InteractiveGame:
     try:
-        game = server.get_game(id_game)
+        game = server.get_game(id_game, current_version)
         return game
     except Exception:
         traceback.print_exc()
         abort(404)
 
 
+def not_modified(etag: str, weak: bool = False) -> Response:
+    response = Response(status=304)
+    response.set_etag(etag, weak)
+    return response
+
+
+def representation_response(body: bytes, representation: Representation, etag: str = None,
+                            weak: bool = False) -> Response:
+    response = Response(body, mimetype=representation.wire_format.mimetype)
+    if etag is not None:
+        response.set_etag(etag, weak)
+    # The format depends on the Accept header, caches must not serve it to other clients
+    response.vary.add('Accept')
+    return response
+
+
+def event_stream_response(topic: str) -> Response:
+    """
+    Streams the events of a topic while a stream slot of the worker is free, otherwise answers 503 so the threads
+    left keep serving the game requests
+
+    Args:
+        topic (str): Topic, e.g. LOBBY_TOPIC or game_topic(id_game)
+
+    Returns:
+        Response: Event stream or 503 response
+    """
+    if not stream_slots.acquire():
+        response = make_response(jsonify({'error': 'Too many event streams open, try again later'}), 503)
+        response.headers['Retry-After'] = str(STREAMS_RETRY_AFTER_SECONDS)
+        return response
+    response = Response(iter_sse(topic), mimetype='text/event-stream', headers=SSE_HEADERS)
+    # Called by the WSGI server when the stream ends, even if the client left before it started
+    response.call_on_close(stream_slots.release)
+    return response
+
+
 @game_controllers.route('/health', methods=['GET'])
 def health():
-    return make_response(jsonify({'status': 'pass'}), 200)
+    database = server.get_database_health()
+    status_code = 200 if database['status'] == 'pass' else 503
+    body = {'status': database['status'], 'database': database, 'gameCache': server.get_game_cache_stats(),
+            'responseCache': server.get_response_cache_stats(), 'broker': broker.get_stats(),
+            'eventStreams': stream_slots.get_stats(), 'archiver': archiver.get_stats()}
+    return make_response(jsonify(body), status_code)
+
+
+@game_controllers.route('/metrics', methods=['GET'])
+def get_metrics():
+    gauges = {f'game_cache_{name}': value for name, value in server.get_game_cache_stats().items()}
+    gauges.update({f'response_cache_{name}': value for name, value in server.get_response_cache_stats().items()})
+    gauges.update({f'broker_{name}': value for name, value in broker.get_stats().items()})
+    gauges.update({f'event_streams_{name}': value for name, value in stream_slots.get_stats().items()})
+    gauges.update({f'archiver_{name}': value for name, value in archiver.get_stats().items()})
+    storage_stats = db.get_storage().get_stats()
+    gauges.update({f'storage_{name}': value for name, value in storage_stats.items()
+                   if isinstance(value, (int, float))})
+    return Response(metrics.render(gauges), mimetype='text/plain; version=0.0.4'), 200
 
 
 @game_controllers.route('/', methods=['GET'])
@@ -41,67 +100,115 @@ def not_found(error):
 
 @game_controllers.route('/game', methods=['GET'])
 def get_games():
-    finished_status = request.args.get(FINISHED)
-    only_id: str = request.args.get(ONLY_ID)
-    only_id: bool = True if only_id is None else str_to_bool(only_id)
+    try:
+        args = parse_list_args(request.args)
+        representation = parse_list_representation(request.accept_mimetypes)
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
 
-    game_ids = []
-    if finished_status is None:
-        game_ids = server.get_list_all_games(only_id)
+    suffix = build_representation_suffix(representation)
+    versions = None
+    if request.if_none_match:
+        # The versions are enough to answer 304, without reading the documents
+        versions = server.get_games_versions(args.finished, args.limit, args.after)
+        etag = build_list_etag(args, versions, suffix)
+        if request.if_none_match.contains_weak(etag):
+            return not_modified(etag, weak=True)
+    if args.only_id:
+        if versions is None:
+            versions = server.get_games_versions(args.finished, args.limit, args.after)
+        games = [id_game for id_game, _ in versions]
     else:
-        is_finished = str_to_bool(finished_status)
-        game_ids = server.get_games_by_status(is_finished, only_id)
-    return jsonify(game_ids), 200
+        # A single read gives the documents and their versions, the page is read before the ETag header is sent
+        fields = build_list_read_fields(args)
+        if args.finished is None:
+            games = list(server.get_list_all_games(False, fields, args.limit, args.after))
+        else:
+            games = list(server.get_games_by_status(args.finished, False, fields, args.limit, args.after))
+        versions = take_list_versions(args, games)
+    body = encode_body(games, representation)
+    return representation_response(body, representation, build_list_etag(args, versions, suffix), weak=True), 200
 
 
 @game_controllers.route('/game/<string:id_game>', methods=['GET'])
 def get_game(id_game: str):
-    game = get_game_by_id(id_game)
-    response = {
-        **to_dict(game),
-        '_winner': game.get_winner(CARDS_TO_USE)
-    }
-    return jsonify(response), 200
+    try:
+        representation = parse_representation(request.accept_mimetypes, request.args, GAME_FIELDS)
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    version = server.get_game_version(id_game)
+    if version is None:
+        abort(404)
+    suffix = build_representation_suffix(representation)
+    etag = build_game_etag(id_game, version, suffix)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    # Only the default representation is cached, one body by game
+    cached = representation == DEFAULT_REPRESENTATION
+    body = response_cache.get(id_game, version) if cached else None
+    if body is None:
+        game = get_game_by_id(id_game, version)
+        body = encode_body(build_game_response(game, representation), representation)
+        release_game(game)
+        if cached:
+            response_cache.put(id_game, game.get_version(), body)
+        etag = build_game_etag(id_game, game.get_version(), suffix)
+    return representation_response(body, representation, etag)
 
 
 @game_controllers.route('/game', methods=['POST'])
 def create_game():
-    player = request.json.get(PLAYER_NAME)
-    if player is None:
-        return jsonify({'error': f"No '{PLAYER_NAME}' field was provided"}), 400
-
-    game = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, player)
-    id_game = game.get_id()
+    try:
+        game = build_new_game(request.json)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
     response = {
-        '_id': id_game
+        '_id': game.get_id()
     }
     server.add_game(game)
+    publish_created_game(game)
     return jsonify(response), 201
 
 
+@game_controllers.route('/game/batch', methods=['POST'])
+def create_games():
+    try:
+        documents = build_new_game_documents(request.json)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    ids = server.add_game_documents(documents)
+    publish_created(documents)
+    return jsonify({'_ids': ids}), 201
+
+
 @game_controllers.route('/game/<string:id_game>/hand', methods=['GET'])
 def take_player_hand(id_game: str):
     try:
-        game = get_game_by_id(id_game)
-        update_hand = game.take_hand()
-        if update_hand:
-            server.update_game(game)
-        pretty_hand_p1 = game.get_hand_player(1)
-        pretty_hand_p2 = game.get_hand_player(2)
-        hand_p1 = [{idx: card} for idx, card in enumerate(pretty_hand_p1)]
-        hand_p2 = [{idx: card} for idx, card in enumerate(pretty_hand_p2)]
-        response = {
-            '_id': id_game,
-            '_name_p1': game.get_name_player(1),
-            '_name_p2': game.get_name_player(2),
-            '_len_deck_p1': game.get_deck_len_player(1),
-            '_len_deck_p2': game.get_deck_len_player(2),
-            '_hand_p1': hand_p1,
-            '_hand_p2': hand_p2,
-            '_num_turns': game.get_num_turns(),
-            '_current_target': game.get_target_rank()
-        }
-        return jsonify(response), 200
+        representation = parse_representation(request.accept_mimetypes, request.args, HAND_FIELDS)
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    suffix = build_representation_suffix(representation)
+    if request.if_none_match:
+        # Unchanged since the hand was drawn, so taking the hand would draw nothing
+        version = server.get_game_version(id_game)
+        etag = None if version is None else build_game_etag(id_game, version, HAND_ETAG_SUFFIX + suffix)
+        if etag is not None and request.if_none_match.contains_weak(etag):
+            return not_modified(etag)
+    try:
+        game, drawn = server.apply_game_action(id_game, InteractiveGame.take_hand)
+        body = encode_body(build_hand_response(game, representation), representation)
+        publish_hand(game, drawn)
+        return representation_response(body, representation, build_hand_etag(game, suffix))
+    except DocumentNotFoundError:
+        return make_response(jsonify({'error': f'Game {id_game} not found'}), 404)
+    except ConcurrentUpdateError as e:
+        return make_response(jsonify({'error': str(e)}), 409)
     except Exception as e:
         traceback.print_exc()
         return make_response(jsonify({'error': str(e)}), 400)
@@ -110,39 +217,21 @@ def take_player_hand(id_game: str):
 @game_controllers.route('/game/<string:id_game>/hand', methods=['PUT'])
 def play_turn(id_game: str):
     try:
-        game = get_game_by_id(id_game)
-        has_card_indexes: bool = CARD_INDEXES in request.json
-        if not request.json or not has_card_indexes:
-            return jsonify({'error': f"No '{CARD_INDEXES}' field was provided"}), 400
-        if type(request.json[CARD_INDEXES]) is not list:
-            return jsonify({'error': f"'{CARD_INDEXES}' must be a list of indexes"}), 400
-
-        idx_hand_p1: List[int] = request.json[CARD_INDEXES]
-        hand_p1 = game.get_hand_player(1, False)
-        hand_p2 = game.get_hand_player(2, False)
-        turn_winner, idx_hand_p2 = game.play_turn(idx_hand_p1)
-        server.update_game(game)
-
-        target_approx_p1 = sum([card.get_rank() for idx, card in enumerate(hand_p1) if idx in idx_hand_p1])
-        target_approx_p2 = sum([card.get_rank() for idx, card in enumerate(hand_p2) if idx in idx_hand_p2])
-        response = {
-            '_id': id_game,
-            '_name_p1': game.get_name_player(1),
-            '_name_p2': game.get_name_player(2),
-            '_indexes_hand_p1': idx_hand_p1,
-            '_indexes_hand_p2': idx_hand_p2,
-            '_len_deck_p1': game.get_deck_len_player(1),
-            '_len_deck_p2': game.get_deck_len_player(2),
-            '_hand_p1': [{idx: str(card)} for idx, card in enumerate(hand_p1)],
-            '_hand_p2': [{idx: str(card)} for idx, card in enumerate(hand_p2)],
-            '_num_turns': game.get_num_turns(),
-            '_turn_winner': turn_winner,
-            '_winner': game.get_winner(CARDS_TO_USE),
-            '_current_target': game.get_target_rank(),
-            '_current_target_approx_p1': target_approx_p1,
-            '_current_target_approx_p2': target_approx_p2,
-        }
-        return jsonify(response), 200
+        representation = parse_representation(request.accept_mimetypes, request.args, PLAY_FIELDS)
+        idx_hand_p1 = parse_card_indexes(request.json)
+    except NotAcceptableError as e:
+        return jsonify({'error': str(e)}), 406
+    except Exception as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        _, (response, event_body) = server.apply_game_action(
+            id_game, lambda game: play_turn_response(game, idx_hand_p1, representation))
+        publish_turn(event_body)
+        return representation_response(encode_body(response, representation), representation)
+    except DocumentNotFoundError:
+        return make_response(jsonify({'error': f'Game {id_game} not found'}), 404)
+    except ConcurrentUpdateError as e:
+        return make_response(jsonify({'error': str(e)}), 409)
     except Exception as e:
         traceback.print_exc()
         return make_response(jsonify({'error': str(e)}), 400)
@@ -151,4 +240,18 @@ def play_turn(id_game: str):
 @game_controllers.route('/game/<string:id_game>', methods=['DELETE'])
 def delete_game(id_game: str):
     server.delete_game(id_game)
+    publish_deleted(id_game)
     return make_response(jsonify({'success': True}), 200)
+
+
+@game_controllers.route('/game/<string:id_game>/events', methods=['GET'])
+def stream_game_events(id_game: str):
+    # Spectators get the turns pushed instead of polling the game, only this check reads the database
+    if server.get_game_version(id_game) is None:
+        abort(404)
+    return event_stream_response(game_topic(id_game))
+
+
+@game_controllers.route('/lobby/events', methods=['GET'])
+def stream_lobby_events():
+    return event_stream_response(LOBBY_TOPIC)
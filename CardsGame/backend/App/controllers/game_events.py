@@ -0,0 +1,232 @@
+import threading
+from typing import AsyncIterator, Dict, Iterator, List
+from App.models import InteractiveGame
+from App.util.broker import LOBBY_TOPIC, Event, broker, game_topic
+from App.database.server import SUMMARY_FIELDS
+from App.util.constants import CARDS_TO_USE
+from config import BROKER_KEEPALIVE_SECONDS, BROKER_MAX_STREAMS
+from .wire_formats import encode_json
+
+# Events pushed to the clients: the subscribers of a game get its turns, the lobby gets the games created, finished
+# and deleted. Shared by the Flask and the asyncio game controllers
+TURN_EVENT = 'turn'
+CREATED_EVENT = 'created'
+FINISHED_EVENT = 'finished'
+DELETED_EVENT = 'deleted'
+# Milliseconds the EventSource of the browser waits before reconnecting
+SSE_RETRY_MS = 3000
+SSE_HEADERS = {'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+FINISHED_FIELDS = ['_id', '_winner', '_num_turns']
+# Seconds a client rejected by StreamSlots is told to wait before opening the stream again
+STREAMS_RETRY_AFTER_SECONDS = 30
+
+
+class StreamSlots:
+    """
+    Bounds the event streams open at the same time in a worker. A WSGI worker serves a stream with one of its threads
+    until the client disconnects, so without a bound a few spectators would take every thread and the game requests
+    would queue behind them
+
+    Args:
+        max_streams (int): Maximum number of open streams (Default: config.BROKER_MAX_STREAMS)
+
+    Attributes:
+        rejected (int): Streams refused because every slot was taken
+    """
+
+    def __init__(self, max_streams: int = BROKER_MAX_STREAMS):
+        self.max_streams = max_streams
+        self.rejected = 0
+        self.__open = 0
+        self.__lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """
+        Takes a slot for a new stream
+
+        Args:
+            None
+
+        Returns:
+            bool: False if every slot is taken, the stream must not be opened
+        """
+        with self.__lock:
+            if self.__open >= self.max_streams:
+                self.rejected += 1
+                return False
+            self.__open += 1
+            return True
+
+    def release(self) -> None:
+        """
+        Gives back the slot of a closed stream
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__open -= 1
+
+    def get_stats(self) -> Dict:
+        """
+        Gets the open streams and the rejected ones
+
+        Args:
+            None
+
+        Returns:
+            Dict: Counters
+        """
+        with self.__lock:
+            return {'open': self.__open, 'max': self.max_streams, 'rejected': self.rejected}
+
+
+stream_slots = StreamSlots()
+
+
+def publish_turn(body: Dict) -> None:
+    """
+    Pushes a played turn to the game subscribers, and to the lobby if the turn ended the game
+
+    Args:
+        body (Dict): Response of PUT /game/<id>/hand in the default representation
+
+    Returns:
+        None
+    """
+    broker.publish(game_topic(body['_id']), {'type': TURN_EVENT, 'data': body})
+    if body['_winner'] is not None:
+        publish_finished({field: body[field] for field in FINISHED_FIELDS})
+
+
+def publish_hand(game: InteractiveGame, drawn: bool) -> None:
+    """
+    Pushes the end of a game when drawing a hand ended it, the hands themselves are not pushed
+
+    Args:
+        game (InteractiveGame): Game after taking the hand
+        drawn (bool): Flag to indicate if a new hand was drawn
+
+    Returns:
+        None
+    """
+    winner = game.get_winner(CARDS_TO_USE)
+    if drawn and winner:
+        publish_finished({'_id': game.get_id(), '_winner': winner, '_num_turns': game.get_num_turns()})
+
+
+def publish_finished(data: Dict) -> None:
+    """
+    Pushes the end of a game to its subscribers and to the lobby
+
+    Args:
+        data (Dict): Game id, winner and number of turns
+
+    Returns:
+        None
+    """
+    event = {'type': FINISHED_EVENT, 'data': data}
+    broker.publish(game_topic(data['_id']), event)
+    broker.publish(LOBBY_TOPIC, event)
+
+
+def publish_created(documents: List[Dict]) -> None:
+    """
+    Pushes new games to the lobby
+
+    Args:
+        documents (List[Dict]): Documents of the saved games
+
+    Returns:
+        None
+    """
+    for document in documents:
+        summary = {field: document[field] for field in SUMMARY_FIELDS if field in document}
+        broker.publish(LOBBY_TOPIC, {'type': CREATED_EVENT, 'data': summary})
+
+
+def publish_created_game(game: InteractiveGame) -> None:
+    """
+    Pushes a new game to the lobby
+
+    Args:
+        game (InteractiveGame): Saved game
+
+    Returns:
+        None
+    """
+    publish_created([game.to_document(SUMMARY_FIELDS)])
+
+
+def publish_deleted(id_game: str) -> None:
+    """
+    Pushes the deletion of a game to its subscribers and to the lobby
+
+    Args:
+        id_game (str): Game id
+
+    Returns:
+        None
+    """
+    event = {'type': DELETED_EVENT, 'data': {'_id': id_game}}
+    broker.publish(game_topic(id_game), event)
+    broker.publish(LOBBY_TOPIC, event)
+
+
+def format_sse(event: Event) -> bytes:
+    """
+    Formats an event as a Server-Sent Events message
+
+    Args:
+        event (Event): Event
+
+    Returns:
+        bytes: Message, e.g. b'event: turn\\ndata: {...}\\n\\n'
+    """
+    return b'event: ' + event['type'].encode() + b'\ndata: ' + encode_json(event['data']) + b'\n\n'
+
+
+def iter_sse(topic: str, keepalive_seconds: float = BROKER_KEEPALIVE_SECONDS) -> Iterator[bytes]:
+    """
+    Subscribes a client to a topic and streams its events, sending a comment when it's idle. The subscription is
+    cancelled when the client disconnects (the server closes the generator)
+
+    Args:
+        topic (str): Topic, e.g. LOBBY_TOPIC or game_topic(id_game)
+        keepalive_seconds (float): Seconds between the comments of an idle stream
+
+    Returns:
+        Iterator[bytes]: Server-Sent Events messages
+    """
+    subscription = broker.subscribe(topic)
+    try:
+        yield f'retry: {SSE_RETRY_MS}\n\n'.encode()
+        while True:
+            event = subscription.get(keepalive_seconds)
+            yield b': keepalive\n\n' if event is None else format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def aiter_sse(topic: str, keepalive_seconds: float = BROKER_KEEPALIVE_SECONDS) -> AsyncIterator[bytes]:
+    """
+    Async version of iter_sse, the events are waited on the event loop
+
+    Args:
+        topic (str): Topic, e.g. LOBBY_TOPIC or game_topic(id_game)
+        keepalive_seconds (float): Seconds between the comments of an idle stream
+
+    Returns:
+        AsyncIterator[bytes]: Server-Sent Events messages
+    """
+    subscription = broker.subscribe(topic)
+    try:
+        yield f'retry: {SSE_RETRY_MS}\n\n'.encode()
+        while True:
+            event = await subscription.get_async(keepalive_seconds)
+            yield b': keepalive\n\n' if event is None else format_sse(event)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,500 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple
+from typing import Tuple, Union
+from werkzeug.datastructures import MIMEAccept
+from App.models import Card, InteractiveGame
+from App.models.interactive_game import DOCUMENT_FIELDS
+from App.util.constants import CARDS_TO_USE, NUM_RANKS, SUITS, SPECIAL_RANKS, PC_DIFFICULTIES, PC_DIFFICULTY_NORMAL
+from App.util.helpers import get_random_seed, str_to_bool
+from App.util.metrics import metrics
+from App.database.server import HISTORY_FIELD, SUMMARY_FIELDS, VERSION_FIELD
+from config import GAME_EVENT_SOURCING
+from .wire_formats import DEFAULT_REPRESENTATION, Representation, negotiate_wire_format
+
+# Request fields and query parameters shared by the Flask and the asyncio game controllers
+PLAYER_NAME = 'playerName'
+PLAYER_NAMES = 'playerNames'
+CARD_INDEXES = 'cardIndexes'
+FINISHED = 'finished'
+ONLY_ID = 'onlyId'
+DIFFICULTY = 'difficulty'
+SEED = 'seed'
+LIMIT = 'limit'
+AFTER = 'after'
+FIELDS = 'fields'
+SUMMARY = 'summary'
+MAX_LIMIT = 1000
+MAX_BATCH_GAMES = 1000
+# ETag of GET /game/<id>/hand, so it never matches the ETag of GET /game/<id> for the same version
+HAND_ETAG_SUFFIX = '-hand'
+# The history is saved in its own collection, only GET /game/<id> returns it
+LIST_FIELDS = [field for field in DOCUMENT_FIELDS if field != HISTORY_FIELD]
+GAME_FIELDS = DOCUMENT_FIELDS
+# Fields of the hand and turn responses, the compact responses leave out the player names
+HAND_FIELDS = ['_id', '_name_p1', '_name_p2', '_len_deck_p1', '_len_deck_p2', '_hand_p1', '_hand_p2', '_num_turns',
+               '_current_target']
+PLAY_FIELDS = ['_id', '_name_p1', '_name_p2', '_indexes_hand_p1', '_indexes_hand_p2', '_len_deck_p1', '_len_deck_p2',
+               '_hand_p1', '_hand_p2', '_num_turns', '_turn_winner', '_winner', '_current_target',
+               '_current_target_approx_p1', '_current_target_approx_p2']
+NAME_FIELDS = ['_name_p1', '_name_p2']
+COMPACT_HAND_FIELDS = [field for field in HAND_FIELDS if field not in NAME_FIELDS]
+COMPACT_PLAY_FIELDS = [field for field in PLAY_FIELDS if field not in NAME_FIELDS]
+
+
+class ListArgs(NamedTuple):
+    """
+    Query parameters of GET /game
+
+    Attributes:
+        finished (Union[bool, None]): Games status to list, None for all the games
+        only_id (bool): Flag to return only the id of the games
+        fields (Union[List[str], None]): Document fields to return, None for the whole documents
+        limit (int): Maximum number of games, 0 for no limit
+        after (Union[Tuple[float, str], None]): Created date and id of the last game of the previous page
+    """
+    finished: Union[bool, None]
+    only_id: bool
+    fields: Union[List[str], None]
+    limit: int
+    after: Union[Tuple[float, str], None]
+
+
+def parse_list_args(args: Mapping[str, str]) -> ListArgs:
+    """
+    Parses and validates the query parameters of GET /game
+
+    Args:
+        args (Mapping[str, str]): Query parameters
+
+    Raises:
+        Exception: When a parameter is not valid
+
+    Returns:
+        ListArgs: Parsed parameters
+    """
+    finished = args.get(FINISHED)
+    only_id = args.get(ONLY_ID)
+    limit = args.get(LIMIT)
+    if limit is not None and (not limit.isdigit() or not 0 < int(limit) <= MAX_LIMIT):
+        raise Exception(f"'{LIMIT}' must be an integer between 1 and {MAX_LIMIT}")
+    after = args.get(AFTER)
+    fields = args.get(FIELDS)
+    return ListArgs(finished=None if finished is None else str_to_bool(finished),
+                    only_id=True if only_id is None else str_to_bool(only_id),
+                    fields=None if fields is None else parse_fields(fields),
+                    limit=0 if limit is None else int(limit),
+                    after=None if after is None else parse_after(after))
+
+
+def parse_list_representation(accept: MIMEAccept) -> Representation:
+    """
+    Negotiates the format of a GET /game page from the Accept header, its fields are the ones of ListArgs
+
+    Args:
+        accept (MIMEAccept): Parsed Accept header
+
+    Raises:
+        NotAcceptableError: When the client accepts none of the formats
+
+    Returns:
+        Representation: Format of the page
+    """
+    return Representation(negotiate_wire_format(accept), None)
+
+
+def parse_after(after: str) -> Tuple[float, str]:
+    """
+    Parses a page cursor '<_created_date>:<_id>' of the last game of the previous page
+
+    Args:
+        after (str): Page cursor
+
+    Raises:
+        Exception: When the cursor is malformed
+
+    Returns:
+        Tuple[float, str]: Created date and game id
+    """
+    created_date, separator, id_game = after.partition(':')
+    if not separator or not id_game:
+        raise Exception(f"'{AFTER}' must be '<_created_date>:<_id>' of the last game received")
+    return float(created_date), id_game
+
+
+def parse_fields(fields: str, valid_fields: List[str] = LIST_FIELDS) -> List[str]:
+    """
+    Parses a comma separated list of game fields, 'summary' selects the fields shown by the games lists
+
+    Args:
+        fields (str): Requested fields, e.g. '_name_p1,_winner'
+        valid_fields (List[str]): Fields that can be requested (Default: the fields of the listings)
+
+    Raises:
+        Exception: When a field is not part of the game document
+
+    Returns:
+        List[str]: Game fields
+    """
+    if fields == SUMMARY:
+        selected = SUMMARY_FIELDS
+    else:
+        selected = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in selected if field not in valid_fields]
+    if unknown:
+        raise Exception(f"Unknown fields {unknown}. Valid options: '{SUMMARY}' or {valid_fields}")
+    return selected
+
+
+def parse_representation(accept: MIMEAccept, args: Mapping[str, str], valid_fields: List[str]) -> Representation:
+    """
+    Negotiates the representation of a game response: its format from the Accept header and its fields from the
+    'fields' query parameter
+
+    Args:
+        accept (MIMEAccept): Parsed Accept header
+        args (Mapping[str, str]): Query parameters
+        valid_fields (List[str]): Fields of the response, e.g. HAND_FIELDS
+
+    Raises:
+        NotAcceptableError: When the client accepts none of the formats
+        Exception: When a field is not valid
+
+    Returns:
+        Representation: Format and fields of the response
+    """
+    wire_format = negotiate_wire_format(accept)
+    fields = args.get(FIELDS)
+    return Representation(wire_format, None if fields is None else parse_fields(fields, valid_fields))
+
+
+def select_fields(body: Dict, fields: Union[List[str], None]) -> Dict:
+    """
+    Keeps the requested fields of a response body
+
+    Args:
+        body (Dict): Response body
+        fields (Union[List[str], None]): Fields to keep, None to keep all of them
+
+    Returns:
+        Dict: Sparse response body
+    """
+    if fields is None:
+        return body
+    return {field: body[field] for field in fields}
+
+
+def compact_cards(cards: Iterable[Card]) -> List[str]:
+    """
+    Converts cards to the compact responses format, e.g. ['K♣', '10♦']
+
+    Args:
+        cards (Iterable[Card]): Cards, e.g. a hand or a deck
+
+    Returns:
+        List[str]: Pretty cards without padding
+    """
+    return [str(card).strip() for card in cards]
+
+
+# Fields of the game document sent in another shape by the compact responses
+COMPACT_DOCUMENT_ENCODERS: Dict[str, Callable[[InteractiveGame], Any]] = {
+    '_deck_p1': lambda game: compact_cards(game.get_deck_player(1)),
+    '_deck_p2': lambda game: compact_cards(game.get_deck_player(2)),
+    '_hand_p1': lambda game: compact_cards(game.get_hand_player(1, False)),
+    '_hand_p2': lambda game: compact_cards(game.get_hand_player(2, False)),
+    # The turns are listed in order, each one has its number
+    HISTORY_FIELD: lambda game: [turn_dict for _, turn_dict in sorted(game.get_history().items())]
+}
+
+
+def build_game_response(game: InteractiveGame, representation: Representation = DEFAULT_REPRESENTATION) -> Dict:
+    """
+    Builds the response of GET /game/<id>: the game document, or the requested fields of it. The history is only
+    read when it's requested
+
+    Args:
+        game (InteractiveGame): Game instance
+        representation (Representation): Negotiated representation
+
+    Returns:
+        Dict: Response body
+    """
+    if not representation.wire_format.compact:
+        return game.to_document(representation.fields)
+    fields = game.get_document_fields() if representation.fields is None else representation.fields
+    document = game.to_document([field for field in fields if field not in COMPACT_DOCUMENT_ENCODERS])
+    return {field: COMPACT_DOCUMENT_ENCODERS[field](game) if field in COMPACT_DOCUMENT_ENCODERS else document[field]
+            for field in fields}
+
+
+def build_game_etag(id_game: str, version: int, suffix: str = '') -> str:
+    """
+    Builds the ETag (without quotes) of a response rendered from a game version. Every change of a game increments
+    its version, so the ETag changes with the response
+
+    Args:
+        id_game (str): Game id
+        version (int): Version of the game document
+        suffix (str): Distinguishes the responses of the same version, e.g. HAND_ETAG_SUFFIX
+
+    Returns:
+        str: Entity tag, e.g. 'a1b2c3d4e5f6-7'
+    """
+    return f'{id_game}-{version}{suffix}'
+
+
+def build_hand_etag(game: InteractiveGame, suffix: str = '') -> Union[str, None]:
+    """
+    Builds the ETag of the GET /game/<id>/hand response of a game that has a hand. A game that ended when the hand
+    was drawn has none: taking the hand again answers an error instead of the same hand
+
+    Args:
+        game (InteractiveGame): Saved game
+        suffix (str): Suffix of the response representation, see wire_formats.build_representation_suffix
+
+    Returns:
+        Union[str, None]: Entity tag, None if the response can't be reused
+    """
+    if game.get_winner(CARDS_TO_USE):
+        return None
+    return build_game_etag(game.get_id(), game.get_version(), HAND_ETAG_SUFFIX + suffix)
+
+
+def build_list_etag(args: ListArgs, versions: List[Tuple[str, int]], suffix: str = '') -> str:
+    """
+    Builds the ETag (without quotes) of a GET /game page from the ids and versions of its games. It's a weak ETag:
+    a request with If-None-Match reads the versions first, to answer 304 without reading the documents, and the
+    documents read next may have newer versions
+
+    Args:
+        args (ListArgs): Query parameters of the listing
+        versions (List[Tuple[str, int]]): Id and version of each game of the page
+        suffix (str): Distinguishes the formats of the same page, see build_representation_suffix
+
+    Returns:
+        str: Entity tag, a SHA-1 hex digest followed by the suffix
+    """
+    return hashlib.sha1(json.dumps([list(args), versions]).encode()).hexdigest() + suffix
+
+
+def build_list_read_fields(args: ListArgs) -> Union[List[str], None]:
+    """
+    Builds the fields read for the documents of a GET /game page: the requested fields and the version, so the ETag
+    of the page is built from the same read (see take_list_versions)
+
+    Args:
+        args (ListArgs): Query parameters of the listing
+
+    Returns:
+        Union[List[str], None]: Fields to read, None for the whole documents (they have their version)
+    """
+    if args.fields is None or VERSION_FIELD in args.fields:
+        return args.fields
+    return args.fields + [VERSION_FIELD]
+
+
+def take_list_versions(args: ListArgs, raw_games: List[Dict]) -> List[Tuple[str, int]]:
+    """
+    Takes the id and the version of the games of a page read with build_list_read_fields, the version is removed from
+    the documents when it wasn't requested
+
+    Args:
+        args (ListArgs): Query parameters of the listing
+        raw_games (List[Dict]): Game documents of the page, changed in place
+
+    Returns:
+        List[Tuple[str, int]]: Game ids and versions, see build_list_etag
+    """
+    versions = [(raw_game['_id'], raw_game.get(VERSION_FIELD, 0)) for raw_game in raw_games]
+    if args.fields is not None and VERSION_FIELD not in args.fields:
+        for raw_game in raw_games:
+            del raw_game[VERSION_FIELD]
+    return versions
+
+
+def build_new_game(body: Dict) -> InteractiveGame:
+    """
+    Creates the game requested by POST /game. A seed in the body (or GAME_EVENT_SOURCING) makes it event-sourced,
+    the same seed and card choices replay the same game
+
+    Args:
+        body (Dict): Request body
+
+    Raises:
+        Exception: When the player name is missing, or the difficulty or the seed are not valid
+
+    Returns:
+        InteractiveGame: New game, not saved yet
+    """
+    body = body or dict()
+    player = body.get(PLAYER_NAME)
+    if player is None:
+        raise Exception(f"No '{PLAYER_NAME}' field was provided")
+    difficulty = body.get(DIFFICULTY, PC_DIFFICULTY_NORMAL)
+    if difficulty not in PC_DIFFICULTIES:
+        raise Exception(f"'{DIFFICULTY}' must be one of {PC_DIFFICULTIES}")
+    seed = body.get(SEED)
+    if seed is None and GAME_EVENT_SOURCING:
+        seed = get_random_seed()
+    elif seed is not None and (not isinstance(seed, int) or isinstance(seed, bool) or seed < 0):
+        raise Exception(f"'{SEED}' must be a non negative integer")
+    return InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, player, difficulty=difficulty, seed=seed)
+
+
+def build_new_game_documents(body: Dict) -> List[Dict]:
+    """
+    Creates the game documents requested by POST /game/batch, one game by player name
+
+    Args:
+        body (Dict): Request body
+
+    Raises:
+        Exception: When the player names are missing, too many or not strings, or the difficulty is not valid
+
+    Returns:
+        List[Dict]: New game documents, not saved yet
+    """
+    body = body or dict()
+    players = body.get(PLAYER_NAMES)
+    if not isinstance(players, list) or not players:
+        raise Exception(f"'{PLAYER_NAMES}' must be a non empty list of player names")
+    if len(players) > MAX_BATCH_GAMES:
+        raise Exception(f"'{PLAYER_NAMES}' can't have more than {MAX_BATCH_GAMES} names")
+    if not all(isinstance(player, str) for player in players):
+        raise Exception(f"'{PLAYER_NAMES}' must contain only strings")
+    difficulty = body.get(DIFFICULTY, PC_DIFFICULTY_NORMAL)
+    if difficulty not in PC_DIFFICULTIES:
+        raise Exception(f"'{DIFFICULTY}' must be one of {PC_DIFFICULTIES}")
+    with metrics.phase('encode'):
+        return InteractiveGame.build_new_documents(NUM_RANKS, SUITS, SPECIAL_RANKS, players, difficulty=difficulty)
+
+
+def parse_card_indexes(body: Dict) -> List[int]:
+    """
+    Gets the card indexes selected by the player on PUT /game/<id>/hand
+
+    Args:
+        body (Dict): Request body
+
+    Raises:
+        Exception: When the indexes are missing or are not a list
+
+    Returns:
+        List[int]: Indexes of the selected cards
+    """
+    if not body or CARD_INDEXES not in body:
+        raise Exception(f"No '{CARD_INDEXES}' field was provided")
+    if type(body[CARD_INDEXES]) is not list:
+        raise Exception(f"'{CARD_INDEXES}' must be a list of indexes")
+    return body[CARD_INDEXES]
+
+
+def build_hand_response(game: InteractiveGame, representation: Representation = DEFAULT_REPRESENTATION) -> Dict:
+    """
+    Builds the response of GET /game/<id>/hand
+
+    Args:
+        game (InteractiveGame): Game after taking the hand
+        representation (Representation): Negotiated representation
+
+    Returns:
+        Dict: Response body
+    """
+    compact = representation.wire_format.compact
+    body = {
+        '_id': game.get_id(),
+        '_name_p1': game.get_name_player(1),
+        '_name_p2': game.get_name_player(2),
+        '_len_deck_p1': game.get_deck_len_player(1),
+        '_len_deck_p2': game.get_deck_len_player(2),
+        '_hand_p1': build_hand(game.get_hand_player(1, False), compact),
+        '_hand_p2': build_hand(game.get_hand_player(2, False), compact),
+        '_num_turns': game.get_num_turns(),
+        '_current_target': game.get_target_rank()
+    }
+    fields = representation.fields
+    return select_fields(body, COMPACT_HAND_FIELDS if fields is None and compact else fields)
+
+
+def build_hand(hand: List[Card], compact: bool) -> List[Union[Dict[int, str], str]]:
+    """
+    Converts a hand to the responses format: a list of {index: card} or, in the compact responses, a list of cards
+
+    Args:
+        hand (List[Card]): Player's hand
+        compact (bool): Flag to build the compact format
+
+    Returns:
+        List[Union[Dict[int, str], str]]: Hand cards
+    """
+    if compact:
+        return compact_cards(hand)
+    return [{idx: str(card)} for idx, card in enumerate(hand)]
+
+
+def play_turn_response(game: InteractiveGame, idx_hand_p1: List[int],
+                       representation: Representation = DEFAULT_REPRESENTATION) -> Tuple[Dict, Dict]:
+    """
+    Plays the turn of PUT /game/<id>/hand and builds its response, used as the game action of apply_game_action
+
+    Args:
+        game (InteractiveGame): Game instance
+        idx_hand_p1 (List[int]): Indexes of the cards selected by player 1
+        representation (Representation): Negotiated representation
+
+    Returns:
+        Tuple[Dict, Dict]: Response body and the body pushed to the game subscribers (default representation)
+    """
+    hand_p1 = game.get_hand_player(1, False)
+    hand_p2 = game.get_hand_player(2, False)
+    with metrics.phase('play_turn'):
+        turn_winner, idx_hand_p2 = game.play_turn(idx_hand_p1)
+    with metrics.phase('response'):
+        turn = (hand_p1, hand_p2, idx_hand_p1, idx_hand_p2, turn_winner)
+        event_body = build_play_response(game, *turn)
+        body = event_body if representation == DEFAULT_REPRESENTATION else build_play_response(game, *turn,
+                                                                                               representation)
+        return body, event_body
+
+
+def build_play_response(game: InteractiveGame, hand_p1: List[Card], hand_p2: List[Card], idx_hand_p1: List[int],
+                        idx_hand_p2: List[int], turn_winner: Union[str, None],
+                        representation: Representation = DEFAULT_REPRESENTATION) -> Dict:
+    """
+    Builds the response of PUT /game/<id>/hand
+
+    Args:
+        game (InteractiveGame): Game after playing the turn
+        hand_p1 (List[Card]): Player 1's hand before playing the turn
+        hand_p2 (List[Card]): Player 2's hand before playing the turn
+        idx_hand_p1 (List[int]): Indexes of the cards selected by player 1
+        idx_hand_p2 (List[int]): Indexes of the cards selected by player 2
+        turn_winner (Union[str, None]): Turn winner's name, None on a tie
+        representation (Representation): Negotiated representation
+
+    Returns:
+        Dict: Response body
+    """
+    compact = representation.wire_format.compact
+    target_approx_p1 = sum([card.get_rank() for idx, card in enumerate(hand_p1) if idx in idx_hand_p1])
+    target_approx_p2 = sum([card.get_rank() for idx, card in enumerate(hand_p2) if idx in idx_hand_p2])
+    body = {
+        '_id': game.get_id(),
+        '_name_p1': game.get_name_player(1),
+        '_name_p2': game.get_name_player(2),
+        '_indexes_hand_p1': idx_hand_p1,
+        '_indexes_hand_p2': idx_hand_p2,
+        '_len_deck_p1': game.get_deck_len_player(1),
+        '_len_deck_p2': game.get_deck_len_player(2),
+        '_hand_p1': build_hand(hand_p1, compact),
+        '_hand_p2': build_hand(hand_p2, compact),
+        '_num_turns': game.get_num_turns(),
+        '_turn_winner': turn_winner,
+        '_winner': game.get_winner(CARDS_TO_USE),
+        '_current_target': game.get_target_rank(),
+        '_current_target_approx_p1': target_approx_p1,
+        '_current_target_approx_p2': target_approx_p2,
+    }
+    fields = representation.fields
+    return select_fields(body, COMPACT_PLAY_FIELDS if fields is None and compact else fields)
@@ -0,0 +1,151 @@
+import hashlib
+import json
+from typing import Any, Callable, Dict, List, NamedTuple, Union
+from werkzeug.datastructures import MIMEAccept
+from App.util.metrics import metrics
+
+# orjson and msgpack are optional: without orjson the JSON bodies are encoded by the json module, without msgpack the
+# MessagePack format is not offered
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+JSON_MIMETYPE = 'application/json'
+COMPACT_JSON_MIMETYPE = 'application/vnd.cardsgame.compact+json'
+MSGPACK_MIMETYPE = 'application/msgpack'
+MSGPACK_ALIAS_MIMETYPE = 'application/x-msgpack'
+
+
+class NotAcceptableError(Exception):
+    """
+    None of the response formats is accepted by the client (406 Not Acceptable)
+    """
+    pass
+
+
+class WireFormat(NamedTuple):
+    """
+    Response format of the game endpoints
+
+    Attributes:
+        name (str): Short name, part of the ETag of the responses that are not the default JSON
+        mimetype (str): Content type of the responses
+        compact (bool): Flag to send the compact bodies (plain card lists, no player names) instead of the verbose ones
+        encode (Callable[[Any], bytes]): Body encoder
+    """
+    name: str
+    mimetype: str
+    compact: bool
+    encode: Callable[[Any], bytes]
+
+
+def encode_json(body: Any) -> bytes:
+    """
+    Encodes a body as UTF-8 JSON without whitespace, with orjson when it's installed. Non string keys are converted
+    to strings, as the json module does
+
+    Args:
+        body (Any): JSON serializable body
+
+    Returns:
+        bytes: JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def encode_msgpack(body: Any) -> bytes:
+    """
+    Encodes a body as MessagePack
+
+    Args:
+        body (Any): Serializable body
+
+    Returns:
+        bytes: MessagePack document
+    """
+    return msgpack.packb(body, use_bin_type=True)
+
+
+JSON_FORMAT = WireFormat('json', JSON_MIMETYPE, False, encode_json)
+COMPACT_JSON_FORMAT = WireFormat('compact', COMPACT_JSON_MIMETYPE, True, encode_json)
+MSGPACK_FORMAT = WireFormat('msgpack', MSGPACK_MIMETYPE, True, encode_msgpack)
+# Preferred first when the client accepts several formats with the same quality, e.g. */*
+WIRE_FORMATS: Dict[str, WireFormat] = {
+    JSON_MIMETYPE: JSON_FORMAT,
+    COMPACT_JSON_MIMETYPE: COMPACT_JSON_FORMAT,
+    **({MSGPACK_MIMETYPE: MSGPACK_FORMAT, MSGPACK_ALIAS_MIMETYPE: MSGPACK_FORMAT} if msgpack is not None else dict())
+}
+
+
+class Representation(NamedTuple):
+    """
+    Negotiated representation of a game response
+
+    Attributes:
+        wire_format (WireFormat): Body format
+        fields (Union[List[str], None]): Fields of the body, None for the default fields of the endpoint
+    """
+    wire_format: WireFormat
+    fields: Union[List[str], None]
+
+
+DEFAULT_REPRESENTATION = Representation(JSON_FORMAT, None)
+
+
+def negotiate_wire_format(accept: MIMEAccept) -> WireFormat:
+    """
+    Picks the response format from the Accept header, JSON when there's no header
+
+    Args:
+        accept (MIMEAccept): Parsed Accept header, e.g. request.accept_mimetypes
+
+    Raises:
+        NotAcceptableError: When the client accepts none of the formats
+
+    Returns:
+        WireFormat: Best format accepted by the client
+    """
+    if not accept:
+        return JSON_FORMAT
+    mimetype = accept.best_match(list(WIRE_FORMATS))
+    if mimetype is None:
+        raise NotAcceptableError(f'Acceptable response formats: {list(WIRE_FORMATS)}')
+    return WIRE_FORMATS[mimetype]
+
+
+def build_representation_suffix(representation: Representation) -> str:
+    """
+    Builds the ETag suffix of a representation, so the ETag of a game version differs between formats and fields
+
+    Args:
+        representation (Representation): Negotiated representation
+
+    Returns:
+        str: Suffix, empty for the default representation
+    """
+    suffix = '' if representation.wire_format is JSON_FORMAT else f'-{representation.wire_format.name}'
+    if representation.fields is not None:
+        suffix += f"-{hashlib.sha1(','.join(representation.fields).encode()).hexdigest()[:10]}"
+    return suffix
+
+
+def encode_body(body: Any, representation: Representation) -> bytes:
+    """
+    Encodes a response body in the negotiated format, timed as the 'serialize' phase of the request
+
+    Args:
+        body (Any): Response body
+        representation (Representation): Negotiated representation
+
+    Returns:
+        bytes: Encoded body
+    """
+    with metrics.phase('serialize'):
+        return representation.wire_format.encode(body)
@@ -0,0 +1,150 @@
+import os
+import random
+import threading
+import time
+import traceback
+from typing import Callable, Dict, List, Union
+from config import GAME_ARCHIVE_AFTER_SECONDS, GAME_RETENTION_SECONDS, GAME_ARCHIVE_BATCH_SIZE
+from config import GAME_ARCHIVE_INTERVAL_SECONDS
+from . import server
+
+
+class GameArchiver:
+    """
+    Keeps the game collection down to the games that are being played: every interval_seconds a daemon thread moves
+    the finished games without activity for archive_after_seconds to the archive collection and deletes the unfinished
+    games without activity for retention_seconds (abandoned), in batches. Every worker runs its own thread, the sweeps
+    are idempotent so two workers sweeping at the same time only repeat work. The thread starts with the first
+    request of the worker, a process that forks its workers (gunicorn with preload_app) never runs it
+
+    Args:
+        interval_seconds (float): Seconds between two sweeps, 0 disables the thread (Default:
+            config.GAME_ARCHIVE_INTERVAL_SECONDS)
+        archive_after_seconds (float): Inactivity before a finished game is archived, 0 disables the archival (Default:
+            config.GAME_ARCHIVE_AFTER_SECONDS)
+        retention_seconds (float): Inactivity before an unfinished game is deleted, 0 disables the expiry (Default:
+            config.GAME_RETENTION_SECONDS)
+        batch_size (int): Games moved or deleted by batch (Default: config.GAME_ARCHIVE_BATCH_SIZE)
+        clock (Callable[[], float]): Time source (Default: time.time)
+
+    Attributes:
+        on_expired (Union[Callable[[str], None], None]): Called with the id of every abandoned game deleted, e.g. to
+            tell the lobby. The archived games are still served from the archive collection
+        sweeps (int): Sweeps run by this worker
+        archived (int): Games archived by this worker
+        expired (int): Games deleted by this worker
+        errors (int): Sweeps that failed
+        last_sweep_seconds (float): Duration of the last sweep
+    """
+
+    def __init__(self, interval_seconds: float = GAME_ARCHIVE_INTERVAL_SECONDS,
+                 archive_after_seconds: float = GAME_ARCHIVE_AFTER_SECONDS,
+                 retention_seconds: float = GAME_RETENTION_SECONDS, batch_size: int = GAME_ARCHIVE_BATCH_SIZE,
+                 clock: Callable[[], float] = time.time):
+        self.interval_seconds = interval_seconds
+        self.archive_after_seconds = archive_after_seconds
+        self.retention_seconds = retention_seconds
+        self.batch_size = batch_size
+        self.on_expired: Union[Callable[[str], None], None] = None
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__sweep_lock = threading.Lock()
+        self.__pid: Union[int, None] = None
+        self.__thread: Union[threading.Thread, None] = None
+        self.sweeps = 0
+        self.archived = 0
+        self.expired = 0
+        self.errors = 0
+        self.last_sweep_seconds = 0.0
+
+    def start(self) -> None:
+        """
+        Starts the sweeps thread of this process if it's not running, cheap enough to be called by every request
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if self.__pid == os.getpid() or self.interval_seconds <= 0:
+            return
+        with self.__lock:
+            if self.__pid == os.getpid():
+                return
+            # A forked worker doesn't inherit the thread of its parent
+            self.__pid = os.getpid()
+            self.__thread = threading.Thread(target=self.__run, args=(self.__pid,), name='game-archiver', daemon=True)
+            self.__thread.start()
+
+    def __run(self, pid: int) -> None:
+        while pid == self.__pid:
+            # The jitter spreads the sweeps of the workers started together
+            time.sleep(self.interval_seconds * random.uniform(0.5, 1.5))
+            try:
+                self.sweep()
+            except Exception:
+                with self.__lock:
+                    self.errors += 1
+                traceback.print_exc()
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Archives and expires the inactive games, batch after batch until none is left
+
+        Args:
+            None
+
+        Returns:
+            Dict[str, int]: Number of games archived and expired
+        """
+        with self.__sweep_lock:
+            start = time.perf_counter()
+            now = self.__clock()
+            archived = expired = 0
+            if self.archive_after_seconds > 0:
+                archived = self.__remove_batches(server.archive_finished_games, now - self.archive_after_seconds)
+            if self.retention_seconds > 0:
+                expired = self.__remove_batches(server.expire_abandoned_games, now - self.retention_seconds,
+                                                self.on_expired)
+            with self.__lock:
+                self.sweeps += 1
+                self.archived += archived
+                self.expired += expired
+                self.last_sweep_seconds = time.perf_counter() - start
+        return {'archived': archived, 'expired': expired}
+
+    def __remove_batches(self, remove: Callable[[float, int], List[str]], older_than: float,
+                         on_removed: Union[Callable[[str], None], None] = None) -> int:
+        num_removed = 0
+        while True:
+            ids_games = remove(older_than, self.batch_size)
+            num_removed += len(ids_games)
+            if on_removed is not None:
+                for id_game in ids_games:
+                    on_removed(id_game)
+            if len(ids_games) < self.batch_size:
+                return num_removed
+
+    def get_stats(self) -> Dict:
+        """
+        Gets the archiver counters of this worker
+
+        Args:
+            None
+
+        Returns:
+            Dict: Counters and duration of the last sweep
+        """
+        with self.__lock:
+            return {
+                'running': self.__pid == os.getpid(),
+                'sweeps': self.sweeps,
+                'archived': self.archived,
+                'expired': self.expired,
+                'errors': self.errors,
+                'last_sweep_ms': round(self.last_sweep_seconds * 1000, 3)
+            }
+
+
+archiver = GameArchiver()
@@ -0,0 +1,247 @@
+import os
+import time
+from typing import Any, Dict, List, Tuple
+from pymongo import ReplaceOne
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorCursor
+from config import MONGO_STR_CONNECTION, MONGO_DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE
+from config import MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS
+from .storage import DocumentNotFoundError
+
+
+class AsyncMongoManager:
+    """
+    asyncio counterpart of mongo_storage.MongoManager, owns the motor client of the process. The client is created on
+    the first use, inside the event loop of the ASGI server, and again after a fork
+    """
+    __client: AsyncIOMotorClient = None
+    __client_pid: int = None
+    __collections: Dict[str, AsyncIOMotorCollection] = {}
+
+    @staticmethod
+    def get_client() -> AsyncIOMotorClient:
+        """
+        Gets the process-wide motor client for connecting with the data base
+
+        Args:
+            None
+
+        Returns:
+            AsyncIOMotorClient: Instance for connecting with the data base
+        """
+        if AsyncMongoManager.__client is None or AsyncMongoManager.__client_pid != os.getpid():
+            AsyncMongoManager.__collections = {}
+            AsyncMongoManager.__client = AsyncIOMotorClient(MONGO_STR_CONNECTION,
+                                                            maxPoolSize=MONGO_MAX_POOL_SIZE,
+                                                            minPoolSize=MONGO_MIN_POOL_SIZE,
+                                                            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                                                            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS)
+            AsyncMongoManager.__client_pid = os.getpid()
+        return AsyncMongoManager.__client
+
+    @staticmethod
+    def get_game_collection(collection_name: str) -> AsyncIOMotorCollection:
+        """
+        Gets a database collection, the handles are cached
+
+        Args:
+            collection_name (str): Collection name
+
+        Returns:
+            AsyncIOMotorCollection: Database collection
+        """
+        client = AsyncMongoManager.get_client()
+        collection = AsyncMongoManager.__collections.get(collection_name)
+        if collection is None:
+            collection = client[MONGO_DB_NAME][collection_name]
+            AsyncMongoManager.__collections[collection_name] = collection
+        return collection
+
+    @staticmethod
+    async def ping() -> float:
+        """
+        Measures the round-trip time of a ping to the data base
+
+        Args:
+            None
+
+        Returns:
+            float: Round-trip time in seconds
+        """
+        client = AsyncMongoManager.get_client()
+        start = time.perf_counter()
+        await client.admin.command('ping')
+        return time.perf_counter() - start
+
+    @staticmethod
+    def close() -> None:
+        """
+        Closes the client, e.g. when the ASGI server shuts down
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        if AsyncMongoManager.__client is not None and AsyncMongoManager.__client_pid == os.getpid():
+            AsyncMongoManager.__client.close()
+        AsyncMongoManager.__client = None
+        AsyncMongoManager.__client_pid = None
+        AsyncMongoManager.__collections = {}
+
+
+async def find_one_by_id(id_document: str, collection_name: str, projection: Dict = None) -> Dict:
+    """
+    Gets a document given a id and a collection name
+
+    Args:
+        id_document (str): Mongo document identifier (_id)
+        collection_name (str): Collection to search the element
+        projection (Dict): Fields to return, e.g. {'_version': 1} (Default: the whole document)
+
+    Raises:
+        DocumentNotFoundError: If the element was not found
+
+    Returns:
+        Dict: Mongo document
+    """
+    collection = AsyncMongoManager.get_game_collection(collection_name)
+    document = await collection.find_one({'_id': id_document}, projection)
+    if not document:
+        raise DocumentNotFoundError(f'Game {id_document} not found on "{collection_name}" collection')
+    return document
+
+
+def find_many(query: Dict, collection_name: str, projection: Dict = None, sort: List[Tuple[str, int]] = None,
+              limit: int = 0) -> AsyncIOMotorCursor:
+    """
+    Gets the documents from a collection that match a query
+
+    Args:
+        query (Dict): Mongo query, e.g. {'_finished': True}
+        collection_name (str): Collection to search the elements
+        projection (Dict): Fields to return, e.g. {'_id': 1} (Default: the whole documents)
+        sort (List[Tuple[str, int]]): Sort keys and directions, e.g. [('_created_date', pymongo.DESCENDING)]
+        limit (int): Maximum number of documents (Default: 0, no limit)
+
+    Returns:
+        AsyncIOMotorCursor: Motor cursor, iterated with async for
+    """
+    collection = AsyncMongoManager.get_game_collection(collection_name)
+    return collection.find(query, projection, sort=sort, limit=limit)
+
+
+async def create_index(keys: List[Tuple[str, int]], collection_name: str, **kwargs: Any) -> str:
+    """
+    Creates an index on a collection if it doesn't exist yet
+
+    Args:
+        keys (List[Tuple[str, int]]): Indexed fields and directions, e.g. [('_finished', pymongo.ASCENDING)]
+        collection_name (str): Collection to index
+        kwargs (Any): Index options, e.g. name
+
+    Returns:
+        str: Index name
+    """
+    collection = AsyncMongoManager.get_game_collection(collection_name)
+    return await collection.create_index(keys, **kwargs)
+
+
+async def add_one(document: Dict, collection_name: str) -> None:
+    """
+    Insets a new document into a collection
+
+    Args:
+        document (Dict): Document to save
+        collection_name (str): Collection to search the element
+
+    Returns:
+        None
+    """
+    collection = AsyncMongoManager.get_game_collection(collection_name)
+    await collection.insert_one(document)
+
+
+async def add_many(documents: List[Dict], collection_name: str) -> None:
+    """
+    Inserts several new documents into a collection with a single insert_many
+
+    Args:
+        documents (List[Dict]): Documents to save
+        collection_name (str): Collection of the documents
+
+    Returns:
+        None
+    """
+    if documents:
+        collection = AsyncMongoManager.get_game_collection(collection_name)
+        await collection.insert_many(documents)
+
+
+async def save_many(documents: List[Dict], collection_name: str) -> None:
+    """
+    Inserts several documents into a collection, replacing the documents with the same _id
+
+    Args:
+        documents (List[Dict]): Documents to save
+        collection_name (str): Collection of the documents
+
+    Returns:
+        None
+    """
+    if documents:
+        collection = AsyncMongoManager.get_game_collection(collection_name)
+        requests = [ReplaceOne({'_id': document['_id']}, document, upsert=True) for document in documents]
+        await collection.bulk_write(requests, ordered=False)
+
+
+async def apply_update_by_id(id_document: str, operators: Dict, collection_name: str,
+                             conditions: Dict = None) -> bool:
+    """
+    Applies update operators (e.g. $set, $inc) to a document in a collection
+
+    Args:
+        id_document (str): Mongo document identifier (_id)
+        operators (Dict): Update operators, e.g. {'$set': {'a.b': 1}, '$inc': {'c': 1}}
+        collection_name (str): Collection to search the element
+        conditions (Dict): Extra conditions the document must meet to be updated, e.g. {'_version': 3} for a
+            compare-and-swap
+
+    Returns:
+        bool: Whether a document matched the id and the conditions
+    """
+    collection = AsyncMongoManager.get_game_collection(collection_name)
+    query = {'_id': id_document, **(conditions or dict())}
+    result = await collection.update_one(query, operators, upsert=False)
+    return result.matched_count == 1
+
+
+async def delete_one_by_id(id_document: str, collection_name: str) -> None:
+    """
+    Removes a game from the database
+
+    Args:
+        id_document (str): Mongo document identifier (_id)
+        collection_name (str): Collection to search the element
+
+    Returns:
+        None
+    """
+    collection = AsyncMongoManager.get_game_collection(collection_name)
+    await collection.delete_one({'_id': id_document})
+
+
+async def delete_many(query: Dict, collection_name: str) -> int:
+    """
+    Removes the documents of a collection that match a query
+
+    Args:
+        query (Dict): Mongo query, e.g. {'_id_game': 'a1b2'}
+        collection_name (str): Collection of the documents
+
+    Returns:
+        int: Number of removed documents
+    """
+    collection = AsyncMongoManager.get_game_collection(collection_name)
+    result = await collection.delete_many(query)
+    return result.deleted_count
@@ -0,0 +1,342 @@
+from typing import Any, AsyncIterator, Callable, Dict, List, Tuple, Union
+from App.models import InteractiveGame
+from config import GAME_CACHE_VERIFY_VERSION
+from . import async_db
+from .server import ARCHIVE_COLLECTION, COLLECTION_INDEXES, GAME_COLLECTION, HISTORY_COLLECTION, HISTORY_SORT
+from .server import LIST_SORT, MAX_UPDATE_RETRIES, VERSION_FIELD, ConcurrentUpdateError
+from .server import build_archive_projection, build_history_writes, build_list_projection, build_page_query
+from .server import build_save_operators, build_version_condition, game_cache, get_page_key, mark_game_saved
+from .server import prepare_new_documents, release_game, response_cache, trim_listed_game
+from .storage import DocumentNotFoundError
+
+# asyncio counterpart of App.database.server used by the Quart controller. The update operators, listing queries,
+# indexes and the game cache are shared with the synchronous server, only the database round trips are awaited
+
+
+async def delete_game(id_game: str) -> None:
+    """
+    Removes a game from the database
+
+    Args:
+        id_game (str): models id
+
+    Returns:
+        None
+    """
+    game_cache.invalidate(id_game)
+    response_cache.invalidate(id_game)
+    await async_db.delete_one_by_id(id_game, GAME_COLLECTION)
+    await async_db.delete_one_by_id(id_game, ARCHIVE_COLLECTION)
+    await async_db.delete_many({'_id_game': id_game}, HISTORY_COLLECTION)
+
+
+async def update_game(game: InteractiveGame, fields_to_update: List[str] = None) -> None:
+    """
+    Updates a game database document with a compare-and-swap on its version, see server.update_game
+
+    Args:
+        game (InteractiveGame): Game instance
+        fields_to_update (List[str]): List of fields to rewrite completely instead of writing the tracked changes
+
+    Raises:
+        ConcurrentUpdateError: When the document version is not the version of the game anymore
+
+    Returns:
+        None
+    """
+    id_game = game.get_id()
+    game_cache.invalidate(id_game)
+    operators = build_save_operators(game, fields_to_update)
+    moved_turns, new_turns = build_history_writes(game)
+    await async_db.save_many(moved_turns, HISTORY_COLLECTION)
+    if operators and not await async_db.apply_update_by_id(id_game, operators, GAME_COLLECTION,
+                                                           build_version_condition(game)):
+        raise ConcurrentUpdateError(f'Game {id_game} was updated by another request')
+    await async_db.save_many(new_turns, HISTORY_COLLECTION)
+    mark_game_saved(game, operators)
+
+
+async def apply_game_action(id_game: str, action: Callable[[InteractiveGame], Any],
+                            max_retries: int = MAX_UPDATE_RETRIES) -> Tuple[InteractiveGame, Any]:
+    """
+    Loads a game, applies an action that changes it and saves it, retrying on conflicts, see server.apply_game_action
+
+    Args:
+        id_game (str): Game id
+        action (Callable[[InteractiveGame], Any]): Changes the game, its exceptions are not retried
+        max_retries (int): Times the action is applied again after a conflict
+
+    Raises:
+        ConcurrentUpdateError: When every attempt found a conflict
+
+    Returns:
+        Tuple[InteractiveGame, Any]: Saved game and the value returned by the action
+    """
+    for _ in range(max_retries + 1):
+        game = await get_game(id_game)
+        try:
+            result = action(game)
+        except Exception:
+            release_game(game)
+            raise
+        try:
+            await update_game(game)
+            return game, result
+        except ConcurrentUpdateError:
+            continue
+    raise ConcurrentUpdateError(f'Game {id_game} was updated by other requests {max_retries + 1} times, try again')
+
+
+async def add_game(game: InteractiveGame) -> None:
+    """
+    Creates a new game document and saves it to the database
+
+    Args:
+        game (InteractiveGame): game instance
+
+    Returns:
+        None
+    """
+    document = game.to_document()
+    await async_db.add_many(prepare_new_documents([document]), HISTORY_COLLECTION)
+    await async_db.add_one(document, GAME_COLLECTION)
+    mark_game_saved(game, dict())
+
+
+async def add_game_documents(documents: List[Dict]) -> List[str]:
+    """
+    Saves the documents of several new games with a single insert, see server.add_game_documents
+
+    Args:
+        documents (List[Dict]): New game documents, their history is moved to the history documents
+
+    Returns:
+        List[str]: Ids of the saved games
+    """
+    history = prepare_new_documents(documents)
+    await async_db.add_many(history, HISTORY_COLLECTION)
+    await async_db.add_many(documents, GAME_COLLECTION)
+    return [document['_id'] for document in documents]
+
+
+async def ensure_indexes() -> None:
+    """
+    Creates the indexes used by the game and history queries
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    for collection_name, indexes in COLLECTION_INDEXES.items():
+        for name, keys in indexes.items():
+            await async_db.create_index(keys, collection_name, name=name)
+
+
+async def find_games(query: Dict, only_id: bool, fields: List[str] = None, limit: int = 0,
+                     after: Tuple[float, str] = None, archived: bool = False) -> AsyncIterator[Union[str, Dict]]:
+    """
+    Finds a page of games, see server.find_games
+
+    Args:
+        query (Dict): Mongo query
+        only_id (bool): Flag to return only the id of the games
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
+        archived (bool): Flag to merge the page of the archive collection with the page of the game collection
+
+    Returns:
+        AsyncIterator[Union[str, Dict]]: Game ids or documents, read from the cursor while iterating
+    """
+    page_query = build_page_query(query, after)
+    if not archived:
+        cursor = async_db.find_many(page_query, GAME_COLLECTION, build_list_projection(only_id, fields), LIST_SORT,
+                                    limit)
+        async for raw_game in cursor:
+            yield raw_game['_id'] if only_id else raw_game
+        return
+    projection = build_archive_projection(only_id, fields)
+    pages = [async_db.find_many(page_query, collection_name, projection, LIST_SORT, limit)
+             for collection_name in [GAME_COLLECTION, ARCHIVE_COLLECTION]]
+    async for raw_game in merge_pages(pages, limit):
+        yield trim_listed_game(raw_game, only_id, fields)
+
+
+async def merge_pages(pages: List[AsyncIterator[Dict]], limit: int = 0) -> AsyncIterator[Dict]:
+    """
+    Merges the pages of the game and archive collections, see server.merge_pages
+
+    Args:
+        pages (List[AsyncIterator[Dict]]): Game documents of each collection, with their _created_date
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+
+    Returns:
+        AsyncIterator[Dict]: Game documents, newest first
+    """
+    cursors = [page.__aiter__() for page in pages]
+    heads = [await read_next(cursor) for cursor in cursors]
+    num_games = 0
+    last_id = None
+    while any(head is not None for head in heads):
+        index = max((i for i, head in enumerate(heads) if head is not None), key=lambda i: get_page_key(heads[i]))
+        raw_game = heads[index]
+        heads[index] = await read_next(cursors[index])
+        if raw_game['_id'] == last_id:
+            continue
+        last_id = raw_game['_id']
+        yield raw_game
+        num_games += 1
+        if num_games == limit:
+            return
+
+
+async def read_next(cursor: AsyncIterator[Dict]) -> Union[Dict, None]:
+    """
+    Reads the next document of a cursor
+
+    Args:
+        cursor (AsyncIterator[Dict]): Cursor
+
+    Returns:
+        Union[Dict, None]: Next document, None when the cursor is exhausted
+    """
+    try:
+        return await cursor.__anext__()
+    except StopAsyncIteration:
+        return None
+
+
+def get_games(finished: Union[bool, None], only_id: bool = True, fields: List[str] = None, limit: int = 0,
+              after: Tuple[float, str] = None) -> AsyncIterator[Union[str, Dict]]:
+    """
+    Gets a page of games, filtered by status when finished is not None
+
+    Args:
+        finished (Union[bool, None]): Games status to list, None for all the games
+        only_id (bool): Flag to return only the id of the games
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
+
+    Returns:
+        AsyncIterator[Union[str, Dict]]: Game ids or documents, newest first. The finished games include the archived
+            ones
+    """
+    query = dict() if finished is None else {'_finished': finished}
+    return find_games(query, only_id, fields, limit, after, archived=finished is not False)
+
+
+async def get_game(id_game: str, current_version: int = None) -> InteractiveGame:
+    """
+    Gets a game_instance from the cache or from the database, see server.get_game. The game is checked out of the
+    cache until it's saved with update_game or given back with server.release_game. Its history is not read, see
+    load_game_history
+
+    Args:
+        id_game (str): Player id
+        current_version (int): Version just read with get_game_version, so it's not read again (Default: read it)
+
+    Returns:
+        InteractiveGame: Games instance
+    """
+    instance = game_cache.lookup(id_game)
+    if instance is not None and GAME_CACHE_VERIFY_VERSION:
+        if current_version is None:
+            current_version = await get_game_version(id_game)
+        instance = game_cache.confirm(instance, True, current_version)
+    else:
+        instance = game_cache.confirm(instance)
+    if instance is not None:
+        return instance
+    raw_game = await find_game_document(id_game)
+    instance = InteractiveGame.from_document(raw_game, history_loader=raise_history_not_loaded)
+    return instance
+
+
+def raise_history_not_loaded() -> None:
+    """
+    History loader of the games built by get_game: the history can't be read synchronously from the event loop
+
+    Args:
+        None
+
+    Raises:
+        Exception: Always, load_game_history must be awaited before reading the history
+
+    Returns:
+        None
+    """
+    raise Exception('The game history is not loaded, await async_server.load_game_history first')
+
+
+async def load_game_history(game: InteractiveGame) -> None:
+    """
+    Reads the saved history of a game built by get_game, if it wasn't read yet, see server.load_history. The history
+    of an event-sourced game is rebuilt replaying its events instead, when it's needed
+
+    Args:
+        game (InteractiveGame): Game instance
+
+    Returns:
+        None
+    """
+    if not game.is_history_loaded() and not game.is_event_sourced():
+        cursor = async_db.find_many({'_id_game': game.get_id()}, HISTORY_COLLECTION, sort=HISTORY_SORT)
+        game.merge_loaded_history({raw_turn['_turn']: raw_turn['details'] async for raw_turn in cursor})
+
+
+async def get_game_version(id_game: str) -> Union[int, None]:
+    """
+    Gets the version of a game document reading only its version field
+
+    Args:
+        id_game (str): Game id
+
+    Returns:
+        Union[int, None]: Document version, None if the game no longer exists
+    """
+    try:
+        raw_game = await find_game_document(id_game, {VERSION_FIELD: 1})
+    except DocumentNotFoundError:
+        return None
+    return raw_game.get(VERSION_FIELD, 0)
+
+
+async def find_game_document(id_game: str, projection: Dict = None) -> Dict:
+    """
+    Reads a game document from the game collection, or from the archive collection once the game was archived, see
+    server.find_game_document
+
+    Args:
+        id_game (str): Game id
+        projection (Dict): Fields to return, e.g. {'_version': 1} (Default: the whole document)
+
+    Raises:
+        DocumentNotFoundError: If the game is in neither collection
+
+    Returns:
+        Dict: Game document
+    """
+    try:
+        return await async_db.find_one_by_id(id_game, GAME_COLLECTION, projection)
+    except DocumentNotFoundError:
+        return await async_db.find_one_by_id(id_game, ARCHIVE_COLLECTION, projection)
+
+
+async def get_games_versions(finished: Union[bool, None], limit: int = 0,
+                             after: Tuple[float, str] = None) -> List[Tuple[str, int]]:
+    """
+    Gets the id and the version of the games of a page, see server.get_games_versions
+
+    Args:
+        finished (Union[bool, None]): Games status to list, None for all the games
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
+
+    Returns:
+        List[Tuple[str, int]]: Game ids and versions, newest first
+    """
+    raw_games = get_games(finished, False, [VERSION_FIELD], limit, after)
+    return [(raw_game['_id'], raw_game.get(VERSION_FIELD, 0)) async for raw_game in raw_games]
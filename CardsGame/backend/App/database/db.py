@@ -1,67 +1,105 @@
-import pymongo
-from typing import Dict
-from pymongo import MongoClient
-from pymongo.collection import Collection
-from pymongo.cursor import Cursor
-from config import MONGO_STR_CONNECTION, MONGO_DB_NAME
+import threading
+from typing import Any, Dict, Iterator, List, Tuple
+from config import STORAGE_BACKEND
+from .mongo_storage import MongoStorage
+from .storage import STORAGE_BACKENDS, STORAGE_MEMORY, STORAGE_MONGO, STORAGE_SQLITE, Storage
+from .storage import DocumentNotFoundError
 
+_storage: Storage = None
+_storage_lock = threading.Lock()
 
-class MongoManager:
-    __client = None
 
-    @staticmethod
-    def get_client() -> MongoClient:
-        """
-        Gets a MongoClient instance for connecting with the data base
+def create_storage(backend: str = STORAGE_BACKEND) -> Storage:
+    """
+    Creates the storage of a backend, the embedded ones are imported only when selected
+
+    Args:
+        backend (str): 'mongo', 'memory' or 'sqlite'
 
-        Args:
-            None
+    Raises:
+        Exception: If the backend doesn't exist
+
+    Returns:
+        Storage: Storage instance
+    """
+    if backend == STORAGE_MONGO:
+        return MongoStorage()
+    elif backend == STORAGE_MEMORY:
+        from .memory_storage import MemoryStorage
+        return MemoryStorage()
+    elif backend == STORAGE_SQLITE:
+        from .sqlite_storage import SQLiteStorage
+        return SQLiteStorage()
+    raise Exception(f'Invalid storage backend "{backend}", expected one of {STORAGE_BACKENDS}')
 
-        Returns:
-            MongoClient: Instance for connecting with the data base
-        """
-        if not MongoManager.__client:
-            __client = pymongo.MongoClient(MONGO_STR_CONNECTION)
-        return __client
 
-    @staticmethod
-    def get_game_collection(collection_name: str) -> Collection:
-        """
-        Gets a database collection
+def get_storage() -> Storage:
+    """
+    Gets the storage of the process, created on the first use from config.STORAGE_BACKEND
 
-        Args:
-            collection_name (str): Collection name
+    Args:
+        None
 
-        Returns:
-            Collection: Database collection
-        """
-        client = MongoManager.get_client()
-        db = client[MONGO_DB_NAME]
-        return db[collection_name]
+    Returns:
+        Storage: Storage instance
+    """
+    global _storage
+    if _storage is None:
+        with _storage_lock:
+            if _storage is None:
+                _storage = create_storage()
+    return _storage
 
 
-def find_one_by_id(id_document: str, collection_name: str) -> Dict:
+def set_storage(storage: Storage) -> None:
+    """
+    Replaces the storage of the process, e.g. to compare backends in a benchmark
+
+    Args:
+        storage (Storage): Storage instance
+
+    Returns:
+        None
+    """
+    global _storage
+    _storage = storage
+
+
+def warm_up() -> float:
+    """
+    Connects to the storage before serving requests, so the first requests don't pay the connection setup
+
+    Args:
+        None
+
+    Returns:
+        float: Round-trip time of a ping in seconds
+    """
+    return get_storage().ping()
+
+
+def find_one_by_id(id_document: str, collection_name: str, projection: Dict = None) -> Dict:
     """
     Gets a document given a id and a collection name
 
     Args:
         id_document (str): Mongo document identifier (_id)
         collection_name (str): Collection to search the element
+        projection (Dict): Fields to return, e.g. {'_version': 1} (Default: the whole document)
 
     Raises:
-        Exception: If the element was not found
+        DocumentNotFoundError: If the element was not found
 
     Returns:
         Dict: Mongo document
     """
-    collection = MongoManager.get_game_collection(collection_name)
-    document = collection.find_one({'_id': id_document})
+    document = get_storage().find_one(collection_name, {'_id': id_document}, projection)
     if not document:
-        raise Exception(f'Game {id_document} not found on "{collection_name}" collection')
+        raise DocumentNotFoundError(f'Game {id_document} not found on "{collection_name}" collection')
     return document
 
 
-def find_all(collection_name: str) -> Cursor:
+def find_all(collection_name: str) -> Iterator[Dict]:
     """
     Gets all the documents from a collection
 
@@ -69,11 +107,58 @@ def find_all(collection_name: str) -> Cursor:
         collection_name (str): Collection to search the element
 
     Returns:
-        Cursor: Mongo cursor
+        Iterator[Dict]: Documents, a Mongo cursor on the mongo storage
+    """
+    return get_storage().find(collection_name, dict())
+
+
+def find_many(query: Dict, collection_name: str, projection: Dict = None, sort: List[Tuple[str, int]] = None,
+              limit: int = 0) -> Iterator[Dict]:
+    """
+    Gets the documents from a collection that match a query
+
+    Args:
+        query (Dict): Mongo query, e.g. {'_finished': True}
+        collection_name (str): Collection to search the elements
+        projection (Dict): Fields to return, e.g. {'_id': 1} (Default: the whole documents)
+        sort (List[Tuple[str, int]]): Sort keys and directions, e.g. [('_created_date', pymongo.DESCENDING)]
+        limit (int): Maximum number of documents (Default: 0, no limit)
+
+    Returns:
+        Iterator[Dict]: Documents, a Mongo cursor on the mongo storage
     """
-    collection = MongoManager.get_game_collection(collection_name)
-    cursor = collection.find({})
-    return cursor
+    return get_storage().find(collection_name, query, projection, sort, limit)
+
+
+def create_index(keys: List[Tuple[str, int]], collection_name: str, **kwargs: Any) -> str:
+    """
+    Creates an index on a collection if it doesn't exist yet
+
+    Args:
+        keys (List[Tuple[str, int]]): Indexed fields and directions, e.g. [('_finished', pymongo.ASCENDING)]
+        collection_name (str): Collection to index
+        kwargs (Any): Index options, e.g. name
+
+    Returns:
+        str: Index name
+    """
+    return get_storage().create_index(collection_name, keys, kwargs.get('name') or '_'.join(
+        f'{field}_{direction}' for field, direction in keys))
+
+
+def set_many_by_id(updates: Dict[str, Dict], collection_name: str) -> int:
+    """
+    Sets fields on several documents with a single bulk write (a single transaction on the sqlite storage)
+
+    Args:
+        updates (Dict[str, Dict]): Fields to set by document identifier (_id)
+        collection_name (str): Collection of the documents
+
+    Returns:
+        int: Number of updated documents
+    """
+    operators = {id_document: {'$set': fields} for id_document, fields in updates.items()}
+    return get_storage().update_many_by_id(collection_name, operators)
 
 
 def add_one(document: Dict, collection_name: str) -> None:
@@ -87,8 +172,35 @@ def add_one(document: Dict, collection_name: str) -> None:
     Returns:
         None
     """
-    collection = MongoManager.get_game_collection(collection_name)
-    collection.insert_one(document)
+    get_storage().insert_one(collection_name, document)
+
+
+def add_many(documents: List[Dict], collection_name: str) -> None:
+    """
+    Inserts several new documents into a collection with a single insert_many
+
+    Args:
+        documents (List[Dict]): Documents to save
+        collection_name (str): Collection of the documents
+
+    Returns:
+        None
+    """
+    get_storage().insert_many(collection_name, documents)
+
+
+def save_many(documents: List[Dict], collection_name: str) -> None:
+    """
+    Inserts several documents into a collection, replacing the documents with the same _id
+
+    Args:
+        documents (List[Dict]): Documents to save
+        collection_name (str): Collection of the documents
+
+    Returns:
+        None
+    """
+    get_storage().replace_many(collection_name, documents)
 
 
 def update_one_by_id(id_document: str, dict_updates: Dict, collection_name: str) -> None:
@@ -103,10 +215,26 @@ def update_one_by_id(id_document: str, dict_updates: Dict, collection_name: str)
     Returns:
         None
     """
-    collection = MongoManager.get_game_collection(collection_name)
-    query = {'_id': id_document}
-    updates = {'$set': dict_updates}
-    collection.update_one(query, updates, upsert=False)
+    get_storage().update_one(collection_name, {'_id': id_document}, {'$set': dict_updates})
+
+
+def apply_update_by_id(id_document: str, operators: Dict, collection_name: str,
+                       conditions: Dict = None) -> bool:
+    """
+    Applies update operators (e.g. $set, $inc) to a document in a collection
+
+    Args:
+        id_document (str): Mongo document identifier (_id)
+        operators (Dict): Update operators, e.g. {'$set': {'a.b': 1}, '$inc': {'c': 1}}
+        collection_name (str): Collection to search the element
+        conditions (Dict): Extra conditions the document must meet to be updated, e.g. {'_version': 3} for a
+            compare-and-swap
+
+    Returns:
+        bool: Whether a document matched the id and the conditions
+    """
+    query = {'_id': id_document, **(conditions or dict())}
+    return get_storage().update_one(collection_name, query, operators)
 
 
 def delete_one_by_id(id_document: str, collection_name: str) -> None:
@@ -120,6 +248,18 @@ def delete_one_by_id(id_document: str, collection_name: str) -> None:
     Returns:
         None
     """
-    collection = MongoManager.get_game_collection(collection_name)
-    collection.delete_one({'_id': id_document})
+    get_storage().delete_one(collection_name, {'_id': id_document})
+
 
+def delete_many(query: Dict, collection_name: str) -> int:
+    """
+    Removes the documents of a collection that match a query
+
+    Args:
+        query (Dict): Mongo query, e.g. {'_id_game': 'a1b2'}
+        collection_name (str): Collection of the documents
+
+    Returns:
+        int: Number of removed documents
+    """
+    return get_storage().delete_many(collection_name, query)
@@ -0,0 +1,218 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, NamedTuple, Union
+from App.models import InteractiveGame
+
+# Approximate memory held by a cached game, measured with tracemalloc on games decoded from BSON
+GAME_BASE_BYTES = 6144
+HISTORY_TURN_BYTES = 1088
+
+
+def estimate_game_size(game: InteractiveGame) -> int:
+    """
+    Estimates the memory held by a game instance. The cards are flyweights, so the size is dominated by the history
+    turns held in memory (a lazily loaded history counts once it has been read)
+
+    Args:
+        game (InteractiveGame): Game instance
+
+    Returns:
+        int: Approximate size in bytes
+    """
+    return GAME_BASE_BYTES + HISTORY_TURN_BYTES * game.get_num_loaded_turns()
+
+
+class CacheEntry(NamedTuple):
+    """
+    Cached game
+
+    Attributes:
+        game (InteractiveGame): Game instance
+        size (int): Approximate size in bytes
+        expires_at (float): time.monotonic() after which the entry is discarded
+    """
+    game: InteractiveGame
+    size: int
+    expires_at: float
+
+
+class GameCache:
+    """
+    Bounded LRU cache of InteractiveGame instances keyed by game id, with a TTL and a memory budget. Games are checked
+    out: get removes the game from the cache, so two requests of the same worker never change the same instance, and
+    the game is put back once it has been saved (or released without changes)
+
+    Args:
+        max_entries (int): Maximum number of cached games
+        ttl_seconds (float): Seconds a game stays cached since it was stored
+        max_bytes (int): Memory budget, estimated with estimate_game_size
+        clock (Callable[[], float]): Time source (Default: time.monotonic)
+
+    Attributes:
+        hits (int): Games served from the cache
+        misses (int): Games not found in the cache
+        stale (int): Cached games discarded because the database has a newer version or no longer has the game
+        expirations (int): Cached games discarded by the TTL
+        evictions (int): Games discarded to respect max_entries or max_bytes
+        invalidations (int): Games discarded because they were updated or deleted
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, max_bytes: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.__clock = clock
+        self.__entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, id_game: str, current_version: Callable[[str], Union[int, None]] = None) \
+            -> Union[InteractiveGame, None]:
+        """
+        Checks out a cached game
+
+        Args:
+            id_game (str): Game id
+            current_version (Callable[[str], int]): Returns the version at the database of a game id (None if it
+                no longer exists). When provided, cached games with another version, or no longer saved, are discarded
+
+        Returns:
+            Union[InteractiveGame, None]: Cached game or None on a miss
+        """
+        game = self.lookup(id_game)
+        if game is None or current_version is None:
+            return self.confirm(game)
+        # The version is read outside of the lock, it's a database round trip
+        return self.confirm(game, True, current_version(id_game))
+
+    def lookup(self, id_game: str) -> Union[InteractiveGame, None]:
+        """
+        First half of get: checks out a game that is still valid without counting the hit yet, so the caller can
+        read its version from the database (e.g. with an async driver) and call confirm
+
+        Args:
+            id_game (str): Game id
+
+        Returns:
+            Union[InteractiveGame, None]: Cached game or None on a miss
+        """
+        with self.__lock:
+            if id_game not in self.__entries:
+                return None
+            entry = self.__remove(id_game)
+            if entry.expires_at <= self.__clock():
+                self.expirations += 1
+                return None
+            if entry.game.has_changes():
+                # A request changed the game but never saved it, the instance no longer matches the database
+                self.invalidations += 1
+                return None
+            return entry.game
+
+    def confirm(self, game: Union[InteractiveGame, None], verify: bool = False, current_version: int = None) \
+            -> Union[InteractiveGame, None]:
+        """
+        Second half of get: counts the hit or miss, discarding the game when its version is not the current one
+
+        Args:
+            game (InteractiveGame): Game returned by lookup
+            verify (bool): Flag to check current_version against the version of the game
+            current_version (int): Version at the database, None if the game no longer exists (e.g. deleted by
+                another worker)
+
+        Returns:
+            Union[InteractiveGame, None]: Cached game or None on a miss
+        """
+        with self.__lock:
+            if game is None:
+                self.misses += 1
+                return None
+            if verify and current_version != game.get_version():
+                # lookup already took the game out of the cache
+                self.stale += 1
+                self.misses += 1
+                return None
+            self.hits += 1
+            return game
+
+    def put(self, game: InteractiveGame) -> None:
+        """
+        Stores a game, evicting the least recently used games when the cache is full
+
+        Args:
+            game (InteractiveGame): Game instance without unsaved changes
+
+        Returns:
+            None
+        """
+        size = estimate_game_size(game)
+        if size > self.max_bytes or self.max_entries <= 0:
+            return
+        with self.__lock:
+            id_game = game.get_id()
+            if id_game in self.__entries:
+                self.__remove(id_game)
+            self.__entries[id_game] = CacheEntry(game, size, self.__clock() + self.ttl_seconds)
+            self.__size += size
+            while len(self.__entries) > self.max_entries or self.__size > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def invalidate(self, id_game: str) -> None:
+        """
+        Discards a cached game
+
+        Args:
+            id_game (str): Game id
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            if id_game in self.__entries:
+                self.__remove(id_game)
+                self.invalidations += 1
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Gets the cache counters, useful to size it
+
+        Args:
+            None
+
+        Returns:
+            Dict: Counters, current entries and estimated bytes
+        """
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.__entries),
+                'bytes': self.__size,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'stale': self.stale,
+                'expirations': self.expirations,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def __remove(self, id_game: str) -> CacheEntry:
+        entry = self.__entries.pop(id_game)
+        self.__size -= entry.size
+        return entry
@@ -0,0 +1,99 @@
+import copy
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple, Union
+from .query_engine import apply_update, match_document, project_document, sort_documents
+from .storage import STORAGE_MEMORY, Storage
+
+
+class MemoryStorage(Storage):
+    """
+    Storage kept in the memory of the process: no round trips, nothing is persisted and every worker has its own
+    games. Meant for development, single-process deployments and for measuring the overhead of the other storages.
+    Documents are copied on the way in and out, so callers never share them with the storage
+    """
+    name = STORAGE_MEMORY
+
+    def __init__(self):
+        self.__collections: Dict[str, Dict[str, Dict]] = {}
+        self.__lock = threading.RLock()
+
+    def __get_collection(self, collection_name: str) -> Dict[str, Dict]:
+        return self.__collections.setdefault(collection_name, dict())
+
+    def __find_documents(self, collection_name: str, query: Dict) -> List[Dict]:
+        collection = self.__get_collection(collection_name)
+        id_document = query.get('_id')
+        if isinstance(id_document, str):
+            document = collection.get(id_document)
+            return [document] if document is not None and match_document(document, query) else []
+        return [document for document in collection.values() if match_document(document, query)]
+
+    def find_one(self, collection_name: str, query: Dict, projection: Dict = None) -> Union[Dict, None]:
+        with self.__lock:
+            documents = self.__find_documents(collection_name, query)
+            return copy.deepcopy(project_document(documents[0], projection)) if documents else None
+
+    def find(self, collection_name: str, query: Dict, projection: Dict = None, sort: List[Tuple[str, int]] = None,
+             limit: int = 0) -> Iterator[Dict]:
+        with self.__lock:
+            documents = sort_documents(self.__find_documents(collection_name, query), sort)
+            if limit:
+                documents = documents[:limit]
+            documents = [copy.deepcopy(project_document(document, projection)) for document in documents]
+        return iter(documents)
+
+    def insert_one(self, collection_name: str, document: Dict) -> None:
+        with self.__lock:
+            collection = self.__get_collection(collection_name)
+            if document['_id'] in collection:
+                raise Exception(f'Duplicated _id {document["_id"]} on "{collection_name}" collection')
+            collection[document['_id']] = copy.deepcopy(document)
+
+    def insert_many(self, collection_name: str, documents: List[Dict]) -> None:
+        with self.__lock:
+            collection = self.__get_collection(collection_name)
+            ids = [document['_id'] for document in documents]
+            if len(set(ids)) != len(ids) or any(id_document in collection for id_document in ids):
+                raise Exception(f'Duplicated _id on "{collection_name}" collection')
+            collection.update(zip(ids, copy.deepcopy(documents)))
+
+    def update_one(self, collection_name: str, query: Dict, operators: Dict) -> bool:
+        with self.__lock:
+            documents = self.__find_documents(collection_name, query)
+            if not documents:
+                return False
+            apply_update(documents[0], copy.deepcopy(operators))
+            return True
+
+    def replace_many(self, collection_name: str, documents: List[Dict]) -> None:
+        with self.__lock:
+            collection = self.__get_collection(collection_name)
+            collection.update((document['_id'], document) for document in copy.deepcopy(documents))
+
+    def delete_one(self, collection_name: str, query: Dict) -> None:
+        with self.__lock:
+            documents = self.__find_documents(collection_name, query)
+            if documents:
+                del self.__get_collection(collection_name)[documents[0]['_id']]
+
+    def delete_many(self, collection_name: str, query: Dict) -> int:
+        with self.__lock:
+            collection = self.__get_collection(collection_name)
+            documents = self.__find_documents(collection_name, query)
+            for document in documents:
+                del collection[document['_id']]
+            return len(documents)
+
+    def create_index(self, collection_name: str, keys: List[Tuple[str, int]], name: str) -> str:
+        return name
+
+    def ping(self) -> float:
+        start = time.perf_counter()
+        with self.__lock:
+            pass
+        return time.perf_counter() - start
+
+    def get_stats(self) -> Dict:
+        with self.__lock:
+            return {name: len(collection) for name, collection in self.__collections.items()}
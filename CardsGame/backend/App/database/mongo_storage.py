@@ -0,0 +1,305 @@
+import os
+import threading
+import time
+import pymongo
+from typing import Dict, Iterator, List, Tuple, Union
+from pymongo import MongoClient, ReplaceOne, UpdateOne, monitoring
+from pymongo.collection import Collection
+from config import MONGO_STR_CONNECTION, MONGO_DB_NAME, MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE
+from config import MONGO_WAIT_QUEUE_TIMEOUT_MS, MONGO_SERVER_SELECTION_TIMEOUT_MS
+from .storage import STORAGE_MONGO, Storage
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Collects connection pool statistics from the pymongo monitoring events
+
+    Attributes:
+        open_connections (int): Connections currently open
+        checked_out (int): Connections currently in use
+        checkouts (int): Connections checked out since the client was created
+        checkout_failures (int): Failed checkouts (e.g. wait queue timeouts)
+        total_wait_seconds (float): Time spent waiting for a connection
+        max_wait_seconds (float): Longest wait for a connection
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.reset()
+
+    def reset(self) -> None:
+        with self.__lock:
+            self.open_connections = 0
+            self.checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.total_wait_seconds = 0.0
+            self.max_wait_seconds = 0.0
+
+    def get_stats(self) -> Dict:
+        """
+        Gets a snapshot of the pool statistics
+
+        Args:
+            None
+
+        Returns:
+            Dict: Pool statistics
+        """
+        with self.__lock:
+            return {
+                'open_connections': self.open_connections,
+                'checked_out': self.checked_out,
+                'checkouts': self.checkouts,
+                'checkout_failures': self.checkout_failures,
+                'avg_wait_ms': self.total_wait_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait_seconds * 1000
+            }
+
+    def __waited(self) -> float:
+        started = getattr(self.__local, 'started', None)
+        self.__local.started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def connection_check_out_started(self, event) -> None:
+        # The checkout starts and ends on the same thread
+        self.__local.started = time.perf_counter()
+
+    def connection_checked_out(self, event) -> None:
+        waited = self.__waited()
+        with self.__lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.total_wait_seconds += waited
+            self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+    def connection_check_out_failed(self, event) -> None:
+        self.__waited()
+        with self.__lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event) -> None:
+        with self.__lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event) -> None:
+        with self.__lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event) -> None:
+        with self.__lock:
+            self.open_connections -= 1
+
+    def connection_ready(self, event) -> None:
+        pass
+
+    def pool_created(self, event) -> None:
+        pass
+
+    def pool_ready(self, event) -> None:
+        pass
+
+    def pool_cleared(self, event) -> None:
+        pass
+
+    def pool_closed(self, event) -> None:
+        pass
+
+
+class MongoManager:
+    """
+    Owns the single MongoClient (and its connection pool) of the process. The client is created lazily and again
+    after a fork, pymongo clients must not be shared between a parent process and its children
+    """
+    __client: MongoClient = None
+    __client_pid: int = None
+    __collections: Dict[str, Collection] = {}
+    __lock = threading.Lock()
+    pool_stats = PoolStatsListener()
+
+    @staticmethod
+    def get_client() -> MongoClient:
+        """
+        Gets the process-wide MongoClient instance for connecting with the data base
+
+        Args:
+            None
+
+        Returns:
+            MongoClient: Instance for connecting with the data base
+        """
+        client = MongoManager.__client
+        if client is not None and MongoManager.__client_pid == os.getpid():
+            return client
+        with MongoManager.__lock:
+            if MongoManager.__client is None or MongoManager.__client_pid != os.getpid():
+                MongoManager.pool_stats.reset()
+                MongoManager.__collections = {}
+                MongoManager.__client = pymongo.MongoClient(MONGO_STR_CONNECTION,
+                                                            maxPoolSize=MONGO_MAX_POOL_SIZE,
+                                                            minPoolSize=MONGO_MIN_POOL_SIZE,
+                                                            waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                                                            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                                                            event_listeners=[MongoManager.pool_stats])
+                MongoManager.__client_pid = os.getpid()
+            return MongoManager.__client
+
+    @staticmethod
+    def get_game_collection(collection_name: str) -> Collection:
+        """
+        Gets a database collection, the handles are cached
+
+        Args:
+            collection_name (str): Collection name
+
+        Returns:
+            Collection: Database collection
+        """
+        client = MongoManager.get_client()
+        collection = MongoManager.__collections.get(collection_name)
+        if collection is None:
+            collection = client[MONGO_DB_NAME][collection_name]
+            MongoManager.__collections[collection_name] = collection
+        return collection
+
+    @staticmethod
+    def warm_up() -> float:
+        """
+        Connects to the data base before serving requests, so the first requests don't pay the connection setup
+
+        Args:
+            None
+
+        Returns:
+            float: Round-trip time of a ping in seconds
+        """
+        return MongoManager.ping()
+
+    @staticmethod
+    def ping() -> float:
+        """
+        Measures the round-trip time of a ping to the data base
+
+        Args:
+            None
+
+        Returns:
+            float: Round-trip time in seconds
+        """
+        client = MongoManager.get_client()
+        start = time.perf_counter()
+        client.admin.command('ping')
+        return time.perf_counter() - start
+
+    @staticmethod
+    def reset() -> None:
+        """
+        Forgets the current client (e.g. in a child process after a fork), a new one is created on the next use
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with MongoManager.__lock:
+            client = MongoManager.__client
+            owned = MongoManager.__client_pid == os.getpid()
+            MongoManager.__client = None
+            MongoManager.__client_pid = None
+            MongoManager.__collections = {}
+        # A client inherited through a fork belongs to the parent, closing it here could deadlock
+        if client is not None and owned:
+            client.close()
+
+    @classmethod
+    def reset_after_fork(cls) -> None:
+        """
+        Resets the manager in the child process of a fork: the locks are replaced, another thread of the parent may
+        have held them when it forked, and the client of the parent is forgotten
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        cls.__lock = threading.Lock()
+        cls.pool_stats = PoolStatsListener()
+        cls.reset()
+
+    @staticmethod
+    def get_pool_stats() -> Dict:
+        """
+        Gets the connection pool statistics of the process-wide client
+
+        Args:
+            None
+
+        Returns:
+            Dict: Pool statistics and configuration
+        """
+        return {
+            **MongoManager.pool_stats.get_stats(),
+            'max_pool_size': MONGO_MAX_POOL_SIZE,
+            'min_pool_size': MONGO_MIN_POOL_SIZE
+        }
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=MongoManager.reset_after_fork)
+
+
+class MongoStorage(Storage):
+    """
+    Storage backed by the process-wide pooled MongoClient of MongoManager
+    """
+    name = STORAGE_MONGO
+
+    def find_one(self, collection_name: str, query: Dict, projection: Dict = None) -> Union[Dict, None]:
+        return MongoManager.get_game_collection(collection_name).find_one(query, projection)
+
+    def find(self, collection_name: str, query: Dict, projection: Dict = None, sort: List[Tuple[str, int]] = None,
+             limit: int = 0) -> Iterator[Dict]:
+        return MongoManager.get_game_collection(collection_name).find(query, projection, sort=sort, limit=limit)
+
+    def insert_one(self, collection_name: str, document: Dict) -> None:
+        MongoManager.get_game_collection(collection_name).insert_one(document)
+
+    def insert_many(self, collection_name: str, documents: List[Dict]) -> None:
+        if documents:
+            MongoManager.get_game_collection(collection_name).insert_many(documents)
+
+    def update_one(self, collection_name: str, query: Dict, operators: Dict) -> bool:
+        result = MongoManager.get_game_collection(collection_name).update_one(query, operators, upsert=False)
+        return result.matched_count == 1
+
+    def update_many_by_id(self, collection_name: str, updates: Dict[str, Dict]) -> int:
+        if not updates:
+            return 0
+        requests = [UpdateOne({'_id': id_document}, operators) for id_document, operators in updates.items()]
+        return MongoManager.get_game_collection(collection_name).bulk_write(requests, ordered=False).matched_count
+
+    def replace_many(self, collection_name: str, documents: List[Dict]) -> None:
+        if documents:
+            requests = [ReplaceOne({'_id': document['_id']}, document, upsert=True) for document in documents]
+            MongoManager.get_game_collection(collection_name).bulk_write(requests, ordered=False)
+
+    def delete_one(self, collection_name: str, query: Dict) -> None:
+        MongoManager.get_game_collection(collection_name).delete_one(query)
+
+    def delete_many(self, collection_name: str, query: Dict) -> int:
+        return MongoManager.get_game_collection(collection_name).delete_many(query).deleted_count
+
+    def create_index(self, collection_name: str, keys: List[Tuple[str, int]], name: str) -> str:
+        return MongoManager.get_game_collection(collection_name).create_index(keys, name=name)
+
+    def ping(self) -> float:
+        return MongoManager.ping()
+
+    def get_stats(self) -> Dict:
+        return MongoManager.get_pool_stats()
+
+    def reset(self) -> None:
+        MongoManager.reset()
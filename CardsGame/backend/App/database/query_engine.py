@@ -0,0 +1,155 @@
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+# Evaluates the subset of the Mongo query, projection, sort and update syntax used by App.database.server on plain
+# documents, for the storages without a query language of their own (memory and the SQLite fallbacks)
+
+MISSING = object()
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '$eq': lambda value, operand: value == operand,
+    '$ne': lambda value, operand: value != operand,
+    '$lt': lambda value, operand: value is not None and value < operand,
+    '$lte': lambda value, operand: value is not None and value <= operand,
+    '$gt': lambda value, operand: value is not None and value > operand,
+    '$gte': lambda value, operand: value is not None and value >= operand,
+    '$in': lambda value, operand: value in operand,
+    '$nin': lambda value, operand: value not in operand
+}
+
+
+def get_path(document: Dict, path: str) -> Any:
+    """
+    Gets the value of a dotted path (e.g. '_history.3'), MISSING if the path doesn't exist
+
+    Args:
+        document (Dict): Document
+        path (str): Field path
+
+    Returns:
+        Any: Value of the field
+    """
+    value = document
+    for key in path.split('.'):
+        if not isinstance(value, dict) or key not in value:
+            return MISSING
+        value = value[key]
+    return value
+
+
+def match_condition(value: Any, condition: Any) -> bool:
+    """
+    Checks a field value against a query condition, a missing field compares as None
+
+    Args:
+        value (Any): Field value, MISSING if the field doesn't exist
+        condition (Any): Expected value or operators, e.g. {'$lt': 3}
+
+    Raises:
+        Exception: If an operator isn't supported
+
+    Returns:
+        bool: Whether the value meets the condition
+    """
+    if not (isinstance(condition, dict) and condition and all(key.startswith('$') for key in condition)):
+        return (None if value is MISSING else value) == condition
+    for operator, operand in condition.items():
+        if operator == '$exists':
+            if (value is not MISSING) != bool(operand):
+                return False
+            continue
+        compare = COMPARISONS.get(operator)
+        if compare is None:
+            raise Exception(f'Query operator {operator} is not supported')
+        if not compare(None if value is MISSING else value, operand):
+            return False
+    return True
+
+
+def match_document(document: Dict, query: Dict) -> bool:
+    """
+    Checks whether a document matches a Mongo query (field conditions, $and, $or)
+
+    Args:
+        document (Dict): Document
+        query (Dict): Mongo query
+
+    Returns:
+        bool: Whether the document matches
+    """
+    for key, condition in query.items():
+        if key == '$and':
+            matches = all(match_document(document, sub_query) for sub_query in condition)
+        elif key == '$or':
+            matches = any(match_document(document, sub_query) for sub_query in condition)
+        else:
+            matches = match_condition(get_path(document, key), condition)
+        if not matches:
+            return False
+    return True
+
+
+def project_document(document: Dict, projection: Dict = None) -> Dict:
+    """
+    Keeps the fields of an inclusion projection, the _id is always kept
+
+    Args:
+        document (Dict): Document
+        projection (Dict): Fields to return, e.g. {'_version': 1} (Default: the whole document)
+
+    Returns:
+        Dict: Projected document
+    """
+    if not projection:
+        return document
+    fields = [field for field, include in projection.items() if include]
+    return {field: document[field] for field in ['_id', *fields] if field in document}
+
+
+def sort_documents(documents: Iterable[Dict], sort: List[Tuple[str, int]] = None) -> List[Dict]:
+    """
+    Sorts documents by several keys, missing and None values go first like in Mongo
+
+    Args:
+        documents (Iterable[Dict]): Documents
+        sort (List[Tuple[str, int]]): Sort keys and directions, e.g. [('_created_date', -1)]
+
+    Returns:
+        List[Dict]: Sorted documents
+    """
+    documents = list(documents)
+    for field, direction in reversed(sort or []):
+        def sort_key(document: Dict) -> Tuple[bool, Any]:
+            value = get_path(document, field)
+            return (False, 0) if value is MISSING or value is None else (True, value)
+        documents.sort(key=sort_key, reverse=direction < 0)
+    return documents
+
+
+def apply_update(document: Dict, operators: Dict) -> None:
+    """
+    Applies $set, $inc and $unset operators (dotted paths allowed) to a document in place
+
+    Args:
+        document (Dict): Document
+        operators (Dict): Update operators, e.g. {'$set': {'a.b': 1}, '$inc': {'c': 1}, '$unset': {'d': ''}}
+
+    Raises:
+        Exception: If an operator isn't supported
+
+    Returns:
+        None
+    """
+    for operator, fields in operators.items():
+        if operator not in ['$set', '$inc', '$unset']:
+            raise Exception(f'Update operator {operator} is not supported')
+        for path, value in fields.items():
+            *parents, key = path.split('.')
+            target = document
+            for parent in parents:
+                target = target.setdefault(parent, dict())
+            if operator == '$set':
+                target[key] = value
+            elif operator == '$unset':
+                target.pop(key, None)
+            else:
+                target[key] = (target.get(key) or 0) + value
@@ -0,0 +1,134 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Union
+
+
+class CachedResponse(NamedTuple):
+    """
+    Rendered response of a game
+
+    Attributes:
+        version (int): Version of the game document the body was rendered from
+        body (bytes): Response body
+    """
+    version: int
+    body: bytes
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of the rendered GET /game/<id> responses, one by game keyed by its id and version: a cached body
+    is only served for the version it was rendered from, so saving a game never needs to invalidate it. Unlike the game
+    cache nothing is checked out, the bodies are immutable and shared by the requests
+
+    Args:
+        max_entries (int): Maximum number of cached responses
+        max_bytes (int): Maximum total size of the cached bodies
+
+    Attributes:
+        hits (int): Responses served from the cache
+        misses (int): Responses not cached or rendered from another version
+        evictions (int): Responses discarded to respect max_entries or max_bytes
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.__entries: OrderedDict[str, CachedResponse] = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, id_game: str, version: int) -> Union[bytes, None]:
+        """
+        Gets the cached body of a game version
+
+        Args:
+            id_game (str): Game id
+            version (int): Current version of the game document
+
+        Returns:
+            Union[bytes, None]: Response body or None on a miss
+        """
+        with self.__lock:
+            entry = self.__entries.get(id_game)
+            if entry is None or entry.version != version:
+                self.misses += 1
+                return None
+            self.__entries.move_to_end(id_game)
+            self.hits += 1
+            return entry.body
+
+    def put(self, id_game: str, version: int, body: bytes) -> None:
+        """
+        Stores the body of a game version, replacing the body of an older version
+
+        Args:
+            id_game (str): Game id
+            version (int): Version of the game document the body was rendered from
+            body (bytes): Response body
+
+        Returns:
+            None
+        """
+        if len(body) > self.max_bytes or self.max_entries <= 0:
+            return
+        with self.__lock:
+            entry = self.__entries.get(id_game)
+            if entry is not None and entry.version > version:
+                # A request rendered a newer version meanwhile
+                return
+            self.__remove(id_game)
+            self.__entries[id_game] = CachedResponse(version, body)
+            self.__size += len(body)
+            while len(self.__entries) > self.max_entries or self.__size > self.max_bytes:
+                self.__remove(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def invalidate(self, id_game: str) -> None:
+        """
+        Discards the cached body of a game, e.g. when it's deleted
+
+        Args:
+            id_game (str): Game id
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__remove(id_game)
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    def get_stats(self) -> Dict:
+        """
+        Gets the cache counters
+
+        Args:
+            None
+
+        Returns:
+            Dict: Counters, current entries and bytes
+        """
+        with self.__lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.__entries),
+                'bytes': self.__size,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+    def __remove(self, id_game: str) -> None:
+        entry = self.__entries.pop(id_game, None)
+        if entry is not None:
+            self.__size -= len(entry.body)
@@ -1,12 +1,61 @@
-from typing import Dict, List, Union
+import heapq
+import time
+import pymongo
+from typing import Any, Callable, Dict, Iterator, List, Tuple, Union
+from App.models import InteractiveGame
 from App.util.constants import CARDS_TO_USE
-from App.util.helpers import to_dict
-from App.models import InteractiveGame, Card, Deck
+from App.util.metrics import metrics
+from config import GAME_CACHE_MAX_ENTRIES, GAME_CACHE_TTL_SECONDS, GAME_CACHE_MAX_BYTES, GAME_CACHE_VERIFY_VERSION
+from config import GAME_SNAPSHOT_INTERVAL, RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES, GAME_ARCHIVE_BATCH_SIZE
 from . import db
-from termcolor import cprint
+from .game_cache import GameCache
+from .response_cache import ResponseCache
+from .storage import DocumentNotFoundError
 
 GAME_COLLECTION = 'Game'
-FIELDS_TO_UPDATE = ['_num_turns', '_deck_p1', '_deck_p2', '_current_target', '_hand_p1', '_hand_p2', '_history']
+# Append-only history, one document per turn: {'_id': '<id game>:<turn>', '_id_game', '_turn', 'details'}
+HISTORY_COLLECTION = 'GameHistory'
+HISTORY_FIELD = '_history'
+FIELDS_TO_UPDATE = ['_num_turns', '_deck_p1', '_deck_p2', '_current_target', '_hand_p1', '_hand_p2']
+DECK_FIELDS = ['_deck_p1', '_deck_p2']
+# Event-sourced games save their new events on every change and these fields as a snapshot from time to time
+EVENTS_FIELD = '_events'
+SNAPSHOT_FIELDS = ['_deck_p1', '_deck_p2', '_current_target', '_hand_p1', '_hand_p2', '_snapshot_event']
+VERSION_FIELD = '_version'
+# Derived fields saved with every change so the games can be listed by status without rebuilding them
+STATUS_FIELDS = ['_finished', '_winner', '_len_deck_p1', '_len_deck_p2']
+STATUS_INDEX = [('_finished', pymongo.ASCENDING), ('_created_date', pymongo.DESCENDING)]
+BACKFILL_BATCH_SIZE = 500
+# Listings, newest games first. The id breaks the ties of the keyset pagination
+SUMMARY_FIELDS = ['_id', '_name_p1', '_name_p2', '_created_date', '_num_turns', '_difficulty', *STATUS_FIELDS]
+LIST_SORT = [('_created_date', pymongo.DESCENDING), ('_id', pymongo.DESCENDING)]
+LIST_INDEX = LIST_SORT
+# Saved with every change (not part of the game document), the archiver finds the inactive games with it
+UPDATED_DATE_FIELD = '_updated_date'
+ACTIVITY_SORT = [(UPDATED_DATE_FIELD, pymongo.ASCENDING)]
+ACTIVITY_INDEX = [('_finished', pymongo.ASCENDING), *ACTIVITY_SORT]
+WINNER_INDEX = [('_winner', pymongo.ASCENDING), ('_created_date', pymongo.DESCENDING)]
+PLAYER_INDEX = [('_name_p1', pymongo.ASCENDING), ('_created_date', pymongo.DESCENDING)]
+INDEXES = {'status_created_date': STATUS_INDEX, 'created_date_id': LIST_INDEX, 'status_updated_date': ACTIVITY_INDEX,
+           'winner_created_date': WINNER_INDEX, 'name_p1_created_date': PLAYER_INDEX}
+HISTORY_INDEXES = {'game_turn': [('_id_game', pymongo.ASCENDING), ('_turn', pymongo.ASCENDING)]}
+# Cold storage of the finished games, with their history embedded, see archive_finished_games
+ARCHIVE_COLLECTION = 'GameArchive'
+ARCHIVE_INDEXES = {'created_date_id': LIST_INDEX, 'name_p1_created_date': PLAYER_INDEX}
+COLLECTION_INDEXES = {GAME_COLLECTION: INDEXES, HISTORY_COLLECTION: HISTORY_INDEXES,
+                      ARCHIVE_COLLECTION: ARCHIVE_INDEXES}
+HISTORY_SORT = [('_turn', pymongo.ASCENDING)]
+# Times a game action is replayed on a reloaded game when another request updated the game first
+MAX_UPDATE_RETRIES = 3
+
+game_cache = GameCache(GAME_CACHE_MAX_ENTRIES, GAME_CACHE_TTL_SECONDS, GAME_CACHE_MAX_BYTES)
+response_cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+
+class ConcurrentUpdateError(Exception):
+    """
+    The game was updated by another request since it was loaded
+    """
 
 
 def delete_game(id_game: str) -> None:
@@ -19,25 +68,300 @@ def delete_game(id_game: str) -> None:
     Returns:
         None
     """
+    game_cache.invalidate(id_game)
+    response_cache.invalidate(id_game)
     db.delete_one_by_id(id_game, GAME_COLLECTION)
+    db.delete_one_by_id(id_game, ARCHIVE_COLLECTION)
+    db.delete_many({'_id_game': id_game}, HISTORY_COLLECTION)
 
 
-def update_game(game: InteractiveGame, fields_to_update: List[str] = FIELDS_TO_UPDATE) -> None:
+def update_game(game: InteractiveGame, fields_to_update: List[str] = None) -> None:
     """
-    Updates a game database document
+    Updates a game database document. By default only the changes tracked by the game since it was loaded are
+    written: the turns increment and the decks/hands/target when they changed (the new events and the periodic
+    snapshot for an event-sourced game, see build_event_fields). The update is a compare-and-swap on
+    the document version: it's only applied if nobody updated the game since it was loaded, and it increments the
+    version. The new history turns are appended to the history collection once the swap succeeded: a request that
+    lost the swap would otherwise overwrite the turns of the winner, which have the same ids. If the history write
+    fails or the process dies after the swap, the game counts turns without details, the history is loaded without
+    them (see InteractiveGame.get_missing_turns). Then the saved game replaces the cached one
 
     Args:
         game (InteractiveGame): Game instance
-        fields_to_update (List[str]): List of fields to update
+        fields_to_update (List[str]): List of fields to rewrite completely instead of writing the tracked changes
+
+    Raises:
+        ConcurrentUpdateError: When the document version is not the version of the game anymore
 
     Returns:
         None
     """
     id_game = game.get_id()
-    game_dict = to_dict(game)
+    game_cache.invalidate(id_game)
+    with metrics.phase('encode'):
+        operators = build_save_operators(game, fields_to_update)
+        moved_turns, new_turns = build_history_writes(game)
+    with metrics.phase('db_write'):
+        if moved_turns:
+            db.save_many(moved_turns, HISTORY_COLLECTION)
+        saved = not operators or db.apply_update_by_id(id_game, operators, GAME_COLLECTION,
+                                                       build_version_condition(game))
+        if saved and new_turns:
+            db.save_many(new_turns, HISTORY_COLLECTION)
+    if not saved:
+        raise ConcurrentUpdateError(f'Game {id_game} was updated by another request')
+    mark_game_saved(game, operators)
+
+
+def apply_game_action(id_game: str, action: Callable[[InteractiveGame], Any],
+                      max_retries: int = MAX_UPDATE_RETRIES) -> Tuple[InteractiveGame, Any]:
+    """
+    Loads a game, applies an action that changes it (e.g. playing a turn) and saves it. When another request updated
+    the game in the meantime, the game is reloaded and the action applied again, up to max_retries times
+
+    Args:
+        id_game (str): Game id
+        action (Callable[[InteractiveGame], Any]): Changes the game, its exceptions are not retried
+        max_retries (int): Times the action is applied again after a conflict
+
+    Raises:
+        ConcurrentUpdateError: When every attempt found a conflict
+
+    Returns:
+        Tuple[InteractiveGame, Any]: Saved game and the value returned by the action
+    """
+    for _ in range(max_retries + 1):
+        game = get_game(id_game)
+        try:
+            with metrics.phase('game_action'):
+                result = action(game)
+        except Exception:
+            release_game(game)
+            raise
+        try:
+            update_game(game)
+            return game, result
+        except ConcurrentUpdateError:
+            continue
+    raise ConcurrentUpdateError(f'Game {id_game} was updated by other requests {max_retries + 1} times, try again')
+
+
+def build_version_condition(game: InteractiveGame) -> Dict:
+    """
+    Builds the condition of the compare-and-swap of update_game
+
+    Args:
+        game (InteractiveGame): Game instance
+
+    Returns:
+        Dict: Mongo condition on the document version
+    """
+    version = game.get_version()
+    # Games saved before the versions existed have no version field
+    return {VERSION_FIELD: {'$in': [version, None]} if version == 0 else version}
 
-    dict_updates = {field: game_dict[field] for field in fields_to_update}
-    db.update_one_by_id(id_game, dict_updates, GAME_COLLECTION)
+
+def build_history_documents(id_game: str, history: Dict[int, Dict[str, Any]]) -> List[Dict]:
+    """
+    Builds the documents of the history collection for some turns of a game
+
+    Args:
+        id_game (str): Game id
+        history (Dict[int, Dict[str, Any]]): Turn details by turn number
+
+    Returns:
+        List[Dict]: History documents
+    """
+    return [{'_id': f'{id_game}:{turn}', '_id_game': id_game, '_turn': int(turn), 'details': details}
+            for turn, details in history.items()]
+
+
+def build_history_writes(game: InteractiveGame) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Builds the history documents written by update_game: the turns of an embedded history moved to the history
+    collection (written before the compare-and-swap, they are already saved so rewriting them can't conflict) and
+    the new turns (written after it, only by the request that won the swap)
+
+    Args:
+        game (InteractiveGame): Game instance
+
+    Returns:
+        Tuple[List[Dict], List[Dict]]: Moved turns and new turns
+    """
+    if game.is_event_sourced():
+        # Rebuilt replaying the events
+        return [], []
+    dirty_turns = game.get_dirty_turns()
+    new_turns = {turn: game.get_history_turn(turn) for turn in dirty_turns}
+    moved_turns = dict()
+    if game.has_embedded_history():
+        moved_turns = {turn: details for turn, details in game.get_history().items() if turn not in new_turns}
+    return build_history_documents(game.get_id(), moved_turns), build_history_documents(game.get_id(), new_turns)
+
+
+def split_history(document: Dict) -> List[Dict]:
+    """
+    Removes the history of a new game document, built with to_document, and gives it as history documents
+
+    Args:
+        document (Dict): Game document, changed in place
+
+    Returns:
+        List[Dict]: History documents, none for an event-sourced game
+    """
+    history = document.pop(HISTORY_FIELD, dict())
+    if document.get(EVENTS_FIELD) is not None:
+        return []
+    return build_history_documents(document['_id'], history)
+
+
+def prepare_new_documents(documents: List[Dict]) -> List[Dict]:
+    """
+    Prepares the documents of new games, built with to_document, to be inserted: their last activity is their
+    creation and their history is moved to history documents
+
+    Args:
+        documents (List[Dict]): Game documents, changed in place
+
+    Returns:
+        List[Dict]: History documents of every game
+    """
+    history = []
+    for document in documents:
+        document[UPDATED_DATE_FIELD] = document['_created_date']
+        history.extend(split_history(document))
+    return history
+
+
+def load_history(id_game: str) -> Dict[int, Dict[str, Any]]:
+    """
+    Reads the saved history of a game, used as the history loader of the games built by get_game
+
+    Args:
+        id_game (str): Game id
+
+    Returns:
+        Dict[int, Dict[str, Any]]: Turn details by turn number
+    """
+    with metrics.phase('db_read_history'):
+        cursor = db.find_many({'_id_game': id_game}, HISTORY_COLLECTION, sort=HISTORY_SORT)
+        return {raw_turn['_turn']: raw_turn['details'] for raw_turn in cursor}
+
+
+def release_game(game: InteractiveGame) -> None:
+    """
+    Gives back to the cache a game loaded with get_game that won't be saved, e.g. after a read-only request
+
+    Args:
+        game (InteractiveGame): Game instance
+
+    Returns:
+        None
+    """
+    if not game.has_changes():
+        game_cache.put(game)
+
+
+def build_save_operators(game: InteractiveGame, fields_to_update: List[str] = None) -> Dict:
+    """
+    Builds the update operators used by update_game, including the status fields, the version increment and the date
+    of the change
+
+    Args:
+        game (InteractiveGame): Game instance
+        fields_to_update (List[str]): List of fields to rewrite completely instead of writing the tracked changes
+
+    Returns:
+        Dict: Update operators, empty if nothing changed
+    """
+    if fields_to_update is not None:
+        fields = [field for field in fields_to_update if field != HISTORY_FIELD]
+        operators = {'$set': game.to_document([*fields, *STATUS_FIELDS])}
+        if game.is_event_sourced():
+            operators['$set'].update(build_event_fields(game))
+    else:
+        operators = build_update_operators(game)
+    if operators:
+        if game.has_embedded_history():
+            # Moved to the history collection by update_game
+            operators['$unset'] = {HISTORY_FIELD: ''}
+        operators.setdefault('$inc', dict())[VERSION_FIELD] = 1
+        operators.setdefault('$set', dict())[UPDATED_DATE_FIELD] = time.time()
+    return operators
+
+
+def mark_game_saved(game: InteractiveGame, operators: Dict) -> None:
+    """
+    Updates the version and the tracked changes of a game once its update operators have been written, then caches it
+
+    Args:
+        game (InteractiveGame): Game instance
+        operators (Dict): Written update operators, built by build_save_operators
+
+    Returns:
+        None
+    """
+    if operators:
+        game.set_version(game.get_version() + 1)
+    if HISTORY_FIELD in operators.get('$unset', dict()):
+        game.set_embedded_history(False)
+    snapshot_event = operators.get('$set', dict()).get('_snapshot_event')
+    if snapshot_event is not None:
+        game.set_snapshot_event(snapshot_event)
+    game.clear_changes()
+    game_cache.put(game)
+
+
+def build_update_operators(game: InteractiveGame) -> Dict:
+    """
+    Builds the minimal Mongo update operators for the changes tracked by a game, plus its status fields. An
+    event-sourced game writes its new events instead of the changed fields, see build_event_fields
+
+    Args:
+        game (InteractiveGame): Game instance
+
+    Returns:
+        Dict: Update operators, empty if nothing changed
+    """
+    if game.is_event_sourced():
+        set_fields = build_event_fields(game)
+    else:
+        set_fields = dict()
+        changes: Dict = game.to_document(sorted(game.get_dirty_fields()))
+        for field, value in changes.items():
+            if field in DECK_FIELDS:
+                # Only the cards of a deck change while playing
+                set_fields[f'{field}.cards'] = value['cards']
+            else:
+                set_fields[field] = value
+
+    operators = dict()
+    num_turns_increment = game.get_num_turns_increment()
+    if num_turns_increment:
+        operators['$inc'] = {'_num_turns': num_turns_increment}
+    if set_fields or operators:
+        operators['$set'] = {**set_fields, **game.to_document(STATUS_FIELDS)}
+    return operators
+
+
+def build_event_fields(game: InteractiveGame, snapshot_interval: int = GAME_SNAPSHOT_INTERVAL) -> Dict:
+    """
+    Builds the fields written for the changes of an event-sourced game: its new events, plus a snapshot of the state
+    fields when snapshot_interval turns were played since the saved one or when the game is over, so loading the
+    game never replays more than snapshot_interval turns
+
+    Args:
+        game (InteractiveGame): Event-sourced game
+        snapshot_interval (int): Turns played between snapshots
+
+    Returns:
+        Dict: Fields to $set, empty if there are no new events
+    """
+    set_fields = {f'{EVENTS_FIELD}.{seq}': event for seq, event in game.get_new_events().items()}
+    if set_fields and (game.get_num_turns_since_snapshot() >= snapshot_interval or
+                       game.get_winner_player(CARDS_TO_USE) is not None):
+        set_fields.update(game.to_document(SNAPSHOT_FIELDS))
+    return set_fields
 
 
 def add_game(game: InteractiveGame) -> None:
@@ -50,98 +374,462 @@ def add_game(game: InteractiveGame) -> None:
     Returns:
         None
     """
-    document: Dict = to_dict(game)
-    db.add_one(document, GAME_COLLECTION)
-
-
-def get_games_by_status(finished: bool, only_id: bool = True) -> List[Union[str, InteractiveGame]]:
+    with metrics.phase('encode'):
+        document: Dict = game.to_document()
+        history = prepare_new_documents([document])
+    with metrics.phase('db_write'):
+        # The history goes first: a game is never saved without its first turn
+        db.add_many(history, HISTORY_COLLECTION)
+        db.add_one(document, GAME_COLLECTION)
+    mark_game_saved(game, dict())
+
+
+def get_games_by_status(finished: bool, only_id: bool = True, fields: List[str] = None, limit: int = 0,
+                        after: Tuple[float, str] = None) -> Iterator[Union[str, Dict]]:
     """
-    Gets a game ids list of games that have been finished or not
+    Gets a game ids list of games that have been finished or not, querying the indexed _finished field
 
     Args:
         finished (bool): Flag to get all the game ids that have been finished or not
         only_id (bool): Flag to return only the id of the game
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
 
     Returns:
-        List[str]: List of game id's that have the similar status provided
+        Iterator[Union[str, Dict]]: Game ids or documents, newest first, read from the cursor while iterating. The
+            finished games include the archived ones
     """
-    cursor = db.find_all(GAME_COLLECTION)
-    games = []
+    return find_games({'_finished': finished}, only_id, fields, limit, after, archived=finished)
+
+
+def add_game_documents(documents: List[Dict]) -> List[str]:
+    """
+    Saves the documents of several new games with a single insert (plus one for their histories), see
+    InteractiveGame.build_new_documents
+
+    Args:
+        documents (List[Dict]): New game documents, their history is moved to the history documents
+
+    Returns:
+        List[str]: Ids of the saved games
+    """
+    history = prepare_new_documents(documents)
+    with metrics.phase('db_write'):
+        db.add_many(history, HISTORY_COLLECTION)
+        db.add_many(documents, GAME_COLLECTION)
+    return [document['_id'] for document in documents]
+
+
+def ensure_indexes() -> None:
+    """
+    Creates the indexes used by the game and history queries
+
+    Args:
+        None
+
+    Returns:
+        None
+    """
+    for collection_name, indexes in COLLECTION_INDEXES.items():
+        for name, keys in indexes.items():
+            db.create_index(keys, collection_name, name=name)
+
+
+def backfill_game_status(batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Saves the status fields of the games created before they existed
+
+    Args:
+        batch_size (int): Games updated by bulk write
+
+    Returns:
+        int: Number of updated games
+    """
+    cursor = db.find_many({'_finished': {'$exists': False}}, GAME_COLLECTION)
+    updates = dict()
+    num_updated = 0
     for raw_game in cursor:
-        game = build_interactive_game_instance(raw_game)
-        game_winner = game.get_winner(CARDS_TO_USE)
-        if bool(game_winner) == finished:
-            games.append(game.get_id() if only_id else {**raw_game, '_winner': game_winner})
-    return games
+        game = InteractiveGame.from_document(raw_game)
+        updates[game.get_id()] = game.to_document(STATUS_FIELDS)
+        if len(updates) >= batch_size:
+            num_updated += db.set_many_by_id(updates, GAME_COLLECTION)
+            updates.clear()
+    num_updated += db.set_many_by_id(updates, GAME_COLLECTION)
+    return num_updated
+
+
+def build_inactive_query(finished: bool, older_than: float) -> Dict:
+    """
+    Builds the query of the finished or unfinished games without activity since a date. The games saved before the
+    date of the last change existed are judged by their creation date
 
+    Args:
+        finished (bool): Games status
+        older_than (float): Timestamp of the oldest activity kept
 
-def get_list_all_games(only_id: bool = True) -> List[Union[str, InteractiveGame]]:
+    Returns:
+        Dict: Mongo query
+    """
+    legacy = {UPDATED_DATE_FIELD: {'$exists': False}, '_created_date': {'$lt': older_than}}
+    return {'_finished': finished, '$or': [{UPDATED_DATE_FIELD: {'$lt': older_than}}, legacy]}
+
+
+def invalidate_games(ids_games: List[str]) -> None:
+    """
+    Drops removed games from the game and response caches of this worker
+
+    Args:
+        ids_games (List[str]): Game ids
+
+    Returns:
+        None
+    """
+    for id_game in ids_games:
+        game_cache.invalidate(id_game)
+        response_cache.invalidate(id_game)
+
+
+def archive_finished_games(older_than: float, batch_size: int = GAME_ARCHIVE_BATCH_SIZE) -> List[str]:
+    """
+    Moves a batch of the finished games without activity since a date to the archive collection, with their history
+    embedded, and removes them and their history documents from the hot collections. The archive is written first
+    and replaces the documents with the same id, so a batch interrupted halfway is completed by the next one
+
+    Args:
+        older_than (float): Timestamp of the oldest activity kept in the game collection
+        batch_size (int): Maximum number of games moved
+
+    Returns:
+        List[str]: Ids of the archived games, fewer than batch_size when no more games are left
+    """
+    raw_games = list(db.find_many(build_inactive_query(True, older_than), GAME_COLLECTION, sort=ACTIVITY_SORT,
+                                  limit=batch_size))
+    if not raw_games:
+        return []
+    ids_games = [raw_game['_id'] for raw_game in raw_games]
+    histories = {id_game: dict() for id_game in ids_games}
+    for raw_turn in db.find_many({'_id_game': {'$in': ids_games}}, HISTORY_COLLECTION):
+        histories[raw_turn['_id_game']][str(raw_turn['_turn'])] = raw_turn['details']
+    for raw_game in raw_games:
+        # Event-sourced games rebuild their history from their events
+        if raw_game.get(EVENTS_FIELD) is None:
+            raw_game[HISTORY_FIELD] = {**raw_game.get(HISTORY_FIELD, dict()), **histories[raw_game['_id']]}
+    db.save_many(raw_games, ARCHIVE_COLLECTION)
+    db.delete_many({'_id': {'$in': ids_games}, '_finished': True}, GAME_COLLECTION)
+    db.delete_many({'_id_game': {'$in': ids_games}}, HISTORY_COLLECTION)
+    invalidate_games(ids_games)
+    return ids_games
+
+
+def expire_abandoned_games(older_than: float, batch_size: int = GAME_ARCHIVE_BATCH_SIZE) -> List[str]:
+    """
+    Deletes a batch of the unfinished games without activity since a date, with their history. The inactivity is
+    checked again by the delete, a game played in the meantime is kept
+
+    Args:
+        older_than (float): Timestamp of the oldest activity kept
+        batch_size (int): Maximum number of games deleted
+
+    Returns:
+        List[str]: Ids of the deleted games
+    """
+    query = build_inactive_query(False, older_than)
+    ids_games = [raw_game['_id'] for raw_game in db.find_many(query, GAME_COLLECTION, {'_id': 1}, ACTIVITY_SORT,
+                                                              batch_size)]
+    if not ids_games:
+        return []
+    db.delete_many({**query, '_id': {'$in': ids_games}}, GAME_COLLECTION)
+    kept = {raw_game['_id'] for raw_game in db.find_many({'_id': {'$in': ids_games}}, GAME_COLLECTION, {'_id': 1})}
+    ids_expired = [id_game for id_game in ids_games if id_game not in kept]
+    db.delete_many({'_id_game': {'$in': ids_expired}}, HISTORY_COLLECTION)
+    invalidate_games(ids_expired)
+    return ids_expired
+
+
+def get_list_all_games(only_id: bool = True, fields: List[str] = None, limit: int = 0,
+                       after: Tuple[float, str] = None) -> Iterator[Union[str, Dict]]:
     """
     Gets a list of all game ids created and stored at the database
 
     Args:
         only_id (bool): Flag to return only the id of the game
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
 
     Returns:
-        List[str]: List of game ids
+        Iterator[Union[str, Dict]]: Game ids or documents, newest first, read from the cursor while iterating. The
+            archived games are included
     """
-    cursor = db.find_all(GAME_COLLECTION)
-    games = []
-    for raw_game in cursor:
-        if only_id:
-            games.append(raw_game['_id'])
-        else:
-            game_instance = build_interactive_game_instance(raw_game)
-            game_dict = {
-                **raw_game,
-                '_winner': game_instance.get_winner(CARDS_TO_USE)
-            }
-            games.append(game_dict)
-    return games
+    return find_games(dict(), only_id, fields, limit, after, archived=True)
+
+
+def find_games(query: Dict, only_id: bool, fields: List[str] = None, limit: int = 0,
+               after: Tuple[float, str] = None, archived: bool = False) -> Iterator[Union[str, Dict]]:
+    """
+    Finds a page of games, the projection, sort and limit are applied by the database. The pages are keyset based:
+    the next page starts after the _created_date and _id of the last game returned
+
+    Args:
+        query (Dict): Mongo query
+        only_id (bool): Flag to return only the id of the games
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
+        archived (bool): Flag to merge the page of the archive collection with the page of the game collection
+
+    Returns:
+        Iterator[Union[str, Dict]]: Game ids or documents
+    """
+    page_query = build_page_query(query, after)
+    if not archived:
+        cursor = db.find_many(page_query, GAME_COLLECTION, build_list_projection(only_id, fields), LIST_SORT, limit)
+        return (raw_game['_id'] for raw_game in cursor) if only_id else iter(cursor)
+    projection = build_archive_projection(only_id, fields)
+    pages = [db.find_many(page_query, collection_name, projection, LIST_SORT, limit)
+             for collection_name in [GAME_COLLECTION, ARCHIVE_COLLECTION]]
+    return (trim_listed_game(raw_game, only_id, fields) for raw_game in merge_pages(pages, limit))
+
+
+def get_page_key(raw_game: Dict) -> Tuple[float, str]:
+    """
+    Gets the LIST_SORT key of a listed game
+
+    Args:
+        raw_game (Dict): Game document with its _created_date
+
+    Returns:
+        Tuple[float, str]: Created date and id
+    """
+    return raw_game['_created_date'], raw_game['_id']
+
+
+def merge_pages(pages: List[Iterator[Dict]], limit: int = 0) -> Iterator[Dict]:
+    """
+    Merges the pages of the game and archive collections, both sorted by LIST_SORT. A game read from both collections
+    while it was being archived is returned once
+
+    Args:
+        pages (List[Iterator[Dict]]): Game documents of each collection, with their _created_date
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+
+    Returns:
+        Iterator[Dict]: Game documents, newest first
+    """
+    num_games = 0
+    last_id = None
+    for raw_game in heapq.merge(*pages, key=get_page_key, reverse=True):
+        if raw_game['_id'] == last_id:
+            continue
+        last_id = raw_game['_id']
+        yield raw_game
+        num_games += 1
+        if num_games == limit:
+            return
+
+
+def build_archive_projection(only_id: bool, fields: List[str] = None) -> Union[Dict, None]:
+    """
+    Builds the projection of a listing merged with the archive, the created date orders the merge
+
+    Args:
+        only_id (bool): Flag to return only the id of the games
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+
+    Returns:
+        Union[Dict, None]: Mongo projection, None for the whole documents
+    """
+    projection = build_list_projection(only_id, fields)
+    return None if projection is None else {**projection, '_created_date': 1}
+
+
+def trim_listed_game(raw_game: Dict, only_id: bool, fields: List[str] = None) -> Union[str, Dict]:
+    """
+    Gives a game of a merged listing the shape of a game collection listing: without the created date added to sort
+    it and without the history embedded in the archived documents
+
+    Args:
+        raw_game (Dict): Game document read with build_archive_projection
+        only_id (bool): Flag to return only the id of the games
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+
+    Returns:
+        Union[str, Dict]: Game id or document
+    """
+    if only_id:
+        return raw_game['_id']
+    if fields is None:
+        raw_game.pop(HISTORY_FIELD, None)
+    elif '_created_date' not in fields:
+        del raw_game['_created_date']
+    return raw_game
+
+
+def build_page_query(query: Dict, after: Tuple[float, str] = None) -> Dict:
+    """
+    Restricts a listing query to the games after a page cursor, following LIST_SORT
+
+    Args:
+        query (Dict): Mongo query
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
+
+    Returns:
+        Dict: Mongo query
+    """
+    if after is None:
+        return query
+    created_date, id_game = after
+    return {**query, '$or': [{'_created_date': {'$lt': created_date}},
+                             {'_created_date': created_date, '_id': {'$lt': id_game}}]}
+
+
+def build_list_projection(only_id: bool, fields: List[str] = None) -> Union[Dict, None]:
+    """
+    Builds the projection of a listing
+
+    Args:
+        only_id (bool): Flag to return only the id of the games
+        fields (List[str]): Document fields to return when only_id is False (Default: the whole documents)
+
+    Returns:
+        Union[Dict, None]: Mongo projection, None for the whole documents
+    """
+    if only_id:
+        return {'_id': 1}
+    elif fields is not None:
+        return {'_id': 1, **{field: 1 for field in fields}}
+    return None
 
 
-def get_game(id_game: str) -> InteractiveGame:
+def get_game(id_game: str, current_version: int = None) -> InteractiveGame:
     """
-    Gets a game_instance from the database and converts it to an InteractiveGame instance
+    Gets a game_instance from the cache or from the database converting it to an InteractiveGame instance. Cached
+    games are served only when their version matches the database (see GAME_CACHE_VERIFY_VERSION). The game is
+    checked out of the cache until it's saved with update_game or given back with release_game. Its history is read
+    from the history collection only if get_history is called (e.g. by to_document)
 
     Args:
         id_game (str): Player id
+        current_version (int): Version just read with get_game_version, so it's not read again (Default: read it)
 
     Returns:
         InteractiveGame: Games instance
     """
-    raw_game: Dict = db.find_one_by_id(id_game, GAME_COLLECTION)
-    instance = build_interactive_game_instance(raw_game)
+    if not GAME_CACHE_VERIFY_VERSION:
+        instance = game_cache.get(id_game)
+    elif current_version is not None:
+        instance = game_cache.get(id_game, lambda _: current_version)
+    else:
+        instance = game_cache.get(id_game, get_game_version)
+    if instance is not None:
+        return instance
+    with metrics.phase('db_read'):
+        raw_game = find_game_document(id_game)
+    with metrics.phase('decode'):
+        instance = InteractiveGame.from_document(raw_game, history_loader=lambda: load_history(id_game))
     return instance
 
 
-def build_interactive_game_instance(raw_game: Dict) -> InteractiveGame:
-    _id: str = raw_game.get('_id')
-    _name_p1: str = raw_game.get('_name_p1')
-    _name_p2: str = raw_game.get('_name_p2')
-    _num_turns: int = raw_game.get('_num_turns')
-    _created_date: int = raw_game.get('_created_date')
-    _current_target: int = raw_game.get('_current_target')
-    _history: Dict = raw_game.get('_history')
-    _deck_p1: Dict = raw_game.get('_deck_p1')
-    _deck_p2: Dict = raw_game.get('_deck_p2')
-    _hand_p1: List[Card] = [Card(raw_card.get('rank'), raw_card.get('suit')) for raw_card
-                            in raw_game.get('_hand_p1')]
-    _hand_p2: List[Card] = [Card(raw_card.get('rank'), raw_card.get('suit')) for raw_card
-                            in raw_game.get('_hand_p2')]
-
-    num_ranks: int = _deck_p1.get('num_ranks')
-    suits: Dict = _deck_p1.get('suits')
-    special_ranks: Dict = _deck_p1.get('special_ranks')
-
-    cards_deck_p1: List[Card] = [Card(raw_card.get('rank'), raw_card.get('suit')) for raw_card in _deck_p1.get('cards')]
-    cards_deck_p2: List[Card] = [Card(raw_card.get('rank'), raw_card.get('suit')) for raw_card in _deck_p2.get('cards')]
-
-    deck_p1 = Deck(num_ranks=num_ranks, suits=suits, special_ranks=special_ranks, cards=cards_deck_p1)
-    deck_p2 = Deck(num_ranks=num_ranks, suits=suits, special_ranks=special_ranks, cards=cards_deck_p2)
-
-    game_instance = InteractiveGame(num_ranks=num_ranks, suits=suits, special_ranks=special_ranks, name_p1=_name_p1,
-                                    name_p2=_name_p2, id_game=_id, created_date=_created_date,
-                                    curr_target=_current_target, hand_p1=_hand_p1, hand_p2=_hand_p2, history=_history,
-                                    deck_p1=deck_p1, deck_p2=deck_p2, num_turns=_num_turns)
-    return game_instance
+def get_game_version(id_game: str) -> Union[int, None]:
+    """
+    Gets the version of a game document reading only its version field
+
+    Args:
+        id_game (str): Game id
+
+    Returns:
+        Union[int, None]: Document version, None if the game no longer exists
+    """
+    try:
+        with metrics.phase('db_read_version'):
+            raw_game = find_game_document(id_game, {VERSION_FIELD: 1})
+    except DocumentNotFoundError:
+        return None
+    return raw_game.get(VERSION_FIELD, 0)
+
+
+def find_game_document(id_game: str, projection: Dict = None) -> Dict:
+    """
+    Reads a game document from the game collection, or from the archive collection once the game was archived (its
+    history is embedded, see archive_finished_games)
+
+    Args:
+        id_game (str): Game id
+        projection (Dict): Fields to return, e.g. {'_version': 1} (Default: the whole document)
+
+    Raises:
+        DocumentNotFoundError: If the game is in neither collection
+
+    Returns:
+        Dict: Game document
+    """
+    try:
+        return db.find_one_by_id(id_game, GAME_COLLECTION, projection)
+    except DocumentNotFoundError:
+        return db.find_one_by_id(id_game, ARCHIVE_COLLECTION, projection)
+
+
+def get_games_versions(finished: Union[bool, None], limit: int = 0,
+                       after: Tuple[float, str] = None) -> List[Tuple[str, int]]:
+    """
+    Gets the id and the version of the games of a page, reading only those fields, e.g. to compute the ETag of a
+    listing
+
+    Args:
+        finished (Union[bool, None]): Games status to list, None for all the games
+        limit (int): Maximum number of games to return (Default: 0, no limit)
+        after (Tuple[float, str]): Created date and id of the last game of the previous page
+
+    Returns:
+        List[Tuple[str, int]]: Game ids and versions, newest first
+    """
+    query = dict() if finished is None else {'_finished': finished}
+    with metrics.phase('db_read_version'):
+        raw_games = find_games(query, False, [VERSION_FIELD], limit, after, archived=finished is not False)
+        return [(raw_game['_id'], raw_game.get(VERSION_FIELD, 0)) for raw_game in raw_games]
+
+
+def get_game_cache_stats() -> Dict:
+    """
+    Gets the hit/miss counters of the game cache of this worker
+
+    Args:
+        None
+
+    Returns:
+        Dict: Cache counters
+    """
+    return game_cache.get_stats()
+
+
+def get_response_cache_stats() -> Dict:
+    """
+    Gets the hit/miss counters of the response cache of this worker
+
+    Args:
+        None
+
+    Returns:
+        Dict: Cache counters
+    """
+    return response_cache.get_stats()
+
+
+def get_database_health() -> Dict:
+    """
+    Measures the round-trip time to the storage and gets its state (e.g. the Mongo connection pool)
+
+    Args:
+        None
+
+    Returns:
+        Dict: Status ('pass' or 'fail'), storage name, latency in milliseconds and storage statistics or error
+    """
+    storage = db.get_storage()
+    try:
+        latency = storage.ping()
+    except Exception as e:
+        return {'status': 'fail', 'storage': storage.name, 'error': str(e)}
+    return {'status': 'pass', 'storage': storage.name, 'latencyMs': round(latency * 1000, 3),
+            'stats': storage.get_stats()}
@@ -0,0 +1,262 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Tuple, Union
+from config import SQLITE_PATH, SQLITE_BUSY_TIMEOUT_MS
+from .storage import STORAGE_SQLITE, Storage
+
+NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$')
+JSON_BOOLEANS = ['true', 'false']
+JSON_CONTAINERS = ['object', 'array']
+SQL_COMPARISONS = {'$eq': 'IS', '$ne': 'IS NOT', '$lt': '<', '$lte': '<=', '$gt': '>', '$gte': '>='}
+
+
+class SQLiteStorage(Storage):
+    """
+    Embedded storage on a SQLite file: one table per collection with the JSON document in a text column. Queries,
+    sorts and indexes are translated to json_extract expressions and updates to json_set, so a read or a write is a
+    single statement in the process, without a network round trip. The file is opened in WAL mode, readers don't
+    block the writer and the workers of a host can share it. Needs the JSON1 functions of SQLite (json_extract,
+    json_set...), compiled in the SQLite of the Python builds and built in since SQLite 3.38
+
+    Args:
+        path (str): Database file, ':memory:' is not shared between threads (Default: config.SQLITE_PATH)
+    """
+    name = STORAGE_SQLITE
+
+    def __init__(self, path: str = SQLITE_PATH):
+        self.__path = path
+        self.__local = threading.local()
+        self.__tables = set()
+
+    def __get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self.__local, 'connection', None)
+        if connection is None or self.__local.pid != os.getpid():
+            # Connections are not shared between threads nor inherited through a fork
+            connection = sqlite3.connect(self.__path, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+            self.__local.connection = connection
+            self.__local.pid = os.getpid()
+        return connection
+
+    def __get_table(self, collection_name: str) -> str:
+        table = self.__quote(collection_name)
+        if collection_name not in self.__tables:
+            self.__get_connection().execute(f'CREATE TABLE IF NOT EXISTS {table} '
+                                            f'(id TEXT PRIMARY KEY, doc TEXT NOT NULL)')
+            self.__tables.add(collection_name)
+        return table
+
+    @staticmethod
+    def __quote(name: str) -> str:
+        if not NAME_PATTERN.match(name) or '.' in name:
+            raise Exception(f'Invalid collection or index name {name}')
+        return f'"{name}"'
+
+    @staticmethod
+    def __field(path: str) -> str:
+        if path == '_id':
+            return 'id'
+        if not NAME_PATTERN.match(path):
+            raise Exception(f'Invalid field path {path}')
+        return f"json_extract(doc, '$.{path}')"
+
+    @staticmethod
+    def __sql_value(value: Any) -> Any:
+        if isinstance(value, (dict, list, tuple)):
+            raise Exception('Only scalar values can be compared on the sqlite storage')
+        return value
+
+    def __condition(self, path: str, condition: Any) -> Tuple[str, List]:
+        field = self.__field(path)
+        if not (isinstance(condition, dict) and condition and all(key.startswith('$') for key in condition)):
+            return f'{field} IS ?', [self.__sql_value(condition)]
+        clauses, params = [], []
+        for operator, operand in condition.items():
+            if operator == '$exists':
+                path_type = 'id' if path == '_id' else f"json_type(doc, '$.{path}')"
+                clauses.append(f'{path_type} IS NOT NULL' if operand else f'{path_type} IS NULL')
+            elif operator in ['$in', '$nin']:
+                values = [self.__sql_value(value) for value in operand if value is not None]
+                clause = f"{field} IN ({', '.join('?' * len(values))})" if values else '0'
+                if None in operand:
+                    clause = f'({clause} OR {field} IS NULL)'
+                clauses.append(clause if operator == '$in' else f'NOT {clause}')
+                params.extend(values)
+            elif operator in SQL_COMPARISONS:
+                clauses.append(f'{field} {SQL_COMPARISONS[operator]} ?')
+                params.append(self.__sql_value(operand))
+            else:
+                raise Exception(f'Query operator {operator} is not supported')
+        return ' AND '.join(f'({clause})' for clause in clauses), params
+
+    def __where(self, query: Dict) -> Tuple[str, List]:
+        clauses, params = [], []
+        for key, condition in query.items():
+            if key in ['$and', '$or']:
+                sub_clauses = [self.__where(sub_query) for sub_query in condition]
+                joiner = ' AND ' if key == '$and' else ' OR '
+                clauses.append(joiner.join(f'({clause})' for clause, _ in sub_clauses) or '1')
+                params.extend(param for _, sub_params in sub_clauses for param in sub_params)
+            else:
+                clause, condition_params = self.__condition(key, condition)
+                clauses.append(clause)
+                params.extend(condition_params)
+        return ' AND '.join(f'({clause})' for clause in clauses) or '1', params
+
+    def __select(self, projection: Dict = None) -> Tuple[str, List[str]]:
+        if not projection:
+            return 'doc', []
+        fields = [field for field, include in projection.items() if include and field != '_id']
+        for field in fields:
+            self.__field(field)
+        # Each value in its own column: a REAL keeps all its digits (json_array would print 15 of them)
+        columns = ''.join(f", json_extract(doc, '$.{field}'), json_type(doc, '$.{field}')" for field in fields)
+        return f'id{columns}', fields
+
+    @staticmethod
+    def __project(row: Tuple, fields: List[str]) -> Dict:
+        # Fields missing from the document (json_type NULL) are left out, like in a Mongo projection. json_extract
+        # gives the JSON booleans as 0 and 1, and the objects and arrays as JSON text
+        document = {'_id': row[0]}
+        for field, value, value_type in zip(fields, row[1::2], row[2::2]):
+            if value_type in JSON_BOOLEANS:
+                document[field] = value_type == 'true'
+            elif value_type in JSON_CONTAINERS:
+                document[field] = json.loads(value)
+            elif value_type is not None:
+                document[field] = value
+        return document
+
+    def find_one(self, collection_name: str, query: Dict, projection: Dict = None) -> Union[Dict, None]:
+        return next(self.find(collection_name, query, projection, limit=1), None)
+
+    def find(self, collection_name: str, query: Dict, projection: Dict = None, sort: List[Tuple[str, int]] = None,
+             limit: int = 0) -> Iterator[Dict]:
+        table = self.__get_table(collection_name)
+        where, params = self.__where(query)
+        columns, fields = self.__select(projection)
+        sql = f'SELECT {columns} FROM {table} WHERE {where}'
+        if sort:
+            sql += ' ORDER BY ' + ', '.join(f"{self.__field(field)} {'DESC' if direction < 0 else 'ASC'}"
+                                            for field, direction in sort)
+        if limit:
+            sql += f' LIMIT {int(limit)}'
+        cursor = self.__get_connection().execute(sql, params)
+        if columns == 'doc':
+            return (json.loads(doc) for doc, in cursor)
+        return (self.__project(row, fields) for row in cursor)
+
+    def insert_one(self, collection_name: str, document: Dict) -> None:
+        table = self.__get_table(collection_name)
+        try:
+            self.__get_connection().execute(f'INSERT INTO {table} (id, doc) VALUES (?, ?)',
+                                            [document['_id'], json.dumps(document, separators=(',', ':'))])
+        except sqlite3.IntegrityError as e:
+            raise Exception(f'Duplicated _id {document["_id"]} on "{collection_name}" collection') from e
+
+    def insert_many(self, collection_name: str, documents: List[Dict]) -> None:
+        table = self.__get_table(collection_name)
+        rows = [[document['_id'], json.dumps(document, separators=(',', ':'))] for document in documents]
+        connection = self.__get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(f'INSERT INTO {table} (id, doc) VALUES (?, ?)', rows)
+            connection.execute('COMMIT')
+        except sqlite3.IntegrityError as e:
+            connection.execute('ROLLBACK')
+            raise Exception(f'Duplicated _id on "{collection_name}" collection') from e
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def update_one(self, collection_name: str, query: Dict, operators: Dict) -> bool:
+        table = self.__get_table(collection_name)
+        expression, update_params = 'doc', []
+        for operator, fields in operators.items():
+            if operator not in ['$set', '$inc', '$unset']:
+                raise Exception(f'Update operator {operator} is not supported')
+            if not fields:
+                continue
+            arguments = []
+            for path, value in fields.items():
+                field = self.__field(path)
+                if operator == '$set':
+                    arguments.append(f"'$.{path}', json(?)")
+                    update_params.append(json.dumps(value, separators=(',', ':')))
+                elif operator == '$inc':
+                    arguments.append(f"'$.{path}', coalesce({field}, 0) + ?")
+                    update_params.append(value)
+                else:
+                    arguments.append(f"'$.{path}'")
+            function = 'json_remove' if operator == '$unset' else 'json_set'
+            expression = f"{function}({expression}, {', '.join(arguments)})"
+        where, params = self.__where(query)
+        if '_id' not in query:
+            where = f'id = (SELECT id FROM {table} WHERE {where} LIMIT 1)'
+        # A single UPDATE statement: the conditions (e.g. a version compare-and-swap) and the write are atomic
+        cursor = self.__get_connection().execute(f'UPDATE {table} SET doc = {expression} WHERE {where}',
+                                                 update_params + params)
+        return cursor.rowcount == 1
+
+    def update_many_by_id(self, collection_name: str, updates: Dict[str, Dict]) -> int:
+        connection = self.__get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            num_matched = super().update_many_by_id(collection_name, updates)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+        return num_matched
+
+    def replace_many(self, collection_name: str, documents: List[Dict]) -> None:
+        table = self.__get_table(collection_name)
+        rows = [[document['_id'], json.dumps(document, separators=(',', ':'))] for document in documents]
+        connection = self.__get_connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            connection.executemany(f'INSERT OR REPLACE INTO {table} (id, doc) VALUES (?, ?)', rows)
+            connection.execute('COMMIT')
+        except Exception:
+            connection.execute('ROLLBACK')
+            raise
+
+    def delete_one(self, collection_name: str, query: Dict) -> None:
+        table = self.__get_table(collection_name)
+        where, params = self.__where(query)
+        self.__get_connection().execute(f'DELETE FROM {table} WHERE id = (SELECT id FROM {table} WHERE {where} '
+                                        f'LIMIT 1)', params)
+
+    def delete_many(self, collection_name: str, query: Dict) -> int:
+        table = self.__get_table(collection_name)
+        where, params = self.__where(query)
+        return self.__get_connection().execute(f'DELETE FROM {table} WHERE {where}', params).rowcount
+
+    def create_index(self, collection_name: str, keys: List[Tuple[str, int]], name: str) -> str:
+        table = self.__get_table(collection_name)
+        index = self.__quote(f'{collection_name}_{name}')
+        columns = ', '.join(f"{self.__field(field)} {'DESC' if direction < 0 else 'ASC'}" for field, direction in keys)
+        self.__get_connection().execute(f'CREATE INDEX IF NOT EXISTS {index} ON {table} ({columns})')
+        return name
+
+    def ping(self) -> float:
+        connection = self.__get_connection()
+        start = time.perf_counter()
+        connection.execute('SELECT 1').fetchone()
+        return time.perf_counter() - start
+
+    def get_stats(self) -> Dict:
+        journal_mode, = self.__get_connection().execute('PRAGMA journal_mode').fetchone()
+        return {'path': self.__path, 'journal_mode': journal_mode}
+
+    def reset(self) -> None:
+        connection = getattr(self.__local, 'connection', None)
+        if connection is not None and self.__local.pid == os.getpid():
+            connection.close()
+        self.__local = threading.local()
@@ -0,0 +1,197 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Tuple, Union
+
+STORAGE_MONGO = 'mongo'
+STORAGE_MEMORY = 'memory'
+STORAGE_SQLITE = 'sqlite'
+STORAGE_BACKENDS = [STORAGE_MONGO, STORAGE_MEMORY, STORAGE_SQLITE]
+
+
+class DocumentNotFoundError(Exception):
+    """
+    No document has the requested id
+    """
+
+
+class Storage(ABC):
+    """
+    Base class of the document storages used by App.database.db. The queries, projections, sorts and update
+    operators follow the Mongo syntax; the embedded storages support the subset used by App.database.server (see
+    query_engine)
+    """
+    name = 'storage'
+
+    @abstractmethod
+    def find_one(self, collection_name: str, query: Dict, projection: Dict = None) -> Union[Dict, None]:
+        """
+        Gets the first document that matches a query
+
+        Args:
+            collection_name (str): Collection to search the element
+            query (Dict): Mongo query, e.g. {'_id': 'a1b2'}
+            projection (Dict): Fields to return, e.g. {'_version': 1} (Default: the whole document)
+
+        Returns:
+            Union[Dict, None]: Document, None if no document matched
+        """
+
+    @abstractmethod
+    def find(self, collection_name: str, query: Dict, projection: Dict = None, sort: List[Tuple[str, int]] = None,
+             limit: int = 0) -> Iterator[Dict]:
+        """
+        Gets the documents that match a query
+
+        Args:
+            collection_name (str): Collection to search the elements
+            query (Dict): Mongo query, e.g. {'_finished': True}
+            projection (Dict): Fields to return, e.g. {'_id': 1} (Default: the whole documents)
+            sort (List[Tuple[str, int]]): Sort keys and directions, e.g. [('_created_date', -1)]
+            limit (int): Maximum number of documents (Default: 0, no limit)
+
+        Returns:
+            Iterator[Dict]: Documents
+        """
+
+    @abstractmethod
+    def insert_one(self, collection_name: str, document: Dict) -> None:
+        """
+        Inserts a new document, its _id must be unique
+
+        Args:
+            collection_name (str): Collection of the document
+            document (Dict): Document to save
+
+        Returns:
+            None
+        """
+
+    def insert_many(self, collection_name: str, documents: List[Dict]) -> None:
+        """
+        Inserts several new documents, their _id must be unique
+
+        Args:
+            collection_name (str): Collection of the documents
+            documents (List[Dict]): Documents to save
+
+        Returns:
+            None
+        """
+        for document in documents:
+            self.insert_one(collection_name, document)
+
+    @abstractmethod
+    def update_one(self, collection_name: str, query: Dict, operators: Dict) -> bool:
+        """
+        Applies update operators (e.g. $set, $inc) to the first document that matches a query, atomically
+
+        Args:
+            collection_name (str): Collection of the document
+            query (Dict): Mongo query, e.g. {'_id': 'a1b2', '_version': 3}
+            operators (Dict): Update operators, e.g. {'$set': {'a.b': 1}, '$inc': {'c': 1}}
+
+        Returns:
+            bool: Whether a document matched the query
+        """
+
+    def update_many_by_id(self, collection_name: str, updates: Dict[str, Dict]) -> int:
+        """
+        Applies update operators to several documents
+
+        Args:
+            collection_name (str): Collection of the documents
+            updates (Dict[str, Dict]): Update operators by document identifier (_id)
+
+        Returns:
+            int: Number of matched documents
+        """
+        return sum(self.update_one(collection_name, {'_id': id_document}, operators)
+                   for id_document, operators in updates.items())
+
+    @abstractmethod
+    def replace_many(self, collection_name: str, documents: List[Dict]) -> None:
+        """
+        Inserts several documents, replacing the documents that already have their _id
+
+        Args:
+            collection_name (str): Collection of the documents
+            documents (List[Dict]): Documents to save
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def delete_one(self, collection_name: str, query: Dict) -> None:
+        """
+        Removes the first document that matches a query
+
+        Args:
+            collection_name (str): Collection of the document
+            query (Dict): Mongo query, e.g. {'_id': 'a1b2'}
+
+        Returns:
+            None
+        """
+
+    @abstractmethod
+    def delete_many(self, collection_name: str, query: Dict) -> int:
+        """
+        Removes every document that matches a query
+
+        Args:
+            collection_name (str): Collection of the documents
+            query (Dict): Mongo query, e.g. {'_id_game': 'a1b2'}
+
+        Returns:
+            int: Number of removed documents
+        """
+
+    @abstractmethod
+    def create_index(self, collection_name: str, keys: List[Tuple[str, int]], name: str) -> str:
+        """
+        Creates an index if it doesn't exist yet
+
+        Args:
+            collection_name (str): Collection to index
+            keys (List[Tuple[str, int]]): Indexed fields and directions, e.g. [('_finished', 1)]
+            name (str): Index name
+
+        Returns:
+            str: Index name
+        """
+
+    @abstractmethod
+    def ping(self) -> float:
+        """
+        Measures the round-trip time of a trivial command
+
+        Args:
+            None
+
+        Returns:
+            float: Round-trip time in seconds
+        """
+
+    def get_stats(self) -> Dict:
+        """
+        Gets backend statistics, e.g. the connection pool state
+
+        Args:
+            None
+
+        Returns:
+            Dict: Statistics
+        """
+        return dict()
+
+    def reset(self) -> None:
+        """
+        Drops the connections of the process (e.g. after a fork), they are opened again on the next use
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        pass
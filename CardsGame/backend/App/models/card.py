@@ -1,10 +1,13 @@
 from __future__ import annotations
-from App.util.constants import SPECIAL_RANKS
+import sys
+from typing import Dict, List, Tuple
+from App.util.constants import NUM_RANKS, SPECIAL_RANKS, SUITS
 
 
 class Card:
     """
-    Card class representing the rank and suit
+    Card class representing the rank and suit. Cards are immutable, use Card.of or Card.from_code to get the shared
+    (flyweight) instance of a card instead of building a new object
 
     Args:
         rank (int): Value that receives the card
@@ -13,11 +16,81 @@ class Card:
     Attributes:
         rank (int): Value that receives the card
         suit (str): Special character of the card, e.g. '♣'
+        _pretty (str): Interned string representation of the card, e.g. ' K♣'
     """
+    __slots__ = ('rank', 'suit', '_pretty', '_hash')
+    __registry: Dict[Tuple[int, str], Card] = {}
+    __code_tables: Dict[Tuple[int, Tuple[str, ...]], List[Card]] = {}
 
     def __init__(self, rank: int, suit: str):
-        self.rank = rank
-        self.suit = suit
+        object.__setattr__(self, 'rank', rank)
+        object.__setattr__(self, 'suit', suit)
+        object.__setattr__(self, '_pretty', sys.intern(self.__build_pretty_card()))
+        object.__setattr__(self, '_hash', hash((rank, suit)))
+
+    @classmethod
+    def of(cls, rank: int, suit: str) -> Card:
+        """
+        Gets the shared instance of a card
+
+        Args:
+            rank (int): Value that receives the card
+            suit (str): Special character of the card, e.g. '♣'
+
+        Returns:
+            Card: Canonical Card instance for the (rank, suit) pair
+        """
+        card = cls.__registry.get((rank, suit))
+        if card is None:
+            card = cls.__registry.setdefault((rank, suit), cls(rank, suit))
+        return card
+
+    @classmethod
+    def from_code(cls, code: int, num_ranks: int = NUM_RANKS, suits: Dict[str, str] = SUITS) -> Card:
+        """
+        Gets the shared instance of a card given its integer code (suit_index * num_ranks + rank - 1)
+
+        Args:
+            code (int): Card code
+            num_ranks (int): Number of ranks by suit
+            suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
+
+        Returns:
+            Card: Canonical Card instance for the code
+        """
+        return cls.get_code_table(num_ranks, suits)[code]
+
+    @classmethod
+    def get_code_table(cls, num_ranks: int = NUM_RANKS, suits: Dict[str, str] = SUITS) -> List[Card]:
+        """
+        Gets the list of cards indexed by their integer code
+
+        Args:
+            num_ranks (int): Number of ranks by suit
+            suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
+
+        Returns:
+            List[Card]: Canonical Card instances sorted by code
+        """
+        key = (num_ranks, tuple(suits.values()))
+        table = cls.__code_tables.get(key)
+        if table is None:
+            table = [cls.of(rank, suit) for suit in key[1] for rank in range(1, num_ranks + 1)]
+            cls.__code_tables[key] = table
+        return table
+
+    def get_code(self, num_ranks: int = NUM_RANKS, suits: Dict[str, str] = SUITS) -> int:
+        """
+        Gets the integer code of the card (suit_index * num_ranks + rank - 1)
+
+        Args:
+            num_ranks (int): Number of ranks by suit
+            suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
+
+        Returns:
+            int: Card code
+        """
+        return list(suits.values()).index(self.suit) * num_ranks + self.rank - 1
 
     def get_rank(self) -> int:
         return self.rank
@@ -25,8 +98,31 @@ class Card:
     def get_suit(self) -> str:
         return self.suit
 
+    def to_dict(self) -> Dict:
+        return {'rank': self.rank, 'suit': self.suit}
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Card objects are immutable, can't set '{name}'")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"Card objects are immutable, can't delete '{name}'")
+
+    def __reduce__(self):
+        return Card.of, (self.rank, self.suit)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Card):
+            return NotImplemented
+        return self.rank == other.rank and self.suit == other.suit
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f'Card({self.rank!r}, {self.suit!r})'
+
     def __str__(self) -> str:
-        return self.get_pretty_card()
+        return self._pretty
 
     def get_pretty_card(self) -> str:
         """
@@ -36,8 +132,11 @@ class Card:
             None
 
         Returns:
-            pretty_card(str): String with the card value and suit 
+            pretty_card(str): String with the card value and suit
         """
+        return self._pretty
+
+    def __build_pretty_card(self) -> str:
         rank = SPECIAL_RANKS.get(self.rank) if (
                 self.rank in SPECIAL_RANKS) else str(self.rank)
         return f'{rank:>2s}{self.suit}'
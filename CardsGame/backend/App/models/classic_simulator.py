@@ -0,0 +1,209 @@
+from __future__ import annotations
+import numpy
+from typing import Dict, NamedTuple, Optional, Sequence, Union
+from App.util import constants
+
+WINNER_TIE = 0
+WINNER_P1 = 1
+WINNER_P2 = 2
+NO_CARD = 255
+
+
+class ClassicSimulationResult(NamedTuple):
+    """
+    Outcome of a batch of simulated classic games
+
+    Attributes:
+        num_turns (numpy.ndarray): Turns played by each game
+        winners (numpy.ndarray): Winner of each game (WINNER_TIE, WINNER_P1 or WINNER_P2)
+        traces (numpy.ndarray|None): Card codes drawn on each turn with shape (games, max_num_turns, 2),
+            NO_CARD for the turns that were not played
+    """
+    num_turns: numpy.ndarray
+    winners: numpy.ndarray
+    traces: Optional[numpy.ndarray] = None
+
+
+class ClassicGameSimulator:
+    """
+    Headless ClassicGame engine that plays many games in lockstep over integer encoded decks, a card code is
+    suit_index * num_ranks + rank - 1 (see Card.get_code)
+
+    Args:
+        num_ranks (int): Number of ranks by suit
+        suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
+        max_num_turns (int): Number of turns to declare a tie
+        min_num_cards (int): Minimum number of cards a player needs to keep playing
+        chunk_size (int): Number of games played at the same time
+
+    Attributes:
+        num_cards (int): Number of cards in the full deck
+        ranks (numpy.ndarray): Rank of each card code
+    """
+
+    def __init__(self, num_ranks: int = constants.NUM_RANKS, suits: Dict[str, str] = constants.SUITS,
+                 max_num_turns: int = constants.MAX_NUM_TURNS,
+                 min_num_cards: int = constants.MIN_NUM_CARDS_CLASSIC_GAME, chunk_size: int = 1 << 16):
+        self.num_ranks = num_ranks
+        self.num_cards = num_ranks * len(suits)
+        if self.num_cards >= NO_CARD:
+            raise Exception(f'The simulator supports up to {NO_CARD - 1} cards, got {self.num_cards}')
+        if self.num_cards % constants.NUM_SPLITS != 0:
+            raise Exception(f'The result of {self.num_cards}/{constants.NUM_SPLITS} is not an exact division')
+        self.max_num_turns = max_num_turns
+        self.min_num_cards = min_num_cards
+        self.chunk_size = chunk_size
+        self.ranks = (numpy.arange(self.num_cards) % num_ranks + 1).astype(numpy.int8)
+
+    @staticmethod
+    def __mix(values: numpy.ndarray) -> numpy.ndarray:
+        """
+        SplitMix64 finalizer, maps each uint64 to a pseudo random uint64
+        """
+        z = values + numpy.uint64(0x9E3779B97F4A7C15)
+        z = (z ^ (z >> numpy.uint64(30))) * numpy.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> numpy.uint64(27))) * numpy.uint64(0x94D049BB133111EB)
+        return z ^ (z >> numpy.uint64(31))
+
+    def shuffle_decks(self, seeds: Union[Sequence[int], numpy.ndarray]) -> numpy.ndarray:
+        """
+        Builds one shuffled deck per seed, the same seed always gives the same deck
+
+        Args:
+            seeds (Sequence[int]): Non-negative seed of each game
+
+        Returns:
+            numpy.ndarray: Card codes with shape (games, num_cards), the deck's top is the first column
+        """
+        seeds = numpy.asarray(seeds, dtype=numpy.uint64)
+        positions = numpy.arange(self.num_cards, dtype=numpy.uint64)
+        keys = self.__mix(seeds[:, None] * numpy.uint64(self.num_cards) + positions)
+        return numpy.argsort(keys, axis=1).astype(numpy.uint8)
+
+    def simulate(self, seeds: Union[Sequence[int], numpy.ndarray], trace: bool = False) -> ClassicSimulationResult:
+        """
+        Plays one classic game per seed
+
+        Args:
+            seeds (Sequence[int]): Non-negative seed of each game
+            trace (bool): Flag to record the cards drawn on each turn
+
+        Returns:
+            ClassicSimulationResult: Turns, winners and optional traces of each game
+        """
+        seeds = numpy.asarray(seeds, dtype=numpy.uint64)
+        results = [self.simulate_decks(self.shuffle_decks(seeds[start:start + self.chunk_size]), trace)
+                   for start in range(0, len(seeds), self.chunk_size)]
+        if not results:
+            return self.simulate_decks(numpy.empty((0, self.num_cards), dtype=numpy.uint8), trace)
+        return ClassicSimulationResult(
+            num_turns=numpy.concatenate([result.num_turns for result in results]),
+            winners=numpy.concatenate([result.winners for result in results]),
+            traces=numpy.concatenate([result.traces for result in results]) if trace else None)
+
+    def simulate_decks(self, decks: numpy.ndarray, trace: bool = False) -> ClassicSimulationResult:
+        """
+        Plays one classic game per shuffled deck, the deck is split in two halves like Game.generate_decks does
+
+        Args:
+            decks (numpy.ndarray): Card codes with shape (games, num_cards), the deck's top is the first column
+            trace (bool): Flag to record the cards drawn on each turn
+
+        Returns:
+            ClassicSimulationResult: Turns, winners and optional traces of each game
+        """
+        num_games, num_cards = decks.shape
+        half = num_cards // constants.NUM_SPLITS
+        # Each player's deck is a ring buffer stored on a row, a player can't hold more than num_cards
+        buffer_p1 = numpy.zeros((num_games, num_cards), dtype=numpy.uint8)
+        buffer_p2 = numpy.zeros((num_games, num_cards), dtype=numpy.uint8)
+        buffer_p1[:, :half] = decks[:, :half]
+        buffer_p2[:, :half] = decks[:, half:]
+        buffer_p1 = buffer_p1.reshape(-1)
+        buffer_p2 = buffer_p2.reshape(-1)
+        head_p1 = numpy.zeros(num_games, dtype=numpy.int64)
+        head_p2 = numpy.zeros(num_games, dtype=numpy.int64)
+        size_p1 = numpy.full(num_games, half, dtype=numpy.int64)
+        size_p2 = numpy.full(num_games, half, dtype=numpy.int64)
+        num_turns = numpy.zeros(num_games, dtype=numpy.int32)
+        traces = numpy.full((num_games, self.max_num_turns, 2), NO_CARD, dtype=numpy.uint8) if trace else None
+
+        active = numpy.arange(num_games)
+        row_start = active * num_cards
+        for turn in range(self.max_num_turns):
+            playing = (size_p1[active] >= self.min_num_cards) & (size_p2[active] >= self.min_num_cards)
+            if not playing.all():
+                active = active[playing]
+                row_start = row_start[playing]
+            if not len(active):
+                break
+
+            card_p1 = buffer_p1[row_start + head_p1[active]]
+            card_p2 = buffer_p2[row_start + head_p2[active]]
+            head_p1[active] = (head_p1[active] + 1) % num_cards
+            head_p2[active] = (head_p2[active] + 1) % num_cards
+            size_p1[active] -= 1
+            size_p2[active] -= 1
+            num_turns[active] += 1
+            if trace:
+                traces[active, turn, 0] = card_p1
+                traces[active, turn, 1] = card_p2
+
+            rank_p1 = self.ranks[card_p1]
+            rank_p2 = self.ranks[card_p2]
+            # The winner puts the opponent's card and then its own card at the bottom, a tie discards both cards
+            self.__add_cards(buffer_p1, head_p1, size_p1, active, row_start, rank_p1 > rank_p2, card_p2, card_p1)
+            self.__add_cards(buffer_p2, head_p2, size_p2, active, row_start, rank_p2 > rank_p1, card_p1, card_p2)
+
+        winners = numpy.full(num_games, WINNER_TIE, dtype=numpy.int8)
+        out_p1 = size_p1 < self.min_num_cards
+        out_p2 = size_p2 < self.min_num_cards
+        not_timeout = num_turns < self.max_num_turns
+        winners[out_p1 & ~out_p2 & not_timeout] = WINNER_P2
+        winners[out_p2 & ~out_p1 & not_timeout] = WINNER_P1
+        return ClassicSimulationResult(num_turns=num_turns, winners=winners, traces=traces)
+
+    @staticmethod
+    def __add_cards(buffer: numpy.ndarray, head: numpy.ndarray, size: numpy.ndarray, active: numpy.ndarray,
+                    row_start: numpy.ndarray, won: numpy.ndarray, first_card: numpy.ndarray,
+                    second_card: numpy.ndarray) -> None:
+        """
+        Adds two cards to the bottom of the decks of the games won on this turn
+        """
+        games = active[won]
+        if not len(games):
+            return
+        num_cards = len(buffer) // len(head)
+        start = row_start[won]
+        bottom = head[games] + size[games]
+        buffer[start + bottom % num_cards] = first_card[won]
+        buffer[start + (bottom + 1) % num_cards] = second_card[won]
+        size[games] += 2
+
+    def summarize(self, result: ClassicSimulationResult) -> Dict[str, float]:
+        """
+        Gets the aggregate statistics of a batch of games
+
+        Args:
+            result (ClassicSimulationResult): Simulated games
+
+        Returns:
+            Dict[str, float]: Win/tie rates and the distribution of the games length
+        """
+        num_games = len(result.winners)
+        if not num_games:
+            return {'games': 0}
+        turns = result.num_turns
+        return {
+            'games': num_games,
+            'wins_p1': float(numpy.mean(result.winners == WINNER_P1)),
+            'wins_p2': float(numpy.mean(result.winners == WINNER_P2)),
+            'ties': float(numpy.mean(result.winners == WINNER_TIE)),
+            'max_turns_reached': float(numpy.mean(turns >= self.max_num_turns)),
+            'turns_mean': float(numpy.mean(turns)),
+            'turns_std': float(numpy.std(turns)),
+            'turns_min': int(numpy.min(turns)),
+            'turns_p50': float(numpy.percentile(turns, 50)),
+            'turns_p95': float(numpy.percentile(turns, 95)),
+            'turns_max': int(numpy.max(turns)),
+        }
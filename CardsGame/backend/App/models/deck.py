@@ -1,9 +1,134 @@
 from __future__ import annotations
 import math
 import numpy
-from typing import Dict, List
+from array import array
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Union
 from App.models.card import Card
 
+MAX_COMPACT_CODES = 256
+
+
+class CompactCardBuffer:
+    """
+    Ring buffer that stores the cards as small integer codes in an array('B'), so every card takes a single byte
+
+    It trades speed for memory: a deque holds an 8 byte pointer by card and pops and appends in C, while every
+    operation here runs in Python, so a turn costs about 1.9 µs against 0.25 µs with a deque (see
+    benchmarks.deck_benchmark). Choose it when many decks or large shoes stay in memory, e.g. a big game cache, not
+    for faster turns
+
+    Args:
+        num_ranks (int): Number of ranks by suit
+        suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
+        cards (Iterable[Card]): Initial cards, from top to bottom
+
+    Raises:
+        Exception: If the number of distinct cards doesn't fit in a byte
+
+    Attributes:
+        __codes (array): Circular buffer of card codes
+        __head (int): Position of the deck's top inside the buffer
+        __size (int): Number of cards stored
+        __decode_table (List[Card]): Card represented by each code
+        __encode_table (Dict[Card, int]): Code of each card
+        __encode_ids (Dict[int, int]): Code of each canonical card by its id(), the code table keeps them alive
+    """
+
+    def __init__(self, num_ranks: int, suits: Dict[str, str], cards: Iterable[Card] = ()):
+        num_codes = num_ranks * len(suits)
+        if num_codes > MAX_COMPACT_CODES:
+            raise Exception(f'A compact deck supports up to {MAX_COMPACT_CODES} distinct cards, got {num_codes}')
+        self.__decode_table: List[Card] = Card.get_code_table(num_ranks, suits)
+        self.__encode_table: Dict[Card, int] = {card: code for code, card in enumerate(self.__decode_table)}
+        self.__encode_ids: Dict[int, int] = {id(card): code for code, card in enumerate(self.__decode_table)}
+        codes = array('B', [self.__encode(card) for card in cards])
+        self.__size = len(codes)
+        self.__head = 0
+        # Leave room for at least one card so the buffer never has a zero capacity
+        self.__codes = codes + array('B', bytes(max(self.__size, 1)))
+
+    def __encode(self, card: Card) -> int:
+        code = self.__encode_table.get(card)
+        if code is None:
+            raise Exception(f'{card} does not belong to this deck')
+        return code
+
+    def __encode_all(self, cards: Iterable[Card]) -> List[int]:
+        # The shared instances (Card.of) are found by identity, without calling Card.__hash__
+        cards = cards if isinstance(cards, list) else list(cards)
+        encode_ids = self.__encode_ids
+        try:
+            return [encode_ids[id(card)] for card in cards]
+        except KeyError:
+            return [self.__encode(card) for card in cards]
+
+    def __grow(self, min_capacity: int) -> None:
+        capacity = max(2 * len(self.__codes), min_capacity)
+        codes = array('B', self.iter_codes())
+        self.__codes = codes + array('B', bytes(capacity - len(codes)))
+        self.__head = 0
+
+    def __len__(self) -> int:
+        return self.__size
+
+    def __iter__(self) -> Iterator[Card]:
+        decode_table = self.__decode_table
+        return (decode_table[code] for code in self.iter_codes())
+
+    def iter_codes(self) -> Iterator[int]:
+        """
+        Iterates over the stored card codes from the deck's top to the bottom
+
+        Args:
+            None
+
+        Returns:
+            Iterator[int]: Card codes
+        """
+        codes = self.__codes
+        capacity = len(codes)
+        end = self.__head + self.__size
+        if end <= capacity:
+            return iter(codes[self.__head:end])
+        return iter(codes[self.__head:] + codes[:end - capacity])
+
+    def popleft(self) -> Card:
+        size = self.__size
+        if not size:
+            raise IndexError('pop from an empty deck')
+        head = self.__head
+        code = self.__codes[head]
+        head += 1
+        self.__head = 0 if head == len(self.__codes) else head
+        self.__size = size - 1
+        return self.__decode_table[code]
+
+    def extend(self, cards: Iterable[Card]) -> None:
+        codes = self.__encode_all(cards)
+        size = self.__size + len(codes)
+        if size > len(self.__codes):
+            self.__grow(size)
+        buffer = self.__codes
+        capacity = len(buffer)
+        tail = self.__head + self.__size
+        for code in codes:
+            if tail >= capacity:
+                tail -= capacity
+            buffer[tail] = code
+            tail += 1
+        self.__size = size
+
+    def extendleft(self, cards: Iterable[Card]) -> None:
+        codes = self.__encode_all(cards)
+        if self.__size + len(codes) > len(self.__codes):
+            self.__grow(self.__size + len(codes))
+        capacity = len(self.__codes)
+        for code in codes:
+            self.__head = (self.__head - 1) % capacity
+            self.__codes[self.__head] = code
+            self.__size += 1
+
 
 class Deck:
     """
@@ -13,21 +138,27 @@ class Deck:
         num_ranks (int): Number of ranks by suit
         suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
         special_ranks (Dict[int, str]): Dictionary of special characters that receive a rank or value, e.g. 13: 'K'
+        cards (Iterable[Card]): Initial cards from top to bottom, if not provided a new sorted deck is built
+        compact (bool): Stores the cards as one byte codes in a ring buffer instead of a deque of Card objects, it uses
+            less memory but each draw is slower (see CompactCardBuffer)
 
     Attributes:
         num_ranks (int): Number of ranks by suit
         suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
         special_ranks (Dict[int, str]): Dictionary of special characters that receive a rank or value, e.g. 13: 'K'
-        cards(List[Card]): List of Card objects
+        compact (bool): Flag to know if the cards are stored as one byte codes
+        cards (List[Card]): List of Card objects (snapshot of the deck from top to bottom)
     """
 
-    def __init__(self, num_ranks: int, suits: Dict[str, str], special_ranks: Dict[int, str], cards: List[Card] = None):
+    def __init__(self, num_ranks: int, suits: Dict[str, str], special_ranks: Dict[int, str],
+                 cards: Iterable[Card] = None, compact: bool = False):
         self.num_ranks = num_ranks
         self.suits = suits
         self.special_ranks = special_ranks
-        self.cards: List[Card] = cards if cards is not None else self.__build()
+        self.compact = compact
+        self.__cards = self.__make_container(cards if cards is not None else self.__build())
 
-    def __build(self):
+    def __build(self) -> List[Card]:
         """
         Creates the collection of cards based on the suits and number of ranks provided at the Deck object creation
 
@@ -40,17 +171,71 @@ class Deck:
         cards: List[Card] = []
         for suit_key in self.suits:
             for rank in range(1, self.num_ranks + 1):
-                card = Card(rank, self.suits.get(suit_key))
+                card = Card.of(rank, self.suits.get(suit_key))
                 cards.append(card)
         return cards
 
-    def __len__(self):
-        return len(self.cards)
+    def __make_container(self, cards: Iterable[Card]) -> Union[Deque[Card], CompactCardBuffer]:
+        """
+        Creates the double ended container that stores the cards
+
+        Args:
+            cards (Iterable[Card]): Cards from top to bottom
+
+        Returns:
+            Union[Deque[Card], CompactCardBuffer]: Container with O(1) operations on both ends
+        """
+        if self.compact:
+            return CompactCardBuffer(self.num_ranks, self.suits, cards)
+        return deque(cards)
+
+    @property
+    def cards(self) -> List[Card]:
+        return list(self.__cards)
+
+    def __len__(self) -> int:
+        return len(self.__cards)
+
+    def __iter__(self) -> Iterator[Card]:
+        return iter(self.__cards)
 
     def __str__(self) -> str:
         pretty = self.get_pretty_deck()
         return ','.join(pretty)
 
+    def to_document(self) -> Dict:
+        """
+        Converts the deck to the document saved at the database
+
+        Args:
+            None
+
+        Returns:
+            Dict: Deck document, the cards are listed from top to bottom
+        """
+        return {
+            'num_ranks': self.num_ranks,
+            'suits': self.suits,
+            'special_ranks': {str(rank): pretty for rank, pretty in self.special_ranks.items()},
+            'cards': [card.to_dict() for card in self.__cards]
+        }
+
+    @classmethod
+    def from_document(cls, document: Dict, compact: bool = False) -> Deck:
+        """
+        Builds a deck from a document created by Deck.to_document
+
+        Args:
+            document (Dict): Deck document
+            compact (bool): Stores the cards as one byte codes
+
+        Returns:
+            Deck: Deck instance
+        """
+        special_ranks = {int(rank): pretty for rank, pretty in document.get('special_ranks').items()}
+        cards = [Card.of(raw_card.get('rank'), raw_card.get('suit')) for raw_card in document.get('cards')]
+        return cls(document.get('num_ranks'), document.get('suits'), special_ranks, cards, compact)
+
     def get_pretty_deck(self) -> List[str]:
         """
         Maps the cards list to an array of pretty Cards (string Cards representation)
@@ -61,7 +246,7 @@ class Deck:
         Returns:
             cards(List[Card]): List of Card objects
         """
-        return [card.get_pretty_card() for card in self.cards]
+        return [card.get_pretty_card() for card in self.__cards]
 
     def add_cards(self, new_cards: List[Card]) -> None:
         """
@@ -73,7 +258,7 @@ class Deck:
         Returns:
             None
         """
-        self.cards = self.cards + new_cards
+        self.__cards.extend(new_cards)
 
     def return_cards(self, new_cards: List[Card]) -> None:
         """
@@ -85,7 +270,7 @@ class Deck:
         Returns:
             None
         """
-        self.cards = new_cards + self.cards
+        self.__cards.extendleft(reversed(new_cards))
 
     def draw(self) -> Card:
         """
@@ -97,23 +282,24 @@ class Deck:
         Returns:
             card(Card): Card obtained from the deck's top
         """
-        return self.cards.pop(0)
+        return self.__cards.popleft()
 
-    def random_shuffle(self) -> None:
+    def random_shuffle(self, seed: int = None) -> None:
         """
         Shuffles the deck randomly
 
         Args:
-            None
+            seed (int): Seed of the shuffle, the same seed always gives the same order (Default: NumPy's global state)
 
         Returns:
             None
         """
-        num_cards = len(self)
-        idx_random_perm = list(numpy.random.permutation(num_cards))
-        shuffled_cards = [self.cards[idx] for idx in idx_random_perm]
-        # print(list(map(lambda card: str(card.rank)+card.suit, shuffled_cards)))
-        self.cards = shuffled_cards
+        cards = list(self.__cards)
+        if seed is None:
+            idx_random_perm = numpy.random.permutation(len(cards))
+        else:
+            idx_random_perm = numpy.random.default_rng(seed).permutation(len(cards))
+        self.__cards = self.__make_container([cards[idx] for idx in idx_random_perm])
 
     def smart_split(self, num_splits) -> List[Deck]:
         """
@@ -131,14 +317,16 @@ class Deck:
         deck_list: List[Deck] = []
         num_cards = len(self)
         if num_splits > num_cards:
-            raise Exception(f"Invalid number of splits. It's not possible split {num_splits} times in a deck of {num_cards} cards")
+            raise Exception(f"Invalid number of splits. It's not possible split {num_splits} times in a deck of "
+                            f"{num_cards} cards")
         if not (num_cards % num_splits == 0):
             raise Exception(f'The result of {num_cards}/{num_splits} is not an exact division')
         split_idx = math.floor(num_cards / num_splits)
 
+        cards = list(self.__cards)
         for i, start_idx in enumerate(range(0, num_cards, split_idx)):
             end_idx = split_idx * (i + 1)
-            list_cards = self.cards[start_idx:end_idx]
-            deck = Deck(self.num_ranks, self.suits, self.special_ranks, list_cards)
+            list_cards = cards[start_idx:end_idx]
+            deck = Deck(self.num_ranks, self.suits, self.special_ranks, list_cards, self.compact)
             deck_list.append(deck)
         return deck_list
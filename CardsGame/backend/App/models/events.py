@@ -0,0 +1,140 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple
+from termcolor import colored, cprint
+from App.util import constants
+
+DECKS_GENERATED = 'decks_generated'
+CLASSIC_TURN = 'classic_turn'
+INTERACTIVE_TURN = 'interactive_turn'
+GAME_OVER = 'game_over'
+
+
+class GameEvent(NamedTuple):
+    """
+    Structured event emitted by a game
+
+    Attributes:
+        kind (str): Event type, e.g. CLASSIC_TURN
+        data (Dict[str, Any]): Event details
+    """
+    kind: str
+    data: Dict[str, Any]
+
+
+class EventSink(ABC):
+    """
+    Base class for the receivers of the events emitted by Game, ClassicGame and InteractiveGame
+    """
+
+    @abstractmethod
+    def emit(self, kind: str, **data: Any) -> None:
+        """
+        Receives an event
+
+        Args:
+            kind (str): Event type, e.g. CLASSIC_TURN
+            data (Any): Event details
+
+        Returns:
+            None
+        """
+
+
+class NullEventSink(EventSink):
+    """
+    Discards every event, used by the API so the game logic never writes to stdout
+    """
+
+    def emit(self, kind: str, **data: Any) -> None:
+        pass
+
+
+class CollectorEventSink(EventSink):
+    """
+    Keeps the events in memory, useful for tests and simulations
+
+    Attributes:
+        events (List[GameEvent]): Received events in order
+    """
+
+    def __init__(self):
+        self.events: List[GameEvent] = []
+
+    def emit(self, kind: str, **data: Any) -> None:
+        self.events.append(GameEvent(kind, data))
+
+    def get_events(self, kind: str = None) -> List[GameEvent]:
+        """
+        Gets the received events
+
+        Args:
+            kind (str): Event type to filter, if not provided returns all the events
+
+        Returns:
+            List[GameEvent]: Received events in order
+        """
+        return [event for event in self.events if kind is None or event.kind == kind]
+
+    def clear(self) -> None:
+        self.events.clear()
+
+
+class TerminalEventSink(EventSink):
+    """
+    Prints a colored line for each event, used by console_game.py
+    """
+
+    def __init__(self):
+        self.__tie_tag = colored('TIE', constants.COLOR_TIE)
+        self.__winner_tag = colored('Winner:', constants.COLOR_WINNER, attrs=['reverse', 'blink', 'bold'])
+
+    def emit(self, kind: str, **data: Any) -> None:
+        if kind == DECKS_GENERATED:
+            cprint('Generating new Decks', 'blue')
+        elif kind == CLASSIC_TURN:
+            print(self.__format_classic_turn(**data))
+        elif kind == INTERACTIVE_TURN:
+            self.__print_interactive_turn(**data)
+        elif kind == GAME_OVER:
+            print(f"{self.__winner_tag} {self.__color_winner(data['winner'], data['winner_player'])}")
+
+    @staticmethod
+    def __color_winner(winner: str, winner_player: int) -> str:
+        colors = {1: constants.COLOR_P1, 2: constants.COLOR_P2}
+        return colored(winner, colors.get(winner_player, constants.COLOR_TIE), attrs=['bold'])
+
+    def __format_classic_turn(self, turn, name_p1, name_p2, card_p1, card_p2, len_deck_p1, len_deck_p2,
+                              turn_winner_player) -> str:
+        best_tags = {
+            1: colored(f"{name_p1}'s Card", constants.COLOR_P1),
+            2: colored(f"{name_p2}'s Card", constants.COLOR_P2)
+        }
+        card_p1_msj = colored(f'{name_p1}({len_deck_p1:2}) - {card_p1}', constants.COLOR_P1)
+        card_p2_msj = colored(f'{card_p2} - {name_p2}({len_deck_p2:2})', constants.COLOR_P2)
+        best_tag = best_tags.get(turn_winner_player, self.__tie_tag)
+        return f'Turn: {turn:>3} => {card_p1_msj} ... {card_p2_msj} => {best_tag}'
+
+    @staticmethod
+    def __print_interactive_turn(turn, name_p1, name_p2, hand_p1, hand_p2, idx_cards_p1, idx_cards_p2,
+                                 ranks_p1, ranks_p2, target, turn_winner, len_deck_p1, len_deck_p2) -> None:
+        sum_p1 = sum(ranks_p1)
+        sum_p2 = sum(ranks_p2)
+        difference_p1 = abs(target - sum_p1)
+        difference_p2 = abs(target - sum_p2)
+        aux_diff_p1 = colored(f'{idx_cards_p1} (dif:{difference_p1})', constants.COLOR_P1)
+        aux_diff_p2 = colored(f'(dif:{difference_p2}) {idx_cards_p2}', constants.COLOR_P2)
+        aux_sum_p1 = colored(f'{ranks_p1} (sum:{sum_p1})', constants.COLOR_P1)
+        aux_sum_p2 = colored(f'(sum:{sum_p2}) {ranks_p2}', constants.COLOR_P2)
+        deck_p1 = colored(f'Deck len {name_p1}: {len_deck_p1}', constants.COLOR_P1)
+        deck_p2 = colored(f'Deck len {name_p2}: {len_deck_p2}', constants.COLOR_P2)
+        target_colored = colored(f' Target: {target}', 'cyan')
+
+        print(f"HAND: {colored(list(map(str, hand_p1)), constants.COLOR_P1)}   "
+              f"{colored(list(map(str, hand_p2)), constants.COLOR_P2)}")
+        print(f"INDEX: {aux_diff_p1} -> {target_colored} <- {aux_diff_p2}")
+        print(f"RANKS: {aux_sum_p1} -> {target_colored} <- {aux_sum_p2}")
+        cprint(f"{turn_winner}, Turn: {turn}", constants.COLOR_WINNER)
+        print(f"{deck_p1}    {deck_p2}")
+
+
+NULL_EVENT_SINK = NullEventSink()
@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import List, Union, Dict
 from termcolor import colored, cprint
 from App.models.deck import Deck
+from App.models.events import DECKS_GENERATED, NULL_EVENT_SINK, EventSink
 from App.util import constants
 
 
@@ -18,6 +19,8 @@ class Game:
         deck_p1 (Deck): Deck object that contains the player 1's cards
         deck_p2 (Deck): Deck object that contains the player 2's cards
         num_turns (int): Counter of turns
+        event_sink (EventSink): Receiver of the game events (Default: discards them)
+        seed (int): Seed of the decks shuffle when they are generated (Default: a random shuffle)
 
     Attributes:
         _name_p1 (str): Player 1 name
@@ -25,20 +28,49 @@ class Game:
         _deck_p1 (Deck): Deck object that contains the player 1's cards
         _deck_p2 (Deck): Deck object that contains the player 2's cards
         _num_turns (int): Counter of turns
+        __event_sink (EventSink): Receiver of the game events (runtime only, never saved)
     """
 
     def __init__(self, num_ranks: int, suits: Dict[str, str], special_ranks: Dict[int, str], name_p1: str, name_p2: str,
-                 deck_p1: Deck = None, deck_p2: Deck = None, num_turns: int = 0):
+                 deck_p1: Deck = None, deck_p2: Deck = None, num_turns: int = 0, event_sink: EventSink = None,
+                 seed: int = None):
+        self.__event_sink = event_sink if event_sink is not None else NULL_EVENT_SINK
         self._name_p1 = name_p1
         self._name_p2 = name_p2
         self._num_turns = num_turns
         if deck_p1 is None or deck_p2 is None:
-            cprint(f'Generating new Decks', 'blue')
-            self._deck_p1, self._deck_p2, *_ = self.generate_decks(num_ranks, suits, special_ranks, constants.NUM_SPLITS)
+            self.emit(DECKS_GENERATED)
+            self._deck_p1, self._deck_p2, *_ = self.generate_decks(num_ranks, suits, special_ranks,
+                                                                   constants.NUM_SPLITS, seed)
         else:
             self._deck_p1 = deck_p1
             self._deck_p2 = deck_p2
 
+    def emit(self, kind: str, **data) -> None:
+        """
+        Sends an event to the game's event sink
+
+        Args:
+            kind (str): Event type
+            data (Any): Event details
+
+        Returns:
+            None
+        """
+        self.__event_sink.emit(kind, **data)
+
+    def set_event_sink(self, event_sink: EventSink) -> None:
+        """
+        Changes the receiver of the game events
+
+        Args:
+            event_sink (EventSink): New receiver
+
+        Returns:
+            None
+        """
+        self.__event_sink = event_sink
+
     def get_name_player(self, player) -> Union[str, None]:
         """
         Gets the name of a player
@@ -80,7 +112,7 @@ class Game:
         self._num_turns += 1
 
     @staticmethod
-    def generate_decks(num_ranks, suits, special_ranks, num_splits) -> List[Deck]:
+    def generate_decks(num_ranks, suits, special_ranks, num_splits, seed: int = None) -> List[Deck]:
         """
         Generates the shuffled decks for the player A and B
 
@@ -89,12 +121,13 @@ class Game:
             suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
             special_ranks (Dict[int, str]): Dictionary of special characters that receive a rank or value, e.g. 13: 'K'
             num_splits (int): number of splits to divide the deck
+            seed (int): Seed of the shuffle (Default: a random shuffle)
 
         Returns:
             decks_list(Deck): Deck list for the n players (num_splits)
         """
         deck = Deck(num_ranks, suits, special_ranks)
-        deck.random_shuffle()
+        deck.random_shuffle(seed)
         return deck.smart_split(num_splits)
 
     def print_decks(self) -> None:
@@ -112,6 +145,26 @@ class Game:
         cprint(f'{self.get_name_player(2)}:\n  {self._deck_p2}',
                constants.COLOR_P2)
 
+    def get_winner_player(self, min_num_cards) -> Union[int, None]:
+        """
+        Returns the id of the winner player if there is
+
+        Args:
+            min_num_cards (int): Minimum number of cards to have
+
+        Returns:
+            winner (int|None): 1 or 2 for the winner player, 0 for a tie and None if the game is not over
+        """
+        size_p1 = len(self._deck_p1)
+        size_p2 = len(self._deck_p2)
+        if (self.get_num_turns() >= constants.MAX_NUM_TURNS) or (size_p1 < min_num_cards and size_p2 < min_num_cards):
+            return 0
+        elif size_p1 < min_num_cards:
+            return 2
+        elif size_p2 < min_num_cards:
+            return 1
+        return None
+
     def get_winner(self, min_num_cards, color: bool = False) -> Union[str, None]:
         """
         Returns the winner player if there is
@@ -124,19 +177,16 @@ class Game:
             winner (str): Colored string with the name of the winner
         """
         colored_attrs = ['bold']
-        size_p1 = len(self._deck_p1)
-        size_p2 = len(self._deck_p2)
-        winner = None
-        color_winner = None
-        if (self.get_num_turns() >= constants.MAX_NUM_TURNS) or (size_p1 < min_num_cards and size_p2 < min_num_cards):
+        winner_player = self.get_winner_player(min_num_cards)
+        if winner_player is None:
+            return None
+        elif winner_player == 0:
             winner = 'Tie'
             color_winner = constants.COLOR_TIE
-        elif size_p1 < min_num_cards:
+        elif winner_player == 2:
             winner = self.get_name_player(2)
             color_winner = constants.COLOR_P2
-        elif size_p2 < min_num_cards:
+        else:
             winner = self.get_name_player(1)
             color_winner = constants.COLOR_P1
-        else:
-            return None
         return colored(winner, color_winner, attrs=colored_attrs) if color else winner
@@ -1,12 +1,34 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple, Union
 from datetime import datetime
+import numpy
 from App.models.game import Game
 from App.models.card import Card
 from App.models.deck import Deck
-from termcolor import cprint, colored
+from App.models.events import INTERACTIVE_TURN, EventSink
+from App.models.strategy import PC_STRATEGIES, Strategy
 from App.util import constants
-from App.util.helpers import get_random_num_in_range, get_random_string, get_closest_index_cards
+from App.util.helpers import get_random_num_in_range, get_random_string
+
+# Actions saved as the events of an event-sourced game: {'action': 'hand'} and {'action': 'play', 'p1': [0, 1],
+# 'p2': [2, 0]} (the card indexes of each player)
+EVENT_TAKE_HAND = 'hand'
+EVENT_PLAY_TURN = 'play'
+
+
+def count_played_turns(events: Dict[int, Dict[str, Any]], start: int, stop: int) -> int:
+    """
+    Counts the turns played by a range of events
+
+    Args:
+        events (Dict[int, Dict[str, Any]]): Events by sequence number
+        start (int): First sequence number
+        stop (int): Sequence number after the last one
+
+    Returns:
+        int: Number of play events
+    """
+    return len([seq for seq in range(start, stop) if events[seq]['action'] == EVENT_PLAY_TURN])
 
 
 class InteractiveGame(Game):
@@ -18,6 +40,15 @@ class InteractiveGame(Game):
         suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
         special_ranks (Dict[int, str]): Dictionary of special characters that receive a rank or value, e.g. 13: 'K'
         name_p1 (str): Player 1's name
+        difficulty (str): PC player's difficulty level, one of constants.PC_DIFFICULTIES
+        event_sink (EventSink): Receiver of the turn events (Default: discards them)
+        version (int): Version of the game document at the database (Default: 0, a new game)
+        history_loader (Callable[[], Dict[int, Dict[str, Any]]]): Reads the history saved apart from the game document,
+            called the first time the whole history is needed (Default: the history is complete in memory)
+        seed (int): Seed of the decks shuffle, the targets and the PC choices. A game with a seed is event-sourced: it
+            records its actions as events and can be rebuilt replaying them (Default: None, random and not replayable)
+        events (Dict[int, Dict[str, Any]]): Events already applied to the state of an event-sourced game
+        snapshot_event (int): Number of events applied to the saved state fields of an event-sourced game
 
     Attributes:
         (inherited from Game)
@@ -27,27 +58,273 @@ class InteractiveGame(Game):
         _hand_p2 (List[Card]): Player 2's hand
         _created_date (int): Timestamp of the object creation
         _history (Dict): Information for each turn
+        _difficulty (str): PC player's difficulty level
+        _version (int): Number of times the game document has been updated at the database
+        __dirty_fields (Set[str]): Document fields changed since the last save (runtime only)
+        __dirty_turns (List[int]): History turns added since the last save (runtime only)
+        __num_turns_increment (int): Turns played since the last save (runtime only)
+        __history_loader (Callable[[], Dict[int, Dict[str, Any]]]): Pending loader of the saved history (runtime only)
+        __embedded_history (bool): The history was read from the game document instead of its own collection
+        __missing_turns (List[int]): Turns of the game without saved details, found when the history was loaded
+        _seed (int): Seed of an event-sourced game, None for the other games
+        _events (Dict[int, Dict[str, Any]]): Actions of an event-sourced game by sequence number
+        __snapshot_event (int): Number of events applied to the saved state fields
+        __num_saved_events (int): Number of events already saved (runtime only)
     """
 
     def __init__(self, num_ranks: int, suits: Dict[str, str], special_ranks: Dict[int, str], name_p1: str,
                  name_p2: str = 'PC', id_game: str = None, created_date: int = None, curr_target: int = None,
                  hand_p1: List[Card] = [], hand_p2: List[Card] = [], history: Dict = {},
-                 deck_p1: Deck = None, deck_p2: Deck = None, num_turns: int = 0):
+                 deck_p1: Deck = None, deck_p2: Deck = None, num_turns: int = 0,
+                 difficulty: str = constants.PC_DIFFICULTY_NORMAL, event_sink: EventSink = None, version: int = 0,
+                 history_loader: Callable[[], Dict[int, Dict[str, Any]]] = None, seed: int = None,
+                 events: Dict[int, Dict[str, Any]] = None, snapshot_event: int = 0):
+        if difficulty not in PC_STRATEGIES:
+            raise Exception(f"Invalid difficulty '{difficulty}'. Valid options: {constants.PC_DIFFICULTIES}")
         # Calling parent constructor
-        super().__init__(num_ranks, suits, special_ranks, name_p1, name_p2, deck_p1, deck_p2, num_turns)
+        super().__init__(num_ranks, suits, special_ranks, name_p1, name_p2, deck_p1, deck_p2, num_turns, event_sink,
+                         seed)
         # Setup class attributes
         self._id = get_random_string() if not id_game else id_game
         self._created_date = datetime.timestamp(datetime.now()) if not created_date else created_date
         self._current_target = curr_target
         self._hand_p1: List[Card] = hand_p1
         self._hand_p2: List[Card] = hand_p2
-        if not history:
+        if history_loader is not None:
+            self._history: Dict[int, Dict[str, Any]] = dict(history)
+        elif not history:
             initial_turn = dict()
-            initial_turn['DeckPlayer1'] = ','.join(map(str, self.get_deck_player(1).cards))
-            initial_turn['DeckPlayer2'] = ','.join(map(str, self.get_deck_player(2).cards))
+            initial_turn['DeckPlayer1'] = str(self.get_deck_player(1))
+            initial_turn['DeckPlayer2'] = str(self.get_deck_player(2))
             self._history: Dict[int, Dict[str, Any]] = {0: initial_turn}
         else:
             self._history: Dict[int, Dict[str, Any]] = history
+        self._difficulty = difficulty
+        self._version = version
+        self.__dirty_fields: Set[str] = set()
+        self.__dirty_turns: List[int] = []
+        self.__num_turns_increment = 0
+        self.__history_loader = history_loader
+        self.__embedded_history = False
+        self.__missing_turns: List[int] = []
+        self._seed = seed
+        self._events: Dict[int, Dict[str, Any]] = dict(events or dict())
+        self.__snapshot_event = snapshot_event
+        self.__num_saved_events = len(self._events)
+
+    def to_document(self, fields: Iterable[str] = None) -> Dict:
+        """
+        Converts the game to the document saved at the database
+
+        Args:
+            fields (Iterable[str]): Document fields to encode (Default: every field in DOCUMENT_FIELDS, plus the
+                EVENT_SOURCING_FIELDS of an event-sourced game)
+
+        Raises:
+            Exception: When a field is not part of the game document
+
+        Returns:
+            Dict: Game document
+        """
+        if fields is None:
+            fields = self.get_document_fields()
+        document = dict()
+        for field in fields:
+            encoder = DOCUMENT_ENCODERS.get(field)
+            if encoder is None:
+                raise Exception(f"'{field}' is not a field of the game document")
+            document[field] = encoder(self)
+        return document
+
+    def get_document_fields(self) -> List[str]:
+        """
+        Gets the fields of the game document
+
+        Args:
+            None
+
+        Returns:
+            List[str]: DOCUMENT_FIELDS, plus the EVENT_SOURCING_FIELDS of an event-sourced game
+        """
+        return [*DOCUMENT_FIELDS, *EVENT_SOURCING_FIELDS] if self.is_event_sourced() else DOCUMENT_FIELDS
+
+    @classmethod
+    def from_document(cls, document: Dict, event_sink: EventSink = None,
+                      history_loader: Callable[[], Dict[int, Dict[str, Any]]] = None) -> InteractiveGame:
+        """
+        Builds a game from a document created by InteractiveGame.to_document. The history is taken from the document
+        when it has one (games saved before the history had its own collection), otherwise from history_loader.
+        The state fields of an event-sourced game are a snapshot: the events saved after it are replayed, and its
+        history is rebuilt replaying every event instead of using history_loader
+
+        Args:
+            document (Dict): Game document
+            event_sink (EventSink): Receiver of the turn events (Default: discards them)
+            history_loader (Callable[[], Dict[int, Dict[str, Any]]]): Reads the history when the document has none
+
+        Returns:
+            InteractiveGame: Game instance
+        """
+        deck_p1 = Deck.from_document(document.get('_deck_p1'))
+        deck_p2 = Deck.from_document(document.get('_deck_p2'))
+        hand_p1 = [Card.of(raw_card.get('rank'), raw_card.get('suit')) for raw_card in document.get('_hand_p1')]
+        hand_p2 = [Card.of(raw_card.get('rank'), raw_card.get('suit')) for raw_card in document.get('_hand_p2')]
+        embedded_history = '_history' in document
+        seed = document.get('_seed')
+        num_turns = document.get('_num_turns')
+        events = dict()
+        snapshot_event = 0
+        if seed is not None:
+            events = {int(seq): event for seq, event in document.get('_events').items()}
+            snapshot_event = document.get('_snapshot_event', 0)
+            num_turns = count_played_turns(events, 0, snapshot_event)
+            history = dict()
+            history_loader = lambda: game.replay_history()  # noqa: E731
+        elif embedded_history:
+            history = {int(turn): turn_dict for turn, turn_dict in document.get('_history').items()}
+            history_loader = None
+        else:
+            history = dict()
+        game = cls(num_ranks=deck_p1.num_ranks, suits=deck_p1.suits, special_ranks=deck_p1.special_ranks,
+                   name_p1=document.get('_name_p1'), name_p2=document.get('_name_p2'), id_game=document.get('_id'),
+                   created_date=document.get('_created_date'), curr_target=document.get('_current_target'),
+                   hand_p1=hand_p1, hand_p2=hand_p2, history=history, deck_p1=deck_p1, deck_p2=deck_p2,
+                   num_turns=num_turns, difficulty=document.get('_difficulty', constants.PC_DIFFICULTY_NORMAL),
+                   version=document.get('_version', 0), history_loader=history_loader, seed=seed,
+                   events={seq: event for seq, event in events.items() if seq < snapshot_event},
+                   snapshot_event=snapshot_event)
+        game.__embedded_history = embedded_history
+        if len(events) > snapshot_event:
+            # Brings the snapshot up to date, the replayed events are already saved
+            game.apply_events(events[seq] for seq in range(snapshot_event, len(events)))
+            game.clear_changes()
+        if event_sink is not None:
+            game.set_event_sink(event_sink)
+        return game
+
+    @staticmethod
+    def build_new_documents(num_ranks: int, suits: Dict[str, str], special_ranks: Dict[int, str],
+                            names_p1: List[str], name_p2: str = 'PC',
+                            difficulty: str = constants.PC_DIFFICULTY_NORMAL) -> List[Dict]:
+        """
+        Builds the documents of several new games at once, the same documents InteractiveGame(...).to_document() gives
+        without building the games: the decks of every game are shuffled with a single NumPy call (one row of the
+        permutation matrix per game) and the card dicts and pretty strings are shared between the documents
+
+        Args:
+            num_ranks (int): Number of ranks by suit
+            suits (Dict[str, str]): Dictionary containing the suits, e.g. 'club': '♣'
+            special_ranks (Dict[int, str]): Dictionary of special characters that receive a rank or value, e.g. 13: 'K'
+            names_p1 (List[str]): Player 1 name of each game
+            name_p2 (str): Player 2 name of every game
+            difficulty (str): PC difficulty of every game
+
+        Raises:
+            Exception: If the difficulty is not valid
+
+        Returns:
+            List[Dict]: Game documents, ready to be inserted
+        """
+        if difficulty not in PC_STRATEGIES:
+            raise Exception(f"Invalid difficulty '{difficulty}'. Valid options: {constants.PC_DIFFICULTIES}")
+        base_deck = Deck(num_ranks, suits, special_ranks)
+        raw_cards = [card.to_dict() for card in base_deck]
+        pretty_cards = base_deck.get_pretty_deck()
+        num_cards = len(raw_cards)
+        split_idx = num_cards // constants.NUM_SPLITS
+        # argsort of uniform samples gives an independent random permutation per row
+        permutations = numpy.random.random_sample((len(names_p1), num_cards)).argsort(axis=1).tolist()
+        deck_base = {
+            'num_ranks': num_ranks,
+            'suits': suits,
+            'special_ranks': {str(rank): pretty for rank, pretty in special_ranks.items()}
+        }
+        created_date = datetime.timestamp(datetime.now())
+        documents = []
+        for name_p1, permutation in zip(names_p1, permutations):
+            idx_p1, idx_p2 = permutation[:split_idx], permutation[split_idx:2 * split_idx]
+            documents.append({
+                '_name_p1': name_p1,
+                '_name_p2': name_p2,
+                '_num_turns': 0,
+                '_deck_p1': {**deck_base, 'cards': [raw_cards[idx] for idx in idx_p1]},
+                '_deck_p2': {**deck_base, 'cards': [raw_cards[idx] for idx in idx_p2]},
+                '_id': get_random_string(),
+                '_created_date': created_date,
+                '_current_target': None,
+                '_hand_p1': [],
+                '_hand_p2': [],
+                '_history': {'0': {'DeckPlayer1': ','.join([pretty_cards[idx] for idx in idx_p1]),
+                                   'DeckPlayer2': ','.join([pretty_cards[idx] for idx in idx_p2])}},
+                '_difficulty': difficulty,
+                '_version': 0,
+                # A new game has split_idx cards by player, never fewer than CARDS_TO_USE
+                '_winner': None,
+                '_finished': False,
+                '_len_deck_p1': len(idx_p1),
+                '_len_deck_p2': len(idx_p2)
+            })
+        return documents
+
+    def get_dirty_fields(self) -> Set[str]:
+        """
+        Gets the document fields changed since the last save, '_num_turns' and '_history' are tracked apart with
+        get_num_turns_increment and get_dirty_turns
+
+        Args:
+            None
+
+        Returns:
+            Set[str]: Changed document fields
+        """
+        return set(self.__dirty_fields)
+
+    def get_dirty_turns(self) -> List[int]:
+        """
+        Gets the history turns added since the last save
+
+        Args:
+            None
+
+        Returns:
+            List[int]: New history turns
+        """
+        return list(self.__dirty_turns)
+
+    def get_num_turns_increment(self) -> int:
+        """
+        Gets the number of turns played since the last save
+
+        Args:
+            None
+
+        Returns:
+            int: Turns played
+        """
+        return self.__num_turns_increment
+
+    def has_changes(self) -> bool:
+        return bool(self.__dirty_fields or self.__dirty_turns or self.__num_turns_increment or
+                    len(self._events) > self.__num_saved_events)
+
+    def clear_changes(self) -> None:
+        """
+        Marks the game as saved
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.__dirty_fields.clear()
+        self.__dirty_turns.clear()
+        self.__num_turns_increment = 0
+        self.__num_saved_events = len(self._events)
+
+    def increment_num_turn(self) -> None:
+        super().increment_num_turn()
+        self.__num_turns_increment += 1
 
     def get_id(self) -> str:
         """
@@ -63,7 +340,7 @@ class InteractiveGame(Game):
 
     def get_history(self) -> Dict[int, Dict[str, Any]]:
         """
-        Gets each turn details from this InteractiveGame instance
+        Gets each turn details from this InteractiveGame instance, reading the saved history the first time
 
         Args:
             None
@@ -71,19 +348,228 @@ class InteractiveGame(Game):
         Returns:
             Dict[int, Dict[str, Any]]: Dictionary having details of each turn
         """
+        if self.__history_loader is not None:
+            self.merge_loaded_history(self.__history_loader())
         return self._history
 
-    def get_created_date(self) -> int:
+    def get_history_turn(self, turn: int) -> Dict[str, Any]:
         """
-        Gets the creation date
+        Gets the details of a turn played by this instance (e.g. a dirty turn) without reading the saved history
+
+        Args:
+            turn (int): Turn number
+
+        Returns:
+            Dict[str, Any]: Turn details
+        """
+        return self._history[turn]
+
+    def merge_loaded_history(self, saved_history: Dict[int, Dict[str, Any]]) -> None:
+        """
+        Completes the history with the saved turns, the turns played by this instance are kept
+
+        Args:
+            saved_history (Dict[int, Dict[str, Any]]): Saved turns by turn number
+
+        Returns:
+            None
+        """
+        # Turns past the game's turn count belong to a newer version of the game and are ignored
+        saved_history = {turn: turn_dict for turn, turn_dict in saved_history.items() if turn <= self._num_turns}
+        self._history = dict(sorted({**saved_history, **self._history}.items()))
+        self.__history_loader = None
+        # A save interrupted between the document update and the history write leaves turns without details, the
+        # history is served without them
+        self.__missing_turns = [turn for turn in range(self._num_turns + 1) if turn not in self._history]
+
+    def get_missing_turns(self) -> List[int]:
+        """
+        Gets the turns counted by the game whose details weren't found when the saved history was loaded
 
         Args:
             None
 
         Returns:
-            int: Time stamp
+            List[int]: Turn numbers, empty when the history is complete or not loaded yet
         """
-        return self._created_date
+        return list(self.__missing_turns)
+
+    def is_history_loaded(self) -> bool:
+        return self.__history_loader is None
+
+    def get_num_loaded_turns(self) -> int:
+        """
+        Gets the number of history turns held in memory, without reading the saved history
+
+        Args:
+            None
+
+        Returns:
+            int: Turns in memory
+        """
+        return len(self._history)
+
+    def has_embedded_history(self) -> bool:
+        """
+        Checks whether the history was read from the game document, such games move it to the history collection on
+        their next save
+
+        Args:
+            None
+
+        Returns:
+            bool: Flag of an embedded history
+        """
+        return self.__embedded_history
+
+    def set_embedded_history(self, embedded_history: bool) -> None:
+        """
+        Sets where the saved history is, e.g. after it was moved to the history collection
+
+        Args:
+            embedded_history (bool): Flag of an embedded history
+
+        Returns:
+            None
+        """
+        self.__embedded_history = embedded_history
+
+    def is_event_sourced(self) -> bool:
+        return self._seed is not None
+
+    def get_seed(self) -> Union[int, None]:
+        """
+        Gets the seed of an event-sourced game
+
+        Args:
+            None
+
+        Returns:
+            Union[int, None]: Seed, None if the game is not event-sourced
+        """
+        return self._seed
+
+    def get_events(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Gets the actions applied to an event-sourced game since it was created
+
+        Args:
+            None
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Events by sequence number
+        """
+        return self._events
+
+    def get_new_events(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Gets the events recorded since the last save
+
+        Args:
+            None
+
+        Returns:
+            Dict[int, Dict[str, Any]]: New events by sequence number
+        """
+        return {seq: self._events[seq] for seq in range(self.__num_saved_events, len(self._events))}
+
+    def get_snapshot_event(self) -> int:
+        """
+        Gets the number of events applied to the saved state fields (decks, hands and target)
+
+        Args:
+            None
+
+        Returns:
+            int: Events in the saved snapshot
+        """
+        return self.__snapshot_event
+
+    def set_snapshot_event(self, snapshot_event: int) -> None:
+        """
+        Sets the number of events applied to the saved state fields, after a snapshot has been saved
+
+        Args:
+            snapshot_event (int): Events in the saved snapshot
+
+        Returns:
+            None
+        """
+        self.__snapshot_event = snapshot_event
+
+    def get_num_turns_since_snapshot(self) -> int:
+        """
+        Gets the number of turns a load of the game would replay on top of the saved snapshot
+
+        Args:
+            None
+
+        Returns:
+            int: Played turns after the snapshot
+        """
+        return count_played_turns(self._events, self.__snapshot_event, len(self._events))
+
+    def apply_events(self, events: Iterable[Dict[str, Any]]) -> None:
+        """
+        Applies recorded actions to this game, in order
+
+        Args:
+            events (Iterable[Dict[str, Any]]): Events, e.g. [{'action': 'hand'}, {'action': 'play', 'p1': [0, 1],
+                'p2': [2, 0]}]
+
+        Raises:
+            Exception: If an event action is unknown
+
+        Returns:
+            None
+        """
+        for event in events:
+            action = event.get('action')
+            if action == EVENT_TAKE_HAND:
+                self.take_hand()
+            elif action == EVENT_PLAY_TURN:
+                self.play_turn(event['p1'], event['p2'])
+            else:
+                raise Exception(f"Unknown game event '{action}'")
+
+    def replay_history(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Rebuilds the whole history of an event-sourced game: a new game with the same seed replays every event
+
+        Args:
+            None
+
+        Raises:
+            Exception: If the game is not event-sourced
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Dictionary having details of each turn
+        """
+        if not self.is_event_sourced():
+            raise Exception(f'Game {self._id} is not event-sourced, it has no events to replay')
+        deck = self._deck_p1
+        game = InteractiveGame(deck.num_ranks, deck.suits, deck.special_ranks, self._name_p1, self._name_p2,
+                               id_game=self._id, created_date=self._created_date, difficulty=self._difficulty,
+                               seed=self._seed)
+        game.apply_events(self._events[seq] for seq in range(len(self._events)))
+        return game.get_history()
+
+    def __record_event(self, event: Dict[str, Any]) -> None:
+        if self.is_event_sourced():
+            self._events[len(self._events)] = event
+
+    def __get_action_seed(self) -> Union[str, None]:
+        """
+        Gets the seed of the random choices of the current turn (the target and the PC cards), so replaying the events
+        makes the same choices
+
+        Args:
+            None
+
+        Returns:
+            Union[str, None]: Seed, None if the game is not event-sourced
+        """
+        return None if self._seed is None else f'{self._seed}:{self._num_turns}'
 
     def get_created_date(self) -> int:
         """
@@ -97,6 +583,54 @@ class InteractiveGame(Game):
         """
         return self._created_date
 
+    def get_version(self) -> int:
+        """
+        Gets the version of the game document this instance was loaded from or last saved as
+
+        Args:
+            None
+
+        Returns:
+            int: Document version
+        """
+        return self._version
+
+    def set_version(self, version: int) -> None:
+        """
+        Sets the document version after the game has been saved
+
+        Args:
+            version (int): Document version
+
+        Returns:
+            None
+        """
+        self._version = version
+
+    def get_difficulty(self) -> str:
+        """
+        Gets the PC player's difficulty level
+
+        Args:
+            None
+
+        Returns:
+            str: Difficulty level
+        """
+        return self._difficulty
+
+    def get_pc_strategy(self) -> Strategy:
+        """
+        Gets the strategy used by the PC player (player 2) according to the difficulty level
+
+        Args:
+            None
+
+        Returns:
+            Strategy: PC player's strategy
+        """
+        return PC_STRATEGIES[self._difficulty]()
+
     def get_target_rank(self) -> int:
         """
         Gets the current target rank
@@ -120,6 +654,7 @@ class InteractiveGame(Game):
             None
         """
         self._current_target = new_rank
+        self.__dirty_fields.add('_current_target')
 
     def get_deck_player(self, player) -> Union[int, None]:
         """
@@ -227,23 +762,26 @@ class InteractiveGame(Game):
         if not self._hand_p1 or not self._hand_p2:
             take_new_hand = True
             new_rank = get_random_num_in_range(
-                constants.START_TARGET_RANGE, constants.STOP_TARGET_RANGE)
+                constants.START_TARGET_RANGE, constants.STOP_TARGET_RANGE, self.__get_action_seed())
             self.set_target_rank(new_rank)
             self._hand_p1, self._hand_p2 = self.__draw()
+            self.__dirty_fields.update(['_hand_p1', '_hand_p2', '_deck_p1', '_deck_p2'])
+            self.__record_event({'action': EVENT_TAKE_HAND})
         return take_new_hand
 
-    def __validate_indexes_card_options(self, idx_cards: List[int], len_hand: int) -> bool:
+    def __validate_indexes_card_options(self, idx_cards: List[int], len_hand: int, player: int = 1) -> bool:
         """
-        Validates the provided indexes for the player 1
+        Validates the provided indexes for a player
 
         Args:
             idx_cards (List[int]): List of indexes to use
             len_hand (int): Deck length
+            player (int): Player id
 
         Raises:
             Exception: When the user provides more than N-defined indexes
             Exception: When the user provides repeating indexes
-            Exception: When the user provides non-valid indexes 
+            Exception: When the user provides non-valid indexes
 
         Returns:
             is_ok (bool): True if the list is contains valid indexes
@@ -262,7 +800,7 @@ class InteractiveGame(Game):
             else list(range(0, len_hand))
         for idx in idx_cards:
             if idx not in idx_cards_valid_options:
-                idx_cards = [f"{idx}:{card}" for idx, card in enumerate(self.get_hand_player(1))]
+                idx_cards = [f"{idx}:{card}" for idx, card in enumerate(self.get_hand_player(player))]
                 raise Exception(
                     f"{idx} is not a valid index. You can only select {constants.CARDS_TO_USE} of the following "
                     f"indices: {list(idx_cards_valid_options)} -> Your hand is: {idx_cards}")
@@ -273,7 +811,7 @@ class InteractiveGame(Game):
         Gets the winner of the current turn
 
         Args:
-            idx_cards_p1 (List[int]): List of player 1's indexes to use 
+            idx_cards_p1 (List[int]): List of player 1's indexes to use
             idx_cards_p2 (List[int]): List of player 2's indexes to use
 
         Returns:
@@ -297,36 +835,33 @@ class InteractiveGame(Game):
             turn_winner = self.get_name_player(1)
             cards_to_add = [self._hand_p2[idx] for idx in idx_cards_p2]
             self._deck_p1.add_cards(cards_to_add)
+            self.__dirty_fields.add('_deck_p1')
         elif difference_p2 < difference_p1:
             # Turn  Winner : Player 2
             turn_winner = self.get_name_player(2)
             cards_to_add = [self._hand_p1[idx] for idx in idx_cards_p1]
             self._deck_p2.add_cards(cards_to_add)
+            self.__dirty_fields.add('_deck_p2')
 
-        aux_diff_p1 = colored(f'{idx_cards_p1} (dif:{difference_p1})', constants.COLOR_P1)
-        aux_diff_p2 = colored(f'(dif:{difference_p2}) {idx_cards_p2}', constants.COLOR_P2)
-        aux_sum_p1 = colored(f'{selected_cards_p1} (sum:{sum_p1})', constants.COLOR_P1)
-        aux_sum_p2 = colored(f'(sum:{sum_p2}) {selected_cards_p2}', constants.COLOR_P2)
-        len_deck_p1 = colored(f'Deck len {self.get_name_player(1)}: {self.get_deck_len_player(1)}', constants.COLOR_P1)
-        len_deck_p2 = colored(f'Deck len {self.get_name_player(2)}: {self.get_deck_len_player(2)}', constants.COLOR_P2)
-        target_colored = colored(f' Target: {self.get_target_rank()}', 'cyan')
-
-        print(f"HAND: {colored(list(map(str,self._hand_p1)), constants.COLOR_P1)}   {colored(list(map(str, self._hand_p2)), constants.COLOR_P2)}")
-        print(f"INDEX: {aux_diff_p1} -> {target_colored} <- {aux_diff_p2}")
-        print(f"RANKS: {aux_sum_p1} -> {target_colored} <- {aux_sum_p2}")
-        cprint(f"{turn_winner}, Turn: {self.get_num_turns()}", constants.COLOR_WINNER)
-        print(f"{len_deck_p1}    {len_deck_p2}")
+        self.emit(INTERACTIVE_TURN, turn=self.get_num_turns(), name_p1=self.get_name_player(1),
+                  name_p2=self.get_name_player(2), hand_p1=self._hand_p1, hand_p2=self._hand_p2,
+                  idx_cards_p1=idx_cards_p1, idx_cards_p2=idx_cards_p2, ranks_p1=selected_cards_p1,
+                  ranks_p2=selected_cards_p2, target=self.get_target_rank(), turn_winner=turn_winner,
+                  len_deck_p1=self.get_deck_len_player(1), len_deck_p2=self.get_deck_len_player(2))
 
         self._hand_p1 = []
         self._hand_p2 = []
+        self.__dirty_fields.update(['_hand_p1', '_hand_p2'])
         return turn_winner
 
-    def play_turn(self, idx_cards_p1: List[int]) -> Tuple[Union[str, None], List[int]]:
+    def play_turn(self, idx_cards_p1: List[int],
+                  idx_cards_p2: List[int] = None) -> Tuple[Union[str, None], List[int]]:
         """
-        Plays the turn and gets the turn winner 
+        Plays the turn and gets the turn winner
 
         Args:
-            idx_cards_p1 (List[int]): List of player 1's indexes to use 
+            idx_cards_p1 (List[int]): List of player 1's indexes to use
+            idx_cards_p2 (List[int]): List of player 2's indexes to use, if not provided the PC chooses them
 
         Raises:
             Exception: When the game is over
@@ -344,14 +879,22 @@ class InteractiveGame(Game):
             raise Exception("You don't have a hand.")
 
         self.__validate_indexes_card_options(idx_cards_p1, len(self.get_hand_player(1)))
+        if idx_cards_p2 is None:
+            strategy = self.get_pc_strategy()
+            if self.is_event_sourced():
+                strategy.seed(self.__get_action_seed())
+            idx_cards_p2 = strategy.choose_cards(self._hand_p2, self.get_target_rank(), constants.CARDS_TO_USE)
+        else:
+            self.__validate_indexes_card_options(idx_cards_p2, len(self.get_hand_player(2)), player=2)
         self.increment_num_turn()
 
-        idx_cards_p2 = get_closest_index_cards(self._hand_p2, self.get_target_rank(), constants.CARDS_TO_USE)
         turn_winner = self.get_turn_winner(idx_cards_p1, idx_cards_p2)
 
         # check again the winner
         self.get_winner(constants.CARDS_TO_USE)
         self.generate_history_turn(idx_cards_p1, idx_cards_p2, turn_winner)
+        self.__record_event({'action': EVENT_PLAY_TURN, 'p1': [int(idx) for idx in idx_cards_p1],
+                             'p2': [int(idx) for idx in idx_cards_p2]})
         return turn_winner, idx_cards_p2
 
     def generate_history_turn(self, idx_cards_p1: List[int], idx_cards_p2: List[int],
@@ -384,3 +927,32 @@ class InteractiveGame(Game):
         turn_dict['turn'] = curr_turn
         turn_dict['turnWinner'] = turn_winner if turn_winner else 'Tie'
         self._history[curr_turn] = turn_dict
+        self.__dirty_turns.append(curr_turn)
+
+
+DOCUMENT_ENCODERS: Dict[str, Callable[[InteractiveGame], Any]] = {
+    '_name_p1': lambda game: game._name_p1,
+    '_name_p2': lambda game: game._name_p2,
+    '_num_turns': lambda game: game._num_turns,
+    '_deck_p1': lambda game: game._deck_p1.to_document(),
+    '_deck_p2': lambda game: game._deck_p2.to_document(),
+    '_id': lambda game: game._id,
+    '_created_date': lambda game: game._created_date,
+    '_current_target': lambda game: game._current_target,
+    '_hand_p1': lambda game: [card.to_dict() for card in game._hand_p1],
+    '_hand_p2': lambda game: [card.to_dict() for card in game._hand_p2],
+    '_history': lambda game: {str(turn): turn_dict for turn, turn_dict in game.get_history().items()},
+    '_difficulty': lambda game: game._difficulty,
+    '_version': lambda game: game._version,
+    # Status fields, derived from the fields above and saved so the games can be queried by status
+    '_winner': lambda game: game.get_winner(constants.CARDS_TO_USE),
+    '_finished': lambda game: game.get_winner_player(constants.CARDS_TO_USE) is not None,
+    '_len_deck_p1': lambda game: len(game._deck_p1),
+    '_len_deck_p2': lambda game: len(game._deck_p2),
+    # Event-sourced games only. The state fields encoded with them include every event
+    '_seed': lambda game: game._seed,
+    '_events': lambda game: {str(seq): event for seq, event in game._events.items()},
+    '_snapshot_event': lambda game: len(game._events)
+}
+EVENT_SOURCING_FIELDS: List[str] = ['_seed', '_events', '_snapshot_event']
+DOCUMENT_FIELDS: List[str] = [field for field in DOCUMENT_ENCODERS if field not in EVENT_SOURCING_FIELDS]
@@ -0,0 +1,102 @@
+import random
+from abc import ABC, abstractmethod
+from typing import List, Union
+from App.models.card import Card
+from App.util.constants import PC_DIFFICULTY_EASY, PC_DIFFICULTY_NORMAL, PC_DIFFICULTY_HARD
+from App.util.helpers import get_closest_index_cards, get_optimal_index_cards
+
+
+class Strategy(ABC):
+    """
+    Base class for the policies that choose which cards of a hand to play on an InteractiveGame turn
+
+    Attributes:
+        name (str): Short name used on reports
+    """
+    name = 'strategy'
+
+    @abstractmethod
+    def choose_cards(self, hand: List[Card], target_rank: int, num_cards_to_use: int) -> List[int]:
+        """
+        Chooses the cards to play
+
+        Args:
+            hand (List[Card]): Cards of the player's hand
+            target_rank (int): Target to approximate with the Card ranks
+            num_cards_to_use (int): Cards allowed to use
+
+        Returns:
+            List[int]: Indexes of the hand's cards to play
+        """
+
+    def seed(self, seed: Union[int, str]) -> None:
+        """
+        Resets the random state of the strategy (if it has one) before a match
+
+        Args:
+            seed (Union[int, str]): Match seed
+
+        Returns:
+            None
+        """
+        pass
+
+    def __str__(self) -> str:
+        return self.name
+
+
+class GreedyStrategy(Strategy):
+    """
+    Picks one card at a time, the closest one to the remaining target (the PC player's default)
+    """
+    name = 'greedy'
+
+    def choose_cards(self, hand: List[Card], target_rank: int, num_cards_to_use: int) -> List[int]:
+        return get_closest_index_cards(hand, target_rank, num_cards_to_use)
+
+
+class RandomStrategy(Strategy):
+    """
+    Picks random cards
+    """
+    name = 'random'
+
+    def __init__(self):
+        self.__random = random.Random()
+
+    def choose_cards(self, hand: List[Card], target_rank: int, num_cards_to_use: int) -> List[int]:
+        return self.__random.sample(range(len(hand)), num_cards_to_use)
+
+    def seed(self, seed: Union[int, str]) -> None:
+        self.__random.seed(seed)
+
+
+class HighestRanksStrategy(Strategy):
+    """
+    Picks the cards with the highest ranks, ignoring the target
+    """
+    name = 'highest'
+
+    def choose_cards(self, hand: List[Card], target_rank: int, num_cards_to_use: int) -> List[int]:
+        sorted_idx = sorted(range(len(hand)), key=lambda idx: hand[idx].get_rank(), reverse=True)
+        return sorted_idx[:num_cards_to_use]
+
+
+class OptimalStrategy(Strategy):
+    """
+    Picks the cards whose rank sum is the closest possible to the target
+    """
+    name = 'optimal'
+
+    def choose_cards(self, hand: List[Card], target_rank: int, num_cards_to_use: int) -> List[int]:
+        return get_optimal_index_cards(hand, target_rank, num_cards_to_use)
+
+
+STRATEGIES = {strategy.name: strategy
+              for strategy in [GreedyStrategy, RandomStrategy, HighestRanksStrategy, OptimalStrategy]}
+
+PC_STRATEGIES = {
+    PC_DIFFICULTY_EASY: RandomStrategy,
+    PC_DIFFICULTY_NORMAL: GreedyStrategy,
+    PC_DIFFICULTY_HARD: OptimalStrategy
+}
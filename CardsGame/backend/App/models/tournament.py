@@ -0,0 +1,228 @@
+from __future__ import annotations
+import copy
+import math
+import os
+import random
+import numpy
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+from App.models.interactive_game import InteractiveGame
+from App.models.strategy import Strategy
+from App.util import constants
+
+Z_95 = 1.959964
+NAME_P1 = 'p1'
+NAME_P2 = 'p2'
+
+
+class MatchupStats(NamedTuple):
+    """
+    Merged results of the games played between two strategies
+
+    Attributes:
+        strategy_p1 (str): Player 1's strategy name
+        strategy_p2 (str): Player 2's strategy name
+        games (int): Number of games played
+        wins_p1 (int): Games won by the player 1
+        wins_p2 (int): Games won by the player 2
+        ties (int): Games that ended in a tie
+        sum_turns (int): Sum of the turns of every game
+        sum_sq_turns (int): Sum of the squared turns of every game
+    """
+    strategy_p1: str
+    strategy_p2: str
+    games: int = 0
+    wins_p1: int = 0
+    wins_p2: int = 0
+    ties: int = 0
+    sum_turns: int = 0
+    sum_sq_turns: int = 0
+
+    def merge(self, other: MatchupStats) -> MatchupStats:
+        return self._replace(games=self.games + other.games, wins_p1=self.wins_p1 + other.wins_p1,
+                             wins_p2=self.wins_p2 + other.wins_p2, ties=self.ties + other.ties,
+                             sum_turns=self.sum_turns + other.sum_turns,
+                             sum_sq_turns=self.sum_sq_turns + other.sum_sq_turns)
+
+    def win_rate(self, player: int) -> Tuple[float, float, float]:
+        """
+        Gets the win rate of a player with its 95% Wilson score interval
+
+        Args:
+            player (int): Player id
+
+        Returns:
+            Tuple[float, float, float]: Win rate, lower and upper bound
+        """
+        wins = self.wins_p1 if player == 1 else self.wins_p2
+        if not self.games:
+            return 0.0, 0.0, 0.0
+        rate = wins / self.games
+        denominator = 1 + Z_95 ** 2 / self.games
+        center = (rate + Z_95 ** 2 / (2 * self.games)) / denominator
+        margin = Z_95 * math.sqrt(rate * (1 - rate) / self.games + Z_95 ** 2 / (4 * self.games ** 2)) / denominator
+        return rate, center - margin, center + margin
+
+    def average_turns(self) -> Tuple[float, float]:
+        """
+        Gets the average number of turns with the half width of its 95% confidence interval
+
+        Args:
+            None
+
+        Returns:
+            Tuple[float, float]: Average turns and its margin
+        """
+        if not self.games:
+            return 0.0, 0.0
+        mean = self.sum_turns / self.games
+        variance = max(self.sum_sq_turns / self.games - mean ** 2, 0.0)
+        return mean, Z_95 * math.sqrt(variance / self.games)
+
+
+def play_match(strategy_p1: Strategy, strategy_p2: Strategy, seed: int) -> Tuple[Union[str, None], int]:
+    """
+    Plays a whole InteractiveGame in memory, the seed fixes the shuffle, the targets and the strategies' choices. Each
+    strategy gets its own seed derived from the match seed, so two random strategies don't make the same choices
+
+    Args:
+        strategy_p1 (Strategy): Player 1's strategy
+        strategy_p2 (Strategy): Player 2's strategy, another instance than strategy_p1 (see play_matches)
+        seed (int): Match seed
+
+    Returns:
+        Tuple[str|None, int]: Winner's name ('Tie' on a tie) and number of turns played
+    """
+    random.seed(seed)
+    numpy.random.seed(seed)
+    strategy_p1.seed(seed * 2)
+    strategy_p2.seed(seed * 2 + 1)
+    game = InteractiveGame(constants.NUM_RANKS, constants.SUITS, constants.SPECIAL_RANKS, NAME_P1, NAME_P2)
+    winner = game.get_winner(constants.CARDS_TO_USE)
+    while not winner:
+        game.take_hand()
+        winner = game.get_winner(constants.CARDS_TO_USE)
+        if winner:
+            break
+        target = game.get_target_rank()
+        idx_cards_p1 = strategy_p1.choose_cards(game.get_hand_player(1, False), target, constants.CARDS_TO_USE)
+        idx_cards_p2 = strategy_p2.choose_cards(game.get_hand_player(2, False), target, constants.CARDS_TO_USE)
+        game.play_turn(idx_cards_p1, idx_cards_p2)
+        winner = game.get_winner(constants.CARDS_TO_USE)
+    return winner, game.get_num_turns()
+
+
+def play_matches(strategy_p1: Strategy, strategy_p2: Strategy, seeds: Sequence[int]) -> MatchupStats:
+    """
+    Plays a match per seed and merges the results (runs inside the worker processes)
+
+    Args:
+        strategy_p1 (Strategy): Player 1's strategy
+        strategy_p2 (Strategy): Player 2's strategy
+        seeds (Sequence[int]): Match seeds
+
+    Returns:
+        MatchupStats: Merged results
+    """
+    if strategy_p2 is strategy_p1:
+        # A strategy playing itself (round_robin): each player needs its own random state
+        strategy_p2 = copy.deepcopy(strategy_p1)
+    stats = MatchupStats(str(strategy_p1), str(strategy_p2))
+    wins = {NAME_P1: 0, NAME_P2: 0, 'Tie': 0}
+    sum_turns = 0
+    sum_sq_turns = 0
+    for seed in seeds:
+        winner, num_turns = play_match(strategy_p1, strategy_p2, seed)
+        wins[winner] += 1
+        sum_turns += num_turns
+        sum_sq_turns += num_turns ** 2
+    return stats._replace(games=len(seeds), wins_p1=wins[NAME_P1], wins_p2=wins[NAME_P2], ties=wins['Tie'],
+                          sum_turns=sum_turns, sum_sq_turns=sum_sq_turns)
+
+
+class Tournament:
+    """
+    Plays strategies against each other over many seeded InteractiveGame matches split across processes
+
+    Args:
+        num_games (int): Games played by each matchup
+        base_seed (int): Seed of the first game, every matchup uses the same seeds
+        workers (int): Number of worker processes (Default: number of CPUs)
+        chunk_size (int): Games sent to a worker at once
+
+    Attributes:
+        seeds (List[int]): Seeds of the games played by each matchup
+    """
+
+    def __init__(self, num_games: int, base_seed: int = 0, workers: int = None, chunk_size: int = 250):
+        self.seeds: List[int] = list(range(base_seed, base_seed + num_games))
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def play(self, strategy_p1: Strategy, strategy_p2: Strategy) -> MatchupStats:
+        """
+        Plays all the games of a matchup
+
+        Args:
+            strategy_p1 (Strategy): Player 1's strategy
+            strategy_p2 (Strategy): Player 2's strategy
+
+        Returns:
+            MatchupStats: Merged results
+        """
+        return self.play_all([(strategy_p1, strategy_p2)])[0]
+
+    def play_all(self, matchups: Sequence[Tuple[Strategy, Strategy]]) -> List[MatchupStats]:
+        """
+        Plays every matchup, all the chunks of all the matchups share the same process pool
+
+        Args:
+            matchups (Sequence[Tuple[Strategy, Strategy]]): Pairs of (player 1, player 2) strategies
+
+        Returns:
+            List[MatchupStats]: Merged results in the same order as the matchups
+        """
+        chunks = [self.seeds[start:start + self.chunk_size] for start in range(0, len(self.seeds), self.chunk_size)]
+        results: Dict[int, MatchupStats] = {idx: MatchupStats(str(p1), str(p2))
+                                            for idx, (p1, p2) in enumerate(matchups)}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = [(idx, executor.submit(play_matches, p1, p2, chunk))
+                       for idx, (p1, p2) in enumerate(matchups) for chunk in chunks]
+            for idx, future in futures:
+                results[idx] = results[idx].merge(future.result())
+        return [results[idx] for idx in range(len(matchups))]
+
+    def round_robin(self, strategies: Sequence[Strategy]) -> List[MatchupStats]:
+        """
+        Plays every strategy against every strategy (itself included) as player 1 and as player 2
+
+        Args:
+            strategies (Sequence[Strategy]): Strategies to compare
+
+        Returns:
+            List[MatchupStats]: Results of each matchup
+        """
+        return self.play_all([(p1, p2) for p1 in strategies for p2 in strategies])
+
+    @staticmethod
+    def format_table(results: Sequence[MatchupStats]) -> str:
+        """
+        Formats the results as a text table
+
+        Args:
+            results (Sequence[MatchupStats]): Results of each matchup
+
+        Returns:
+            str: Table with win rates, 95% intervals and average turns
+        """
+        lines = [f"{'p1':>10} {'p2':>10} {'games':>7} {'win p1 [95% CI]':>24} {'win p2 [95% CI]':>24} "
+                 f"{'ties':>6} {'turns':>14}"]
+        for stats in results:
+            rate_p1, low_p1, high_p1 = stats.win_rate(1)
+            rate_p2, low_p2, high_p2 = stats.win_rate(2)
+            turns, margin = stats.average_turns()
+            ties = stats.ties / stats.games if stats.games else 0.0
+            lines.append(f'{stats.strategy_p1:>10} {stats.strategy_p2:>10} {stats.games:>7} '
+                         f'{rate_p1:>8.3f} [{low_p1:.3f}, {high_p1:.3f}] {rate_p2:>8.3f} [{low_p2:.3f}, {high_p2:.3f}] '
+                         f'{ties:>6.3f} {turns:>7.2f} ±{margin:.2f}')
+        return '\n'.join(lines)
@@ -0,0 +1,385 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Set, Union
+from config import BROKER_FANOUT, BROKER_SQLITE_PATH, BROKER_POLL_SECONDS, BROKER_MAX_QUEUED_EVENTS
+
+FANOUT_LOCAL = 'local'
+FANOUT_SQLITE = 'sqlite'
+FANOUTS = [FANOUT_LOCAL, FANOUT_SQLITE]
+# Topic of the games created, finished and deleted, the games lists subscribe to it
+LOBBY_TOPIC = 'lobby'
+# Seconds the events stay in the shared table of the sqlite fan-out
+SQLITE_FANOUT_RETENTION_SECONDS = 60
+
+# {'type': 'turn', 'data': {...}}
+Event = Dict[str, Any]
+Deliver = Callable[[str, Event], int]
+
+
+def game_topic(id_game: str) -> str:
+    """
+    Gets the topic of the events of a game
+
+    Args:
+        id_game (str): Game id
+
+    Returns:
+        str: Topic name
+    """
+    return f'game:{id_game}'
+
+
+class Subscription:
+    """
+    Events of a topic waiting to be sent to one client. Events are put by the broker from any thread and taken by the
+    thread (WSGI) or the event loop (ASGI) serving the client. It's bounded: a client that doesn't keep up loses its
+    oldest events
+
+    Args:
+        topic (str): Subscribed topic
+        max_events (int): Maximum number of queued events
+
+    Attributes:
+        dropped (int): Events discarded because the queue was full
+    """
+
+    def __init__(self, topic: str, max_events: int):
+        self.topic = topic
+        self.max_events = max_events
+        self.dropped = 0
+        self.__events: Deque[Event] = deque()
+        self.__condition = threading.Condition()
+        self.__wake_up: Union[Callable[[], None], None] = None
+
+    def put(self, event: Event) -> bool:
+        """
+        Queues an event
+
+        Args:
+            event (Event): Published event
+
+        Returns:
+            bool: False if an older event was dropped to make room
+        """
+        with self.__condition:
+            full = len(self.__events) >= self.max_events
+            if full:
+                self.__events.popleft()
+                self.dropped += 1
+            self.__events.append(event)
+            self.__condition.notify()
+            wake_up = self.__wake_up
+        if wake_up is not None:
+            wake_up()
+        return not full
+
+    def get(self, timeout: float) -> Union[Event, None]:
+        """
+        Takes the next event, blocking the calling thread until there's one
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            Union[Event, None]: Next event, None if none arrived in time
+        """
+        with self.__condition:
+            if not self.__events:
+                self.__condition.wait(timeout)
+            return self.__events.popleft() if self.__events else None
+
+    async def get_async(self, timeout: float) -> Union[Event, None]:
+        """
+        Takes the next event, waiting on the running event loop until there's one
+
+        Args:
+            timeout (float): Maximum seconds to wait
+
+        Returns:
+            Union[Event, None]: Next event, None if none arrived in time
+        """
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        with self.__condition:
+            if self.__events:
+                return self.__events.popleft()
+            # Events can be put from other threads, e.g. by the fan-out
+            self.__wake_up = lambda: loop.call_soon_threadsafe(ready.set)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        with self.__condition:
+            self.__wake_up = None
+            return self.__events.popleft() if self.__events else None
+
+
+class Fanout:
+    """
+    Cross-worker fan-out of the broker: sends the events published by a worker to the brokers of the other workers,
+    which deliver them to their own subscribers. This one has nobody to send to, a single worker serves every
+    subscriber. A message bus (Redis pub/sub, a Mongo capped collection...) plugs in by overriding the three methods
+    """
+
+    def publish(self, topic: str, event: Event) -> None:
+        """
+        Sends an event to the other workers
+
+        Args:
+            topic (str): Event topic
+            event (Event): Published event
+
+        Returns:
+            None
+        """
+        pass
+
+    def start(self, deliver: Deliver) -> None:
+        """
+        Starts receiving the events of the other workers, called when the worker gets its first subscriber
+
+        Args:
+            deliver (Deliver): Delivers an event to the local subscribers, see Broker.deliver
+
+        Returns:
+            None
+        """
+        pass
+
+    def reset(self) -> None:
+        """
+        Forgets the connections and threads of the process (e.g. after a fork), start opens them again
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        pass
+
+
+class SQLiteFanout(Fanout):
+    """
+    Local stand-in of a message bus: the workers of one host append their events to a table of a shared SQLite file
+    and a thread of each worker with subscribers reads the events of the others every poll_seconds. Events older than
+    SQLITE_FANOUT_RETENTION_SECONDS are deleted by the publishers
+
+    Args:
+        path (str): Database file shared by the workers (Default: config.BROKER_SQLITE_PATH)
+        poll_seconds (float): Seconds between two reads (Default: config.BROKER_POLL_SECONDS)
+    """
+
+    def __init__(self, path: str = BROKER_SQLITE_PATH, poll_seconds: float = BROKER_POLL_SECONDS):
+        self.__path = path
+        self.__poll_seconds = poll_seconds
+        self.__lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.__origin = uuid.uuid4().hex
+        self.__pid = os.getpid()
+        self.__connection: Union[sqlite3.Connection, None] = None
+        self.__thread: Union[threading.Thread, None] = None
+        self.__last_pruned = 0.0
+
+    def __connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.__path, isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('CREATE TABLE IF NOT EXISTS events (seq INTEGER PRIMARY KEY AUTOINCREMENT, '
+                           'origin TEXT NOT NULL, topic TEXT NOT NULL, event TEXT NOT NULL, created REAL NOT NULL)')
+        return connection
+
+    def publish(self, topic: str, event: Event) -> None:
+        now = time.time()
+        with self.__lock:
+            if self.__pid != os.getpid():
+                self.reset()
+            if self.__connection is None:
+                self.__connection = self.__connect()
+            self.__connection.execute('INSERT INTO events (origin, topic, event, created) VALUES (?, ?, ?, ?)',
+                                      (self.__origin, topic, json.dumps(event), now))
+            if now - self.__last_pruned > SQLITE_FANOUT_RETENTION_SECONDS:
+                self.__connection.execute('DELETE FROM events WHERE created < ?',
+                                          (now - SQLITE_FANOUT_RETENTION_SECONDS,))
+                self.__last_pruned = now
+
+    def start(self, deliver: Deliver) -> None:
+        with self.__lock:
+            if self.__pid != os.getpid():
+                self.reset()
+            if self.__thread is not None:
+                return
+            self.__thread = threading.Thread(target=self.__poll, args=(deliver, self.__origin),
+                                             name='sqlite-fanout', daemon=True)
+            self.__thread.start()
+
+    def __poll(self, deliver: Deliver, origin: str) -> None:
+        connection = self.__connect()
+        last_seq = connection.execute('SELECT COALESCE(MAX(seq), 0) FROM events').fetchone()[0]
+        # A reset (fork) gives the worker a new origin and thread
+        while origin == self.__origin:
+            rows = connection.execute('SELECT seq, origin, topic, event FROM events WHERE seq > ? ORDER BY seq',
+                                      (last_seq,)).fetchall()
+            for seq, event_origin, topic, event in rows:
+                last_seq = seq
+                if event_origin != origin:
+                    deliver(topic, json.loads(event))
+            time.sleep(self.__poll_seconds)
+        connection.close()
+
+
+def create_fanout(kind: str = BROKER_FANOUT) -> Fanout:
+    """
+    Creates the cross-worker fan-out of the broker
+
+    Args:
+        kind (str): 'local' or 'sqlite'
+
+    Raises:
+        Exception: If the fan-out doesn't exist
+
+    Returns:
+        Fanout: Fan-out instance
+    """
+    if kind == FANOUT_LOCAL:
+        return Fanout()
+    elif kind == FANOUT_SQLITE:
+        return SQLiteFanout()
+    raise Exception(f'Invalid broker fan-out "{kind}", expected one of {FANOUTS}')
+
+
+class Broker:
+    """
+    In-process publish/subscribe of the game events: the requests that change a game publish to its topic and the
+    event streams of the clients subscribe to it, so watching a game doesn't read the database. The fan-out forwards
+    the events to the brokers of the other workers. One broker per worker process, like the game cache
+
+    Args:
+        fanout (Fanout): Cross-worker fan-out (Default: config.BROKER_FANOUT)
+        max_events (int): Maximum number of events queued by subscription (Default: config.BROKER_MAX_QUEUED_EVENTS)
+
+    Attributes:
+        published (int): Events published by this worker
+        delivered (int): Events queued to the subscribers of this worker
+        dropped (int): Events dropped by the subscribers that didn't keep up
+    """
+
+    def __init__(self, fanout: Fanout = None, max_events: int = BROKER_MAX_QUEUED_EVENTS):
+        self.__fanout = fanout if fanout is not None else create_fanout()
+        self.max_events = max_events
+        self.__topics: Dict[str, Set[Subscription]] = dict()
+        self.__lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+
+    def subscribe(self, topic: str) -> Subscription:
+        """
+        Subscribes to a topic, the subscription gets the events published from now on
+
+        Args:
+            topic (str): Topic, e.g. LOBBY_TOPIC or game_topic(id_game)
+
+        Returns:
+            Subscription: Queue of the events, must be given back with unsubscribe
+        """
+        subscription = Subscription(topic, self.max_events)
+        with self.__lock:
+            self.__topics.setdefault(topic, set()).add(subscription)
+        self.__fanout.start(self.deliver)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Cancels a subscription
+
+        Args:
+            subscription (Subscription): Subscription returned by subscribe
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            subscriptions = self.__topics.get(subscription.topic)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self.__topics[subscription.topic]
+
+    def publish(self, topic: str, event: Event) -> None:
+        """
+        Publishes an event to the subscribers of every worker
+
+        Args:
+            topic (str): Event topic
+            event (Event): JSON serializable event
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.published += 1
+        self.deliver(topic, event)
+        self.__fanout.publish(topic, event)
+
+    def deliver(self, topic: str, event: Event) -> int:
+        """
+        Queues an event to the subscribers of this worker
+
+        Args:
+            topic (str): Event topic
+            event (Event): Event
+
+        Returns:
+            int: Number of subscribers
+        """
+        with self.__lock:
+            subscriptions = list(self.__topics.get(topic, ()))
+        dropped = sum(not subscription.put(event) for subscription in subscriptions)
+        with self.__lock:
+            self.delivered += len(subscriptions)
+            self.dropped += dropped
+        return len(subscriptions)
+
+    def reset(self) -> None:
+        """
+        Drops the subscriptions and the fan-out state inherited by a forked worker
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            self.__topics.clear()
+        self.__fanout.reset()
+
+    def get_stats(self) -> Dict:
+        """
+        Gets the broker counters
+
+        Args:
+            None
+
+        Returns:
+            Dict: Counters, current topics and subscribers
+        """
+        with self.__lock:
+            return {
+                'topics': len(self.__topics),
+                'subscribers': sum(len(subscriptions) for subscriptions in self.__topics.values()),
+                'published': self.published,
+                'delivered': self.delivered,
+                'dropped': self.dropped
+            }
+
+
+broker = Broker()
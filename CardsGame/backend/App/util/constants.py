@@ -32,3 +32,8 @@ CARDS_TO_USE = CARDS_BY_HAND - 1
 IDX_CARD_OPTIONS = range(0, CARDS_BY_HAND)
 START_TARGET_RANGE = 0
 STOP_TARGET_RANGE = NUM_RANKS * CARDS_TO_USE
+
+PC_DIFFICULTY_EASY = 'easy'
+PC_DIFFICULTY_NORMAL = 'normal'
+PC_DIFFICULTY_HARD = 'hard'
+PC_DIFFICULTIES = [PC_DIFFICULTY_EASY, PC_DIFFICULTY_NORMAL, PC_DIFFICULTY_HARD]
@@ -1,12 +1,10 @@
-import json
 import random
 import uuid
-from typing import Any, Dict, List, Tuple
+from functools import lru_cache
+from typing import List, Tuple, Union
 from numpy.random import permutation
 from numpy import sort, argsort
 from App.models.card import Card
-from termcolor import cprint
-from .constants import COLOR_P2, COLOR_TIE
 
 
 def str_to_bool(cad: str) -> bool:
@@ -22,45 +20,49 @@ def str_to_bool(cad: str) -> bool:
     return not (cad.lower() in ['false', '0'])
 
 
-def to_dict(obj: Any) -> Dict:
+def get_random_string(len_str: int = 12) -> str:
     """
-    Converts an instance to a dictionary
+    Returns a random string
 
     Args:
-        obj (Any): Object instance
+        len_str (int): Random string length desired (Default: 12)
 
     Returns:
-        Dict: Instance converted to a dictionary
+        random_str (str): Random string
     """
-    return json.loads(json.dumps(obj, default=lambda o: o.__dict__))
+    random_str = str(uuid.uuid4()).replace('-', '')
+    return random_str[-len_str:]
 
 
-def get_random_string(len_str: int = 12) -> str:
+def get_random_seed() -> int:
     """
-    Returns a random string
+    Returns a random seed for an event-sourced game
 
     Args:
-        len_str (int): Random string length desired (Default: 12)
+        None
 
     Returns:
-        random_str (str): Random string
+        seed (int): Random 32 bits integer
     """
-    random_str = str(uuid.uuid4()).replace('-', '')
-    return random_str[-len_str:]
+    return random.getrandbits(32)
 
 
-def get_random_num_in_range(start, stop) -> int:
+def get_random_num_in_range(start, stop, seed: Union[int, str] = None) -> int:
     """
     Returns a random integer between a range
 
     Args:
         start (int): Star range
         stop (int): Stop range
+        seed (Union[int, str]): Seed of the number, the same seed always gives the same number (Default: the global
+            random state)
 
     Returns:
         random_int (int): Random integer
     """
-    return random.randint(start, stop)
+    if seed is None:
+        return random.randint(start, stop)
+    return random.Random(seed).randint(start, stop)
 
 
 def get_random_indexes(size_perm: int, num_idx: int) -> List[int]:
@@ -87,7 +89,8 @@ def get_index_closest_number(sorted_nums: List[int], original_idx: List[int], ta
         target (int): Target number
 
     Returns:
-        indexes (Tuple[int,int]) -> Tuple of the sorted index and the original index that is equal or close value to the target
+        indexes (Tuple[int,int]) -> Tuple of the sorted index and the original index that is equal or close value to
+            the target
     """
     first_idx = 0
     last_idx = len(sorted_nums) - 1
@@ -140,3 +143,65 @@ def get_closest_index_cards(hand: List[Card], target_rank: int, num_cards_to_use
         target_rank = target_rank - ranks[true_idx]
         idx_to_use.append(true_idx)
     return idx_to_use
+
+
+@lru_cache(maxsize=4096)
+def get_closest_subset_sum(sorted_nums: Tuple[int, ...], target: int, num_to_use: int) -> Tuple[int, ...]:
+    """
+    Finds exactly num_to_use numbers whose sum is the closest to a target (bounded subset-sum). The result is
+    memoized, so the numbers must be given as a sorted tuple
+
+    Args:
+        sorted_nums (Tuple[int, ...]): Sorted non-negative candidate numbers
+        target (int): Target number
+        num_to_use (int): How many numbers to pick
+
+    Returns:
+        indexes (Tuple[int, ...]) -> Indexes of the picked numbers in sorted_nums
+    """
+    num_to_use = min(num_to_use, len(sorted_nums))
+    # reachable[i][j] is a bitmask of the sums reachable picking j numbers from the first i numbers
+    reachable: List[List[int]] = [[1] + [0] * num_to_use]
+    for i, num in enumerate(sorted_nums, 1):
+        previous = reachable[-1]
+        current = previous[:]
+        for j in range(1, min(i, num_to_use) + 1):
+            current[j] |= previous[j - 1] << num
+        reachable.append(current)
+
+    sums = reachable[-1][num_to_use]
+    best_sum = target
+    for difference in range(0, max(target, sums.bit_length()) + 1):
+        if 0 <= target - difference and sums >> (target - difference) & 1:
+            best_sum = target - difference
+            break
+        if sums >> (target + difference) & 1:
+            best_sum = target + difference
+            break
+
+    indexes: List[int] = []
+    remaining_sum, remaining = best_sum, num_to_use
+    for i in range(len(sorted_nums), 0, -1):
+        if reachable[i - 1][remaining] >> remaining_sum & 1:
+            continue
+        indexes.append(i - 1)
+        remaining_sum -= sorted_nums[i - 1]
+        remaining -= 1
+    return tuple(reversed(indexes))
+
+
+def get_optimal_index_cards(hand: List[Card], target_rank: int, num_cards_to_use: int) -> List[int]:
+    """
+    Returns the indexes of the cards whose rank sum is the closest possible to a target value
+
+    Args:
+        hand (List[Card]): List of candidate Cards to be used
+        target_rank (int): Target to approximate with the Card ranks
+        num_cards_to_use (int): Cards allowed to use
+
+    Returns:
+        indexes (List[int]) -> List of indexes
+    """
+    original_idx = sorted(range(len(hand)), key=lambda idx: hand[idx].get_rank())
+    sorted_ranks = tuple(hand[idx].get_rank() for idx in original_idx)
+    return [original_idx[idx] for idx in get_closest_subset_sum(sorted_ranks, target_rank, num_cards_to_use)]
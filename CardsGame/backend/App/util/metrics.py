@@ -0,0 +1,194 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple, Union
+
+# Upper bounds in seconds of the latency histograms, from sub-millisecond phases to slow requests
+LATENCY_BUCKETS = [0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0]
+
+# Phase durations of the request being served, collected for its Server-Timing header
+request_phases: contextvars.ContextVar = contextvars.ContextVar('request_phases', default=None)
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed buckets, in the Prometheus format
+
+    Args:
+        buckets (List[float]): Sorted upper bounds in seconds, +Inf is added (Default: LATENCY_BUCKETS)
+    """
+
+    def __init__(self, buckets: List[float] = None):
+        self.buckets = buckets or LATENCY_BUCKETS
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """
+        Adds an observation, the caller holds the lock of the registry
+
+        Args:
+            seconds (float): Observed duration
+
+        Returns:
+            None
+        """
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def get_cumulative_counts(self) -> Iterator[Tuple[str, int]]:
+        """
+        Gets the cumulative count of each bucket
+
+        Args:
+            None
+
+        Returns:
+            Iterator[Tuple[str, int]]: Bucket upper bound (le label) and number of observations up to it
+        """
+        total = 0
+        for bound, count in zip([*map(str, self.buckets), '+Inf'], self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """
+    Request latency histograms by route, request counters by status and phase timers of the game server, rendered in
+    the Prometheus text format. One registry per worker process, like the game cache
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__requests: Dict[Tuple[str, str], Histogram] = dict()
+        self.__statuses: Dict[Tuple[str, str, int], int] = dict()
+        self.__phases: Dict[str, Histogram] = dict()
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        """
+        Records a served request
+
+        Args:
+            method (str): HTTP method
+            route (str): Route rule, e.g. /game/<id_game>/hand, so every game shares the same series
+            status (int): Response status code
+            seconds (float): Request duration
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            histogram = self.__requests.get((method, route))
+            if histogram is None:
+                histogram = self.__requests[(method, route)] = Histogram()
+            histogram.observe(seconds)
+            key = (method, route, status)
+            self.__statuses[key] = self.__statuses.get(key, 0) + 1
+
+    def observe_phase(self, name: str, seconds: float) -> None:
+        """
+        Records the duration of a phase, also in the phases of the current request if there is one
+
+        Args:
+            name (str): Phase name, e.g. db_read
+            seconds (float): Phase duration
+
+        Returns:
+            None
+        """
+        with self.__lock:
+            histogram = self.__phases.get(name)
+            if histogram is None:
+                histogram = self.__phases[name] = Histogram()
+            histogram.observe(seconds)
+        phases = request_phases.get()
+        if phases is not None:
+            phases[name] = phases.get(name, 0.0) + seconds
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as a phase, e.g. with metrics.phase('db_write'): ...
+
+        Args:
+            name (str): Phase name
+
+        Returns:
+            Iterator[None]: Context manager
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase(name, time.perf_counter() - start)
+
+    def render(self, gauges: Dict[str, Union[int, float]] = None) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format
+
+        Args:
+            gauges (Dict[str, Union[int, float]]): Extra values exported as gauges, e.g. the game cache counters
+
+        Returns:
+            str: Metrics text
+        """
+        with self.__lock:
+            requests = {key: (list(h.get_cumulative_counts()), h.count, h.sum) for key, h in self.__requests.items()}
+            statuses = dict(self.__statuses)
+            phases = {name: (list(h.get_cumulative_counts()), h.count, h.sum) for name, h in self.__phases.items()}
+        lines = ['# HELP http_request_duration_seconds Request latency by route',
+                 '# TYPE http_request_duration_seconds histogram']
+        for (method, route), values in sorted(requests.items()):
+            lines.extend(render_histogram('http_request_duration_seconds', f'method="{method}",route="{route}"',
+                                          *values))
+        lines.extend(['# HELP http_requests_total Requests by route and status code',
+                      '# TYPE http_requests_total counter'])
+        for (method, route, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+        lines.extend(['# HELP game_phase_duration_seconds Time spent in each phase of the game requests',
+                      '# TYPE game_phase_duration_seconds histogram'])
+        for name, values in sorted(phases.items()):
+            lines.extend(render_histogram('game_phase_duration_seconds', f'phase="{name}"', *values))
+        for name, value in sorted((gauges or dict()).items()):
+            lines.extend([f'# TYPE {name} gauge', f'{name} {value}'])
+        return '\n'.join(lines) + '\n'
+
+
+def render_histogram(name: str, labels: str, buckets: List[Tuple[str, int]], count: int, total: float) -> List[str]:
+    """
+    Renders the series of a histogram
+
+    Args:
+        name (str): Metric name
+        labels (str): Labels of the series, e.g. method="GET",route="/game"
+        buckets (List[Tuple[str, int]]): Bucket upper bounds and cumulative counts
+        count (int): Number of observations
+        total (float): Sum of the observations
+
+    Returns:
+        List[str]: Text lines
+    """
+    lines = [f'{name}_bucket{{{labels},le="{bound}"}} {bucket_count}' for bound, bucket_count in buckets]
+    lines.append(f'{name}_count{{{labels}}} {count}')
+    lines.append(f'{name}_sum{{{labels}}} {total:.6f}')
+    return lines
+
+
+def format_server_timing(phases: Dict[str, float]) -> str:
+    """
+    Formats the phases of a request as a Server-Timing header, shown by the browser dev tools
+
+    Args:
+        phases (Dict[str, float]): Seconds by phase name
+
+    Returns:
+        str: Header value, e.g. db_read;dur=1.20, play_turn;dur=0.35
+    """
+    return ', '.join(f'{name};dur={seconds * 1000:.2f}' for name, seconds in phases.items())
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,14 @@
+"""
+One sweep of the game archiver: moves the inactive finished games to the GameArchive collection and deletes the
+abandoned unfinished games (see config/archive.py). For deployments that run it from cron with the background thread
+disabled (GAME_ARCHIVE_INTERVAL_SECONDS=0)
+
+Usage (from the backend folder):
+    python archive_games.py
+"""
+from App.database import server
+from App.database.archiver import GameArchiver
+
+# %% MAIN
+server.ensure_indexes()
+print(f'Games removed: {GameArchiver().sweep()}')
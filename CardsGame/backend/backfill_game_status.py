@@ -0,0 +1,12 @@
+"""
+One-off backfill of the status fields (_finished, _winner, _len_deck_p1, _len_deck_p2) of the games saved before
+they existed. Safe to run several times, only the games without status are updated
+
+Usage (from the backend folder):
+    python backfill_game_status.py
+"""
+from App.database import server
+
+# %% MAIN
+server.ensure_indexes()
+print(f'Games updated: {server.backfill_game_status()}')
@@ -0,0 +1,120 @@
+"""
+Queries of the hot collections on a grown database: a few active games next to many old finished games and abandoned
+ones, on the sqlite storage. The queries are timed with the indexes the server had before (status and listing), with
+the declared indexes (plus activity, winner and player name), and once the archiver moved the finished games to
+GameArchive and deleted the abandoned ones. The archiver throughput is measured on the way
+
+Usage (from the backend folder):
+    python -m benchmarks.archive_benchmark [--finished 20000] [--abandoned 2000] [--active 200] [--turns 10]
+"""
+import argparse
+import os
+import tempfile
+import time
+import timeit
+from typing import Callable, Dict, List
+import numpy
+from App.database import db, server
+from App.database.archiver import GameArchiver
+from App.database.sqlite_storage import SQLiteStorage
+from App.models import InteractiveGame
+from App.util.constants import NUM_RANKS, SUITS, SPECIAL_RANKS
+
+DAY_SECONDS = 24 * 60 * 60
+# Indexes of the game collection before the archiver, see server.INDEXES
+PREVIOUS_INDEXES = ['status_created_date', 'created_date_id']
+
+
+def insert_games(num_games: int, age_days: float, finished: bool, num_turns: int, players: int) -> List[str]:
+    """
+    Inserts games created age_days ago, each with num_turns history turns
+    """
+    created_date = time.time() - age_days * DAY_SECONDS
+    documents = InteractiveGame.build_new_documents(NUM_RANKS, SUITS, SPECIAL_RANKS,
+                                                    [f'Player{i % players}' for i in range(num_games)])
+    for document in documents:
+        document.update({'_created_date': created_date, '_num_turns': num_turns, '_finished': finished,
+                         '_winner': 'PC' if finished else None})
+        for turn in range(1, num_turns + 1):
+            document['_history'][str(turn)] = {'turn': turn, 'target': 5, 'turnWinner': 'PC',
+                                               'handPlayer1': '2♣,3♣,4♣', 'handPlayer2': '5♠,6♠,7♠'}
+    return server.add_game_documents(documents)
+
+
+def timed(query: Callable[[], object], repetitions: int) -> float:
+    """
+    Mean time of a query in milliseconds
+    """
+    return timeit.timeit(query, number=repetitions) / repetitions * 1000
+
+
+def measure(ids_active: List[str], repetitions: int) -> Dict[str, float]:
+    """
+    Times the reads of the hot collections
+    """
+    id_game = ids_active[len(ids_active) // 2]
+    return {
+        'unfinished page': timed(lambda: list(server.get_games_by_status(False, False, server.SUMMARY_FIELDS, 20)),
+                                 repetitions),
+        'player games': timed(lambda: list(db.find_many({'_name_p1': 'Player7'}, server.GAME_COLLECTION, {'_id': 1},
+                                                        [('_created_date', -1)], 20)), repetitions),
+        'game + history': timed(lambda: server.get_game(id_game).get_history(), repetitions),
+        'inactive games': timed(lambda: list(db.find_many(server.build_inactive_query(False, time.time() - DAY_SECONDS),
+                                                          server.GAME_COLLECTION, {'_id': 1}, limit=500)), repetitions),
+        'full scan': timed(lambda: sum(1 for _ in db.find_all(server.GAME_COLLECTION)), max(1, repetitions // 20))
+    }
+
+
+def count_bytes(path: str) -> int:
+    """
+    Size of a SQLite file and its write-ahead log
+    """
+    return sum(os.path.getsize(path + suffix) for suffix in ['', '-wal'] if os.path.exists(path + suffix))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Hot collection queries before and after archiving the old games')
+    parser.add_argument('--finished', type=int, default=20000, help='Finished games created 30 days ago')
+    parser.add_argument('--abandoned', type=int, default=2000, help='Unfinished games created 10 days ago')
+    parser.add_argument('--active', type=int, default=200, help='Games created now')
+    parser.add_argument('--turns', type=int, default=10, help='History turns of each game')
+    parser.add_argument('--repetitions', type=int, default=200)
+    args = parser.parse_args()
+
+    numpy.random.seed(0)
+    server.game_cache.max_entries = 0
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'archive_benchmark.sqlite3')
+        storage = SQLiteStorage(path)
+        db.set_storage(storage)
+        for collection_name, indexes in server.COLLECTION_INDEXES.items():
+            for name, keys in indexes.items():
+                if collection_name != server.GAME_COLLECTION or name in PREVIOUS_INDEXES:
+                    db.create_index(keys, collection_name, name=name)
+        start = time.perf_counter()
+        insert_games(args.finished, 30, True, args.turns, 100)
+        insert_games(args.abandoned, 10, False, args.turns, 100)
+        ids_active = insert_games(args.active, 0, False, args.turns, 100)
+        print(f'{args.finished} finished, {args.abandoned} abandoned and {args.active} active games inserted in '
+              f'{time.perf_counter() - start:.1f} s, {count_bytes(path) / 2 ** 20:.1f} MB')
+
+        results = {'previous indexes': measure(ids_active, args.repetitions)}
+        server.ensure_indexes()
+        results['declared indexes'] = measure(ids_active, args.repetitions)
+        archiver = GameArchiver(archive_after_seconds=DAY_SECONDS, retention_seconds=7 * DAY_SECONDS)
+        start = time.perf_counter()
+        removed = archiver.sweep()
+        elapsed = time.perf_counter() - start
+        results['after archiving'] = measure(ids_active, args.repetitions)
+        storage.reset()
+
+    print(f"archiver: {removed['archived']} archived and {removed['expired']} expired in {elapsed:.2f} s "
+          f"({(removed['archived'] + removed['expired']) / elapsed:.0f} games/s)")
+    queries = list(next(iter(results.values())))
+    print(f"{'stage':>17} " + ' '.join(f'{query:>15}' for query in queries) + '   (ms)')
+    for stage, timings in results.items():
+        print(f'{stage:>17} ' + ' '.join(f'{timings[query]:>15.3f}' for query in queries))
+
+
+if __name__ == '__main__':
+    main()
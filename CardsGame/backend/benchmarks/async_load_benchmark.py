@@ -0,0 +1,119 @@
+"""
+Concurrent players vs latency of the Flask (WSGI, threaded) and the asyncio (ASGI, Quart + motor on hypercorn) APIs.
+Each simulated player creates a game and plays it (GET/PUT /game/<id>/hand) over a keep-alive connection
+
+Both servers are started by the script on free local ports and must reach a mongod, e.g. a local one:
+    MONGO_STR_CONNECTION=mongodb://localhost:27017 python -m benchmarks.async_load_benchmark
+
+Usage (from the backend folder):
+    python -m benchmarks.async_load_benchmark [--clients 1 8 32 64] [--requests 40]
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+import numpy
+
+SERVERS: Dict[str, List[str]] = {
+    'flask': [sys.executable, '-c', 'import sys; from App import create_app; '
+                                    'create_app().run(host="127.0.0.1", port=int(sys.argv[1]), threaded=True)'],
+    'async': [sys.executable, '-m', 'hypercorn', 'interactive_game:app', '--bind']
+}
+
+
+def get_free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(name: str, port: int) -> subprocess.Popen:
+    command = SERVERS[name] + ([str(port)] if name == 'flask' else [f'127.0.0.1:{port}'])
+    env = {**os.environ, 'GAME_SERVER': name}
+    process = subprocess.Popen(command, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=1):
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise Exception(f"The {name} server didn't start on port {port}")
+
+
+def request(connection: http.client.HTTPConnection, method: str, url: str, body: Dict = None) -> Tuple[float, Dict]:
+    start = time.perf_counter()
+    payload = None if body is None else json.dumps(body)
+    connection.request(method, url, payload, {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    data = response.read()
+    return time.perf_counter() - start, json.loads(data) if data else dict()
+
+
+def play(port: int, num_requests: int) -> List[float]:
+    """
+    Plays games until num_requests requests were sent, returns the latency of each request
+    """
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    latencies = []
+    try:
+        while len(latencies) < num_requests:
+            elapsed, game = request(connection, 'POST', '/game', {'playerName': 'Load'})
+            latencies.append(elapsed)
+            url = f"/game/{game['_id']}/hand"
+            while len(latencies) < num_requests:
+                elapsed, hand = request(connection, 'GET', url)
+                latencies.append(elapsed)
+                if 'error' in hand:
+                    break
+                elapsed, turn = request(connection, 'PUT', url, {'cardIndexes': [0, 1]})
+                latencies.append(elapsed)
+                if 'error' in turn or turn.get('_winner'):
+                    break
+    finally:
+        connection.close()
+    return latencies
+
+
+def measure(port: int, clients: int, num_requests: int) -> Dict[str, float]:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        results = list(executor.map(play, [port] * clients, [num_requests] * clients))
+    elapsed = time.perf_counter() - start
+    latencies = numpy.concatenate(results) * 1000
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': float(numpy.percentile(latencies, 50)),
+        'p99_ms': float(numpy.percentile(latencies, 99))
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Flask vs asyncio API under concurrent players')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32, 64])
+    parser.add_argument('--requests', type=int, default=40, help='Requests sent by each player')
+    args = parser.parse_args()
+
+    print(f"{'server':>7} {'clients':>8} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for name in SERVERS:
+        port = get_free_port()
+        process = start_server(name, port)
+        try:
+            play(port, 10)
+            for clients in args.clients:
+                stats = measure(port, clients, args.requests)
+                print(f"{name:>7} {clients:>8} {stats['rps']:>9.1f} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+InteractiveGame.to_document/from_document vs the previous approach of serializing the whole object graph to a JSON
+string and parsing it back, on a game with a 500 turns history
+
+Usage (from the backend folder):
+    python -m benchmarks.codec_benchmark
+"""
+import json
+import random
+import timeit
+from typing import Dict
+import numpy
+from App.models import InteractiveGame
+from App.util.constants import CARDS_TO_USE, MAX_NUM_TURNS, NUM_RANKS, SUITS, SPECIAL_RANKS
+from App.util.helpers import get_closest_index_cards
+
+REPETITIONS = 500
+UPDATE_FIELDS = ['_num_turns', '_deck_p1', '_deck_p2', '_current_target', '_hand_p1', '_hand_p2', '_history']
+
+
+def build_long_game(num_turns: int = MAX_NUM_TURNS, seed: int = 11) -> InteractiveGame:
+    """
+    Plays a game until it ends and repeats its turns on the history until it has num_turns turns
+    """
+    random.seed(seed)
+    numpy.random.seed(seed)
+    game = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Benchmark')
+    while not game.get_winner(CARDS_TO_USE):
+        game.take_hand()
+        if game.get_winner(CARDS_TO_USE):
+            break
+        game.play_turn(get_closest_index_cards(game.get_hand_player(1, False), game.get_target_rank(), CARDS_TO_USE))
+    history = game.get_history()
+    played = [history[turn] for turn in range(1, game.get_num_turns() + 1)]
+    for turn in range(1, num_turns + 1):
+        history[turn] = {**played[(turn - 1) % len(played)], 'turn': turn}
+    return game
+
+
+def json_round_trip(document: Dict) -> Dict:
+    return json.loads(json.dumps(document))
+
+
+def per_call_us(function) -> float:
+    return timeit.timeit(function, number=REPETITIONS) / REPETITIONS * 1e6
+
+
+def main() -> None:
+    game = build_long_game()
+    document = game.to_document()
+    assert InteractiveGame.from_document(document).to_document() == document
+
+    encode_us = per_call_us(lambda: game.to_document())
+    json_us = per_call_us(lambda: json_round_trip(game.to_document()))
+    update_us = per_call_us(lambda: game.to_document(UPDATE_FIELDS))
+    decode_us = per_call_us(lambda: InteractiveGame.from_document(document))
+
+    print(f'history turns: {len(game.get_history()) - 1}, JSON size: {len(json.dumps(document)) / 1024:.1f} KiB')
+    print(f"{'to_document (us)':>24}: {encode_us:.1f}")
+    print(f"{'json round-trip (us)':>24}: {json_us:.1f}")
+    print(f"{'update fields (us)':>24}: {update_us:.1f}")
+    print(f"{'from_document (us)':>24}: {decode_us:.1f}")
+
+
+if __name__ == '__main__':
+    main()
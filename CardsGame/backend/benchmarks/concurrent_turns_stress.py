@@ -0,0 +1,96 @@
+"""
+Stress test of the optimistic concurrency control: several threads take hands and play turns on the same game at the
+same time (like double-clicks, retries or several workers). Afterwards the saved game must account for every
+successful PUT /game/<id>/hand, with no lost or duplicated turns
+
+By default the Flask app runs in this process (Flask test client); --url sends real HTTP requests to a running server
+(Flask or GAME_SERVER=async, one or several workers). Both need a reachable Mongo.
+
+Usage (from the backend folder):
+    python -m benchmarks.concurrent_turns_stress [--threads 16] [--rounds 30] [--url http://127.0.0.1:5050]
+"""
+import argparse
+import json
+import threading
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Tuple
+
+Client = Callable[[str, str, Dict], Tuple[int, Dict]]
+
+
+def build_http_client(base_url: str) -> Client:
+    def send(method: str, path: str, body: Dict = None) -> Tuple[int, Dict]:
+        data = None if body is None else json.dumps(body).encode()
+        http_request = urllib.request.Request(base_url + path, data, {'Content-Type': 'application/json'},
+                                              method=method)
+        try:
+            with urllib.request.urlopen(http_request) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read() or b'{}')
+
+    return send
+
+
+def build_test_client() -> Client:
+    from App import create_app
+    app = create_app()
+    local = threading.local()
+
+    def send(method: str, path: str, body: Dict = None) -> Tuple[int, Dict]:
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        response = local.client.open(path, method=method, json=body)
+        return response.status_code, response.get_json()
+
+    return send
+
+
+def hammer(send: Client, id_game: str, rounds: int) -> Counter:
+    """
+    Takes a hand and plays a turn rounds times, returns the number of responses by request and status code
+    """
+    statuses = Counter()
+    url = f'/game/{id_game}/hand'
+    for _ in range(rounds):
+        status, _ = send('GET', url, None)
+        statuses[f'GET {status}'] += 1
+        status, turn = send('PUT', url, {'cardIndexes': [0, 1]})
+        statuses[f'PUT {status}'] += 1
+        if status == 200 and turn.get('_winner'):
+            break
+    return statuses
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Concurrent turns on the same game')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=30, help='Hands taken and turns played by each thread')
+    parser.add_argument('--url', help='Base URL of a running server (Default: the Flask app in this process)')
+    args = parser.parse_args()
+
+    send = build_http_client(args.url.rstrip('/')) if args.url else build_test_client()
+    _, created = send('POST', '/game', {'playerName': 'Stress'})
+    id_game = created['_id']
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = executor.map(hammer, [send] * args.threads, [id_game] * args.threads, [args.rounds] * args.threads)
+        statuses = sum(results, Counter())
+    _, game = send('GET', f'/game/{id_game}', None)
+    send('DELETE', f'/game/{id_game}', None)
+
+    for request_status, count in sorted(statuses.items()):
+        print(f'{request_status:>10}: {count}')
+    played_turns = statuses['PUT 200']
+    history_turns = sorted(int(turn) for turn in game['_history'])
+    print(f'turns played (PUT 200): {played_turns}, saved turns: {game["_num_turns"]}, '
+          f'history turns: {len(history_turns) - 1}, version: {game["_version"]}')
+    assert game['_num_turns'] == played_turns, 'A turn was lost or applied twice'
+    assert history_turns == list(range(played_turns + 1)), 'The history does not match the turns played'
+    print('OK: no lost updates')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Latency of the game reads through the Flask app: a full render (game and response caches cleared), a render served
+from the response cache and a conditional request answered 304 Not Modified from the version lookup
+
+Usage (from the backend folder):
+    python -m benchmarks.conditional_get_benchmark [--storage memory] [--turns 10] [--games 50] [--repetitions 500]
+"""
+import argparse
+import os
+import time
+from typing import Callable, Dict, List
+
+
+def measure_us(request: Callable[[], int], expected_status: int, repetitions: int,
+               before: Callable[[], None] = None) -> float:
+    elapsed = 0.0
+    for _ in range(repetitions):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        status = request()
+        elapsed += time.perf_counter() - start
+        assert status == expected_status, f'{status} != {expected_status}'
+    return elapsed / repetitions * 1e6
+
+
+def play(client, id_game: str, turns: int) -> None:
+    for _ in range(turns):
+        if client.get(f'/game/{id_game}/hand').status_code != 200:
+            return
+        if client.put(f'/game/{id_game}/hand', json={'cardIndexes': [0, 1]}).status_code != 200:
+            return
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Conditional GET and response cache of the game reads')
+    parser.add_argument('--storage', default='memory', choices=['memory', 'sqlite', 'mongo'])
+    parser.add_argument('--sqlite-path', default='conditional_get_benchmark.sqlite3')
+    parser.add_argument('--turns', type=int, default=10, help='Turns played on the measured game')
+    parser.add_argument('--games', type=int, default=50, help='Games in the listing')
+    parser.add_argument('--repetitions', type=int, default=500)
+    args = parser.parse_args()
+    # Read by config when App is imported
+    os.environ['STORAGE_BACKEND'] = args.storage
+    os.environ['SQLITE_PATH'] = args.sqlite_path
+    from App import create_app
+    from App.database import server
+
+    client = create_app().test_client()
+    ids = [client.post('/game', json={'playerName': 'Benchmark'}).get_json()['_id'] for _ in range(args.games)]
+    id_game = ids[0]
+    play(client, id_game, args.turns)
+    game_url = f'/game/{id_game}'
+    list_url = f'/game?onlyId=false&fields=summary&limit={args.games}'
+    game_etag = client.get(game_url).headers['ETag']
+    list_etag = client.get(list_url).headers['ETag']
+
+    def clear_caches() -> None:
+        server.game_cache.clear()
+        server.response_cache.clear()
+
+    results: Dict[str, List[float]] = {
+        'GET /game/<id>': [
+            measure_us(lambda: client.get(game_url).status_code, 200, args.repetitions, clear_caches),
+            measure_us(lambda: client.get(game_url).status_code, 200, args.repetitions),
+            measure_us(lambda: client.get(game_url, headers={'If-None-Match': game_etag}).status_code, 304,
+                       args.repetitions)
+        ],
+        'GET /game': [
+            measure_us(lambda: client.get(list_url).status_code, 200, args.repetitions),
+            measure_us(lambda: client.get(list_url).status_code, 200, args.repetitions),
+            measure_us(lambda: client.get(list_url, headers={'If-None-Match': list_etag}).status_code, 304,
+                       args.repetitions)
+        ]
+    }
+    print(f'storage: {args.storage}, game turns: {args.turns}, games listed: {args.games}')
+    print(f"{'endpoint':>16} {'render (us)':>12} {'cached (us)':>12} {'304 (us)':>10}")
+    for endpoint, (render_us, cached_us, not_modified_us) in results.items():
+        # Listings have no response cache, both columns render the page
+        print(f'{endpoint:>16} {render_us:>12.1f} {cached_us:>12.1f} {not_modified_us:>10.1f}')
+    for id_game in ids:
+        client.delete(f'/game/{id_game}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Per-turn cost of the Deck operations as the deck grows (multi-deck shoes)
+
+Usage (from the backend folder):
+    python -m benchmarks.deck_benchmark
+"""
+import timeit
+from typing import Callable, List
+from App.models import Card, Deck
+from App.util.constants import NUM_CARDS, NUM_RANKS, SUITS, SPECIAL_RANKS
+
+SHOE_SIZES = [1, 4, 16, 64, 256]
+TURNS = 20000
+
+
+class ListDeck:
+    """
+    Previous list based implementation kept as the baseline
+    """
+
+    def __init__(self, cards: List[Card]):
+        self.cards = cards
+
+    def add_cards(self, new_cards: List[Card]) -> None:
+        self.cards = self.cards + new_cards
+
+    def draw(self) -> Card:
+        return self.cards.pop(0)
+
+
+def build_shoe(num_decks: int) -> List[Card]:
+    return Deck(NUM_RANKS, SUITS, SPECIAL_RANKS).cards * num_decks
+
+
+def classic_turns(deck) -> Callable[[], None]:
+    """
+    Builds a function that plays a classic turn: both players draw and the winner takes the two cards
+    """
+    def turn() -> None:
+        card_p1 = deck.draw()
+        card_p2 = deck.draw()
+        deck.add_cards([card_p2, card_p1])
+    return turn
+
+
+def per_turn_us(deck) -> float:
+    seconds = timeit.timeit(classic_turns(deck), number=TURNS)
+    return seconds / TURNS * 1e6
+
+
+def main() -> None:
+    print(f"{'cards':>8} {'list (us)':>12} {'deque (us)':>12} {'compact (us)':>14}")
+    for num_decks in SHOE_SIZES:
+        cards = build_shoe(num_decks)
+        list_us = per_turn_us(ListDeck(list(cards)))
+        deque_us = per_turn_us(Deck(NUM_RANKS, SUITS, SPECIAL_RANKS, cards))
+        compact_us = per_turn_us(Deck(NUM_RANKS, SUITS, SPECIAL_RANKS, cards, compact=True))
+        print(f'{num_decks * NUM_CARDS:>8} {list_us:>12.3f} {deque_us:>12.3f} {compact_us:>14.3f}')
+
+
+if __name__ == '__main__':
+    main()
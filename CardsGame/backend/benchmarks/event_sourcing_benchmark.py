@@ -0,0 +1,101 @@
+"""
+Event-sourced games vs saving the state: BSON bytes written by action and time to load a game, by snapshot interval
+
+Each game is played twice with the same decks, targets and cards: as an event-sourced game (seed, events and a
+snapshot every K turns) and as a regular game (changed fields plus the history turn documents). The saved documents are
+kept up to date with App.database.query_engine, and after every action the event-sourced document is loaded again
+(replaying the events after its snapshot) and checked against the played game.
+
+Usage (from the backend folder):
+    python -m benchmarks.event_sourcing_benchmark [--games 50] [--intervals 1 5 20 100]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List
+import bson
+from App.database import server
+from App.database.query_engine import apply_update
+from App.models import Deck, InteractiveGame
+from App.util.constants import CARDS_TO_USE, NUM_RANKS, SUITS, SPECIAL_RANKS
+from App.util.helpers import get_closest_index_cards
+
+STATE_FIELDS = ['_num_turns', *server.SNAPSHOT_FIELDS[:-1], *server.STATUS_FIELDS]
+
+
+def build_event_operators(game: InteractiveGame, snapshot_interval: int) -> Dict:
+    # server.build_update_operators with a given snapshot interval
+    operators = {'$set': {**server.build_event_fields(game, snapshot_interval),
+                          **game.to_document(server.STATUS_FIELDS)}}
+    if game.get_num_turns_increment():
+        operators['$inc'] = {'_num_turns': game.get_num_turns_increment()}
+    return operators
+
+
+def play_game(seed: int, snapshot_interval: int) -> Dict[str, List[float]]:
+    """
+    Plays a game as an event-sourced game and as a regular game, measuring every save and every load
+    """
+    game = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Benchmark', seed=seed)
+    twin = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Benchmark',
+                           deck_p1=Deck.from_document(game.get_deck_player(1).to_document()),
+                           deck_p2=Deck.from_document(game.get_deck_player(2).to_document()))
+    document = game.to_document()
+    server.split_history(document)
+    results = {'event_bytes': [], 'state_bytes': [], 'load_us': []}
+    while not game.get_winner(CARDS_TO_USE):
+        for action in ['hand', 'play']:
+            if action == 'hand':
+                game.take_hand()
+                twin.take_hand()
+                twin.set_target_rank(game.get_target_rank())
+            elif game.get_winner(CARDS_TO_USE):
+                break
+            else:
+                idx_p1 = get_closest_index_cards(game.get_hand_player(1, False), game.get_target_rank(), CARDS_TO_USE)
+                _, idx_p2 = game.play_turn(idx_p1)
+                twin.play_turn(idx_p1, idx_p2)
+
+            operators = build_event_operators(game, snapshot_interval)
+            results['event_bytes'].append(len(bson.encode(operators)))
+            _, new_turns = server.build_history_writes(twin)
+            results['state_bytes'].append(len(bson.encode(server.build_update_operators(twin))) +
+                                          sum(len(bson.encode(turn_document)) for turn_document in new_turns))
+            apply_update(document, operators)
+            game.set_snapshot_event(operators['$set'].get('_snapshot_event', game.get_snapshot_event()))
+            game.clear_changes()
+            twin.clear_changes()
+
+            start = time.perf_counter()
+            loaded = InteractiveGame.from_document(document)
+            results['load_us'].append((time.perf_counter() - start) * 1e6)
+            assert loaded.to_document(STATE_FIELDS) == game.to_document(STATE_FIELDS)
+            assert loaded.to_document(STATE_FIELDS) == twin.to_document(STATE_FIELDS)
+    assert game.replay_history() == twin.get_history()
+    return results
+
+
+def mean(values: List[float]) -> float:
+    return sum(values) / len(values)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Event-sourced games vs saving the state')
+    parser.add_argument('--games', type=int, default=50)
+    parser.add_argument('--intervals', type=int, nargs='+', default=[1, 5, 20, 100], help='Snapshot intervals (turns)')
+    args = parser.parse_args()
+
+    seeds = random.Random(7).sample(range(2 ** 32), args.games)
+    print(f"{'snapshot every':>15} {'state (bytes)':>14} {'events (bytes)':>15} {'max event (bytes)':>18} "
+          f"{'load (us)':>10} {'max load (us)':>14}")
+    for interval in args.intervals:
+        results = {'event_bytes': [], 'state_bytes': [], 'load_us': []}
+        for seed in seeds:
+            for key, values in play_game(seed, interval).items():
+                results[key].extend(values)
+        print(f"{interval:>15} {mean(results['state_bytes']):>14.0f} {mean(results['event_bytes']):>15.0f} "
+              f"{max(results['event_bytes']):>18} {mean(results['load_us']):>10.1f} {max(results['load_us']):>14.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Allocations and time spent by the work done on each GET /game/<id> request (without the database round-trip):
+rebuilding the InteractiveGame from the Mongo document and converting it back to a document
+
+Usage (from the backend folder):
+    python -m benchmarks.get_game_benchmark
+"""
+import gc
+import random
+import sys
+import timeit
+import tracemalloc
+from typing import Dict
+import numpy
+from App.models import InteractiveGame
+from App.util.constants import CARDS_TO_USE, NUM_RANKS, SUITS, SPECIAL_RANKS
+from App.util.helpers import get_closest_index_cards
+
+NUM_TURNS = [0, 5, 10]
+REPETITIONS = 5000
+
+
+def build_raw_game(num_turns: int, seed: int = 7) -> Dict:
+    """
+    Plays a game for some turns and returns the document that would be saved at the database
+    """
+    random.seed(seed)
+    numpy.random.seed(seed)
+    game = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Benchmark')
+    for _ in range(num_turns):
+        if game.get_winner(CARDS_TO_USE):
+            break
+        game.take_hand()
+        if game.get_winner(CARDS_TO_USE):
+            break
+        game.play_turn(get_closest_index_cards(game.get_hand_player(1, False), game.get_target_rank(), CARDS_TO_USE))
+    return game.to_document()
+
+
+def get_game(raw_game: Dict) -> Dict:
+    game = InteractiveGame.from_document(raw_game)
+    return {**game.to_document(), '_winner': game.get_winner(CARDS_TO_USE)}
+
+
+def main() -> None:
+    print(f"{'turns':>6} {'build (us)':>10} {'build (blocks)':>14} {'request (us)':>12} {'request peak KiB':>16}")
+    for num_turns in NUM_TURNS:
+        raw_game = build_raw_game(num_turns)
+        get_game(raw_game)
+
+        build_seconds = timeit.timeit(lambda: InteractiveGame.from_document(raw_game), number=REPETITIONS)
+        seconds = timeit.timeit(lambda: get_game(raw_game), number=REPETITIONS)
+
+        gc.collect()
+        blocks_before = sys.getallocatedblocks()
+        game = InteractiveGame.from_document(raw_game)
+        blocks = sys.getallocatedblocks() - blocks_before
+        del game
+
+        tracemalloc.start()
+        get_game(raw_game)
+        _, peak_request = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f'{raw_game["_num_turns"]:>6} {build_seconds / REPETITIONS * 1e6:>10.1f} {blocks:>14} '
+              f'{seconds / REPETITIONS * 1e6:>12.1f} '
+              f'{peak_request / 1024:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
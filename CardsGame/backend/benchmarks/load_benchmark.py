@@ -0,0 +1,204 @@
+"""
+Load test of the game API: concurrent simulated players create a game, take hands and play turns until someone wins,
+then list the games. Throughput and p50/p95/p99 latency per endpoint are printed and written to a JSON file, so
+regressions in the controllers, the server or the models show up as numbers
+
+Two transports:
+    test-client: the Flask app in this process (no HTTP), measures the application code
+    http: a Flask server started on a free local port (or --url), measures the whole request path
+
+The app uses a local storage stand-in (--storage memory by default, or sqlite), so no Mongo is needed; --storage
+mongo uses MONGO_STR_CONNECTION.
+
+Usage (from the backend folder):
+    python -m benchmarks.load_benchmark [--players 16] [--games 2] [--transports test-client http]
+                                        [--storage memory] [--output load_benchmark.json] [--url http://host:5050]
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import sys
+import threading
+import time
+import urllib.parse
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+import numpy
+from benchmarks.async_load_benchmark import get_free_port, start_server
+
+# (method, url, body) -> (status code, JSON body)
+Send = Callable[[str, str, Dict], Tuple[int, Dict]]
+PERCENTILES = [50, 95, 99]
+
+
+class LatencyRecorder:
+    """
+    Collects the latency and the status code of each request by endpoint, shared by the player threads
+    """
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.statuses: Dict[str, Counter] = defaultdict(Counter)
+
+    def wrap(self, send: Send) -> Callable[[str, str, str, Dict], Tuple[int, Dict]]:
+        def timed_send(endpoint: str, method: str, url: str, body: Dict = None) -> Tuple[int, Dict]:
+            start = time.perf_counter()
+            status, response = send(method, url, body)
+            elapsed = time.perf_counter() - start
+            with self.__lock:
+                self.latencies[endpoint].append(elapsed)
+                self.statuses[endpoint][status] += 1
+            return status, response
+
+        return timed_send
+
+    def report(self, elapsed: float) -> Dict:
+        endpoints = dict()
+        for endpoint, latencies in sorted(self.latencies.items()):
+            latencies_ms = numpy.array(latencies) * 1000
+            endpoints[endpoint] = {
+                'requests': len(latencies),
+                'throughput_rps': len(latencies) / elapsed,
+                'mean_ms': float(latencies_ms.mean()),
+                **{f'p{p}_ms': float(numpy.percentile(latencies_ms, p)) for p in PERCENTILES},
+                'statuses': {str(status): count for status, count in sorted(self.statuses[endpoint].items())}
+            }
+        all_latencies_ms = numpy.concatenate([latencies for latencies in self.latencies.values()]) * 1000
+        return {
+            'elapsed_seconds': elapsed,
+            'requests': len(all_latencies_ms),
+            'throughput_rps': len(all_latencies_ms) / elapsed,
+            **{f'p{p}_ms': float(numpy.percentile(all_latencies_ms, p)) for p in PERCENTILES},
+            'endpoints': endpoints
+        }
+
+
+def build_test_client() -> Callable[[], Send]:
+    from App import create_app
+    app = create_app()
+
+    def connect() -> Send:
+        client = app.test_client()
+
+        def send(method: str, url: str, body: Dict = None) -> Tuple[int, Dict]:
+            response = client.open(url, method=method, json=body)
+            return response.status_code, response.get_json()
+
+        return send
+
+    return connect
+
+
+def build_http_client(base_url: str) -> Callable[[], Send]:
+    url = urllib.parse.urlsplit(base_url)
+
+    def connect() -> Send:
+        # One keep-alive connection per player, like a browser tab
+        connection = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=60)
+
+        def send(method: str, path: str, body: Dict = None) -> Tuple[int, Dict]:
+            payload = None if body is None else json.dumps(body)
+            connection.request(method, path, payload, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            data = response.read()
+            return response.status, json.loads(data) if data else dict()
+
+        return send
+
+    return connect
+
+
+def play_session(connect: Callable[[], Send], recorder: LatencyRecorder, num_games: int) -> None:
+    """
+    Plays num_games complete games with one client, listing the games after each one. Like the frontend, a player
+    stops at the first error: the game is over once the last hand is drawn, so the last PUT of a game answers 400
+    """
+    send = recorder.wrap(connect())
+    for _ in range(num_games):
+        status, game = send('POST /game', 'POST', '/game', {'playerName': 'Load'})
+        if status != 201:
+            continue
+        url = f"/game/{game['_id']}/hand"
+        while True:
+            status, _ = send('GET /game/<id>/hand', 'GET', url)
+            if status != 200:
+                break
+            status, turn = send('PUT /game/<id>/hand', 'PUT', url, {'cardIndexes': [0, 1]})
+            if status != 200 or turn.get('_winner'):
+                break
+        send('GET /game', 'GET', '/game?onlyId=false&fields=summary&limit=20')
+        send('DELETE /game/<id>', 'DELETE', f"/game/{game['_id']}")
+
+
+def run(connect: Callable[[], Send], players: int, num_games: int) -> Dict:
+    recorder = LatencyRecorder()
+    # Warm up: first requests pay imports, connections and index creation
+    play_session(connect, LatencyRecorder(), 1)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=players) as executor:
+        list(executor.map(play_session, [connect] * players, [recorder] * players, [num_games] * players))
+    return recorder.report(time.perf_counter() - start)
+
+
+def print_report(transport: str, report: Dict) -> None:
+    print(f"\n{transport}: {report['requests']} requests in {report['elapsed_seconds']:.2f} s, "
+          f"{report['throughput_rps']:.1f} req/s")
+    print(f"{'endpoint':>20} {'requests':>9} {'req/s':>9} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9}  statuses")
+    for endpoint, stats in report['endpoints'].items():
+        print(f"{endpoint:>20} {stats['requests']:>9} {stats['throughput_rps']:>9.1f} {stats['p50_ms']:>9.2f} "
+              f"{stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}  {stats['statuses']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Load test of the game API')
+    parser.add_argument('--players', type=int, default=16, help='Concurrent simulated players')
+    parser.add_argument('--games', type=int, default=2, help='Games played by each player')
+    parser.add_argument('--transports', nargs='+', default=['test-client', 'http'], choices=['test-client', 'http'])
+    parser.add_argument('--storage', default='memory', choices=['memory', 'sqlite', 'mongo'])
+    parser.add_argument('--sqlite-path', default='load_benchmark.sqlite3')
+    parser.add_argument('--url', help='Base URL of a running server for the http transport (Default: start one)')
+    parser.add_argument('--output', default='load_benchmark.json')
+    args = parser.parse_args()
+
+    # Read by config when App is imported, here and in the server started for the http transport
+    os.environ['STORAGE_BACKEND'] = args.storage
+    os.environ['SQLITE_PATH'] = args.sqlite_path
+    results = {
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'storage': args.storage,
+        'players': args.players,
+        'games_per_player': args.games,
+        'transports': dict()
+    }
+    for transport in args.transports:
+        process = None
+        if transport == 'test-client':
+            connect = build_test_client()
+        elif args.url:
+            connect = build_http_client(args.url)
+        else:
+            port = get_free_port()
+            process = start_server('flask', port)
+            connect = build_http_client(f'http://127.0.0.1:{port}')
+        try:
+            results['transports'][transport] = run(connect, args.players, args.games)
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+        print_report(transport, results['transports'][transport])
+
+    with open(args.output, 'w') as output:
+        json.dump(results, output, indent=2)
+    print(f'\nResults written to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
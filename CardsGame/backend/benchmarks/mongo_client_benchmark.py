@@ -0,0 +1,61 @@
+"""
+Requests per second of find_one_by_id with a new MongoClient per call (previous MongoManager behaviour) vs the
+shared pooled client, using several threads like the Flask server does
+
+Needs a reachable mongod, e.g. a local one:
+    MONGO_STR_CONNECTION=mongodb://localhost:27017 python -m benchmarks.mongo_client_benchmark
+"""
+import argparse
+import time
+import pymongo
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from App.database import db
+from App.database.mongo_storage import MongoManager
+from App.database.server import GAME_COLLECTION
+from App.models import InteractiveGame
+from App.util.constants import NUM_RANKS, SUITS, SPECIAL_RANKS
+from config import MONGO_STR_CONNECTION, MONGO_DB_NAME
+
+
+def find_with_new_client(id_game: str) -> None:
+    client = pymongo.MongoClient(MONGO_STR_CONNECTION)
+    try:
+        client[MONGO_DB_NAME][GAME_COLLECTION].find_one({'_id': id_game})
+    finally:
+        client.close()
+
+
+def find_with_pooled_client(id_game: str) -> None:
+    db.find_one_by_id(id_game, GAME_COLLECTION)
+
+
+def measure(find: Callable[[str], None], id_game: str, num_requests: int, threads: int) -> float:
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(find, [id_game] * num_requests))
+    return num_requests / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    print(f'warm up ping: {MongoManager.warm_up() * 1000:.2f} ms')
+    game = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Benchmark')
+    db.add_one(game.to_document(), GAME_COLLECTION)
+    try:
+        new_client_rps = measure(find_with_new_client, game.get_id(), args.requests // 10, args.threads)
+        pooled_rps = measure(find_with_pooled_client, game.get_id(), args.requests, args.threads)
+    finally:
+        db.delete_one_by_id(game.get_id(), GAME_COLLECTION)
+    print(f'{"new client per call":>22}: {new_client_rps:10.1f} req/s')
+    print(f'{"pooled client":>22}: {pooled_rps:10.1f} req/s ({pooled_rps / new_client_rps:.1f}x)')
+    for stat, value in MongoManager.get_pool_stats().items():
+        print(f'{stat:>22}: {value:.2f}' if isinstance(value, float) else f'{stat:>22}: {value}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Greedy (get_closest_index_cards) vs exact (get_optimal_index_cards) PC card selection for growing hands, picking
+all the cards but one like the game does (CARDS_TO_USE = CARDS_BY_HAND - 1)
+
+Usage (from the backend folder):
+    python -m benchmarks.pc_solver_benchmark
+"""
+import random
+import timeit
+from typing import Callable, List, Tuple
+from App.models import Card
+from App.util.constants import NUM_RANKS
+from App.util.helpers import get_closest_index_cards, get_closest_subset_sum, get_optimal_index_cards
+
+HAND_SIZES = [3, 5, 10, 15, 20, 25, 30]
+NUM_HANDS = 200
+
+
+def build_hands(hand_size: int, seed: int = 3) -> List[Tuple[List[Card], int]]:
+    rng = random.Random(seed)
+    num_cards_to_use = hand_size - 1
+    return [([Card.of(rng.randint(1, NUM_RANKS), '♣') for _ in range(hand_size)],
+             rng.randint(0, NUM_RANKS * num_cards_to_use)) for _ in range(NUM_HANDS)]
+
+
+def run(solver: Callable, hands: List[Tuple[List[Card], int]]) -> Tuple[float, float]:
+    """
+    Returns the time per hand (us) and the average distance to the target
+    """
+    distances = []
+
+    def solve_all() -> None:
+        distances.clear()
+        for hand, target in hands:
+            indexes = solver(hand, target, len(hand) - 1)
+            distances.append(abs(target - sum(hand[idx].get_rank() for idx in indexes)))
+
+    seconds = timeit.timeit(solve_all, number=1)
+    return seconds / len(hands) * 1e6, sum(distances) / len(distances)
+
+
+def main() -> None:
+    print(f"{'hand':>5} {'greedy (us)':>12} {'greedy dist':>12} {'exact cold (us)':>16} {'exact warm (us)':>16} "
+          f"{'exact dist':>11}")
+    for hand_size in HAND_SIZES:
+        hands = build_hands(hand_size)
+        greedy_us, greedy_distance = run(get_closest_index_cards, hands)
+        get_closest_subset_sum.cache_clear()
+        cold_us, exact_distance = run(get_optimal_index_cards, hands)
+        warm_us, _ = run(get_optimal_index_cards, hands)
+        print(f'{hand_size:>5} {greedy_us:>12.1f} {greedy_distance:>12.2f} {cold_us:>16.1f} {warm_us:>16.1f} '
+              f'{exact_distance:>11.2f}')
+
+
+if __name__ == '__main__':
+    main()
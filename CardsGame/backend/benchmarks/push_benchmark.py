@@ -0,0 +1,161 @@
+"""
+Database reads caused by idle clients: spectators and lobby views polling GET /game/<id> and GET /game vs the same
+clients subscribed to GET /game/<id>/events and GET /lobby/events, while nobody plays. Then one turn is played and the
+time until every subscriber receives it is measured
+
+The Flask app is served on a local port by a threaded werkzeug server in this process, on a local storage stand-in
+(--storage memory by default, or sqlite). The reads are counted on the storage.
+
+Usage (from the backend folder):
+    python -m benchmarks.push_benchmark [--spectators 20] [--lobby 5] [--seconds 3] [--poll-interval 0.5]
+"""
+import argparse
+import http.client
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Callable, Dict, List, Tuple
+
+
+class ReadCounter:
+    """
+    Counts the find and find_one calls of a storage
+    """
+
+    def __init__(self, storage):
+        self.reads = 0
+        self.__lock = threading.Lock()
+        storage.find = self.__counted(storage.find)
+        storage.find_one = self.__counted(storage.find_one)
+
+    def __counted(self, method: Callable) -> Callable:
+        def counted(*args, **kwargs):
+            with self.__lock:
+                self.reads += 1
+            return method(*args, **kwargs)
+
+        return counted
+
+
+def send(port: int, method: str, url: str, body: Dict = None) -> Tuple[int, Dict]:
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request(method, url, None if body is None else json.dumps(body), {'Content-Type': 'application/json'})
+    response = connection.getresponse()
+    data = response.read()
+    connection.close()
+    return response.status, json.loads(data) if data else dict()
+
+
+def poll(port: int, url: str, interval: float, stop: threading.Event) -> None:
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    while not stop.is_set():
+        connection.request('GET', url)
+        connection.getresponse().read()
+        stop.wait(interval)
+    connection.close()
+
+
+class EventStream:
+    """
+    Server-Sent Events client, records when each event arrives
+    """
+
+    def __init__(self, port: int, url: str):
+        self.events: List[Tuple[float, str]] = []
+        self.__connection = http.client.HTTPConnection('127.0.0.1', port)
+        self.__connection.request('GET', url)
+        # The connection gives up its socket to the streamed response
+        self.__socket = self.__connection.sock
+        self.__response = self.__connection.getresponse()
+        self.__thread = threading.Thread(target=self.__read, daemon=True)
+        self.__thread.start()
+
+    def __read(self) -> None:
+        try:
+            while True:
+                line = self.__response.readline()
+                if not line:
+                    return
+                if line.startswith(b'event: '):
+                    self.events.append((time.perf_counter(), line[7:].strip().decode()))
+        except (OSError, ValueError, AttributeError):
+            return
+
+    def close(self) -> None:
+        self.__socket.shutdown(socket.SHUT_RDWR)
+        self.__socket.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Database reads of idle polling clients vs event stream subscribers')
+    parser.add_argument('--storage', default='memory', choices=['memory', 'sqlite'])
+    parser.add_argument('--sqlite-path', default='push_benchmark.sqlite3')
+    parser.add_argument('--spectators', type=int, default=20, help='Clients watching the game')
+    parser.add_argument('--lobby', type=int, default=5, help='Clients watching the games list')
+    parser.add_argument('--seconds', type=float, default=3.0, help='Idle time measured for each kind of client')
+    parser.add_argument('--poll-interval', type=float, default=0.5, help='Seconds between two polls of a client')
+    args = parser.parse_args()
+    # Read by config when App is imported
+    os.environ['STORAGE_BACKEND'] = args.storage
+    os.environ['SQLITE_PATH'] = args.sqlite_path
+    from werkzeug.serving import make_server
+    from App import create_app
+    from App.database import db
+    from App.util.broker import broker
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, create_app(), threaded=True)
+    port = server.server_port
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    counter = ReadCounter(db.get_storage())
+    _, body = send(port, 'POST', '/game', {'playerName': 'Benchmark'})
+    id_game = body['_id']
+    send(port, 'GET', f'/game/{id_game}/hand')
+
+    # Polling clients
+    stop = threading.Event()
+    urls = [f'/game/{id_game}'] * args.spectators + ['/game?onlyId=false&fields=summary&limit=20'] * args.lobby
+    pollers = [threading.Thread(target=poll, args=(port, url, args.poll_interval, stop)) for url in urls]
+    reads = counter.reads
+    for poller in pollers:
+        poller.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for poller in pollers:
+        poller.join()
+    poll_reads = counter.reads - reads
+
+    # Subscribed clients
+    reads = counter.reads
+    streams = [EventStream(port, f'/game/{id_game}/events') for _ in range(args.spectators)]
+    streams += [EventStream(port, '/lobby/events') for _ in range(args.lobby)]
+    connect_reads = counter.reads - reads
+    reads = counter.reads
+    time.sleep(args.seconds)
+    push_reads = counter.reads - reads
+    subscribers = broker.get_stats()['subscribers']
+    start = time.perf_counter()
+    send(port, 'PUT', f'/game/{id_game}/hand', {'cardIndexes': [0, 1]})
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not all(stream.events for stream in streams[:args.spectators]):
+        time.sleep(0.001)
+    delays = [(stream.events[0][0] - start) * 1000 for stream in streams[:args.spectators] if stream.events]
+    for stream in streams:
+        stream.close()
+    server.shutdown()
+
+    print(f'storage: {args.storage}, spectators: {args.spectators}, lobby: {args.lobby}, '
+          f'idle: {args.seconds:.1f} s, poll interval: {args.poll_interval:.2f} s')
+    print(f"{'clients':>10} {'db reads':>9} {'reads/s':>8}")
+    print(f"{'polling':>10} {poll_reads:>9} {poll_reads / args.seconds:>8.1f}")
+    print(f"{'push':>10} {push_reads:>9} {push_reads / args.seconds:>8.1f}")
+    print(f'push: {connect_reads} reads to open {len(streams)} streams ({subscribers} subscribers), turn received by '
+          f'{len(delays)}/{args.spectators} spectators, max {max(delays, default=float("nan")):.1f} ms after the PUT '
+          f'was sent')
+
+
+if __name__ == '__main__':
+    main()
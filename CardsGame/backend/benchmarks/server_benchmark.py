@@ -0,0 +1,98 @@
+"""
+Startup time and throughput of the development server (python interactive_game.py, werkzeug with the reloader) vs
+gunicorn with gunicorn.conf.py (preloaded app, forked gthread workers)
+
+The startup time is measured from the process start until GET /health answers 200. The throughput is measured with
+the players of benchmarks.async_load_benchmark. Both servers use a new SQLite file (the memory storage is not shared by
+the gunicorn workers).
+
+Usage (from the backend folder):
+    python -m benchmarks.server_benchmark [--clients 1 8 32] [--requests 40] [--workers 2] [--threads 8]
+"""
+import argparse
+import http.client
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from benchmarks.async_load_benchmark import get_free_port, measure, play
+
+SERVERS: Dict[str, List[str]] = {
+    'dev': [sys.executable, 'interactive_game.py'],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app']
+}
+
+
+def start_server(name: str, port: int, env: Dict[str, str]) -> subprocess.Popen:
+    # New session: the reloader of the dev server and the gunicorn workers are stopped with their parent
+    return subprocess.Popen(SERVERS[name], env={**os.environ, **env, 'BACKEND_PORT': str(port)},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def wait_healthy(port: int, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(0.02)
+    raise Exception(f"The server didn't answer on port {port}")
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    os.killpg(process.pid, signal.SIGTERM)
+    process.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Development server vs gunicorn')
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--requests', type=int, default=40, help='Requests sent by each player')
+    parser.add_argument('--workers', type=int, default=None, help='Gunicorn workers (Default: gunicorn.conf.py)')
+    parser.add_argument('--threads', type=int, default=None, help='Threads by worker (Default: gunicorn.conf.py)')
+    parser.add_argument('--startups', type=int, default=3, help='Times each server is started to time the startup')
+    args = parser.parse_args()
+
+    env = {'STORAGE_BACKEND': 'sqlite', 'GUNICORN_ACCESS_LOG': ''}
+    if args.workers is not None:
+        env['GUNICORN_WORKERS'] = str(args.workers)
+    if args.threads is not None:
+        env['GUNICORN_THREADS'] = str(args.threads)
+    print(f"cpus: {os.cpu_count()}, gunicorn workers: {args.workers or 'default'}, "
+          f"threads: {args.threads or 'default'}")
+    print(f"{'server':>9} {'startup (ms)':>13} {'clients':>8} {'req/s':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    with tempfile.TemporaryDirectory() as directory:
+        for name in SERVERS:
+            env['SQLITE_PATH'] = os.path.join(directory, f'{name}.sqlite3')
+            startups = []
+            for _ in range(args.startups):
+                port = get_free_port()
+                start = time.perf_counter()
+                process = start_server(name, port, env)
+                try:
+                    wait_healthy(port)
+                    startups.append((time.perf_counter() - start) * 1000)
+                finally:
+                    stop_server(process)
+            port = get_free_port()
+            process = start_server(name, port, env)
+            try:
+                wait_healthy(port)
+                play(port, 10)
+                for clients in args.clients:
+                    stats = measure(port, clients, args.requests)
+                    print(f"{name:>9} {min(startups):>13.0f} {clients:>8} {stats['rps']:>9.1f} "
+                          f"{stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+            finally:
+                stop_server(process)
+
+
+if __name__ == '__main__':
+    main()
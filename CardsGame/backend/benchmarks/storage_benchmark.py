@@ -0,0 +1,86 @@
+"""
+Per-request latency of the API on each storage backend (memory, sqlite, mongo). Every simulated request goes through
+the Flask app (test client, no HTTP) with the game cache disabled, so each one pays its storage round trips
+
+mongo is skipped when no mongod is reachable, e.g. use a local one with:
+    MONGO_STR_CONNECTION=mongodb://localhost:27017 python -m benchmarks.storage_benchmark
+
+Usage (from the backend folder):
+    python -m benchmarks.storage_benchmark [--games 20] [--backends memory sqlite mongo] [--sqlite-path bench.sqlite3]
+"""
+import argparse
+import os
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+os.environ['GAME_CACHE_MAX_ENTRIES'] = '0'
+os.environ.setdefault('STORAGE_BACKEND', 'memory')
+os.environ.setdefault('MONGO_SERVER_SELECTION_TIMEOUT_MS', '2000')
+
+import numpy  # noqa: E402
+from App import create_app  # noqa: E402
+from App.database import db, server  # noqa: E402
+from App.database.sqlite_storage import SQLiteStorage  # noqa: E402
+
+
+def play_games(app, num_games: int) -> Dict[str, List[float]]:
+    """
+    Creates and plays num_games games, returns the latency of each request by route
+    """
+    client = app.test_client()
+    latencies = defaultdict(list)
+
+    def send(route: str, method: str, url: str, body: Dict = None):
+        start = time.perf_counter()
+        response = client.open(url, method=method, json=body)
+        latencies[route].append(time.perf_counter() - start)
+        return response
+
+    for _ in range(num_games):
+        id_game = send('POST /game', 'POST', '/game', {'playerName': 'Bench'}).get_json()['_id']
+        url = f'/game/{id_game}/hand'
+        while send('GET /game/<id>/hand', 'GET', url).status_code == 200:
+            turn = send('PUT /game/<id>/hand', 'PUT', url, {'cardIndexes': [0, 1]})
+            if turn.status_code != 200 or turn.get_json().get('_winner'):
+                break
+        send('GET /game/<id>', 'GET', f'/game/{id_game}')
+        send('GET /game', 'GET', '/game?onlyId=false&fields=summary&limit=20')
+        send('DELETE /game/<id>', 'DELETE', f'/game/{id_game}')
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='API latency by storage backend')
+    parser.add_argument('--games', type=int, default=20)
+    parser.add_argument('--backends', nargs='+', default=['memory', 'sqlite', 'mongo'])
+    parser.add_argument('--sqlite-path', default='storage_benchmark.sqlite3')
+    args = parser.parse_args()
+
+    app = create_app()
+    print(f"{'storage':>8} {'route':>20} {'requests':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for backend in args.backends:
+        storage = SQLiteStorage(args.sqlite_path) if backend == 'sqlite' else db.create_storage(backend)
+        db.set_storage(storage)
+        try:
+            storage.ping()
+            server.ensure_indexes()
+        except Exception as e:
+            print(f'{backend:>8} skipped: {e}')
+            continue
+        try:
+            latencies = play_games(app, args.games)
+        finally:
+            storage.reset()
+            if backend == 'sqlite':
+                for suffix in ['', '-wal', '-shm']:
+                    if os.path.exists(args.sqlite_path + suffix):
+                        os.remove(args.sqlite_path + suffix)
+        for route, values in latencies.items():
+            values = numpy.array(values) * 1000
+            print(f'{backend:>8} {route:>20} {len(values):>9} {numpy.percentile(values, 50):>9.3f} '
+                  f'{numpy.percentile(values, 99):>9.3f}')
+
+
+if __name__ == '__main__':
+    main()
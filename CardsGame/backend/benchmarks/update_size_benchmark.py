@@ -0,0 +1,74 @@
+"""
+BSON bytes sent to Mongo on each turn: rewriting every field of FIELDS_TO_UPDATE vs the tracked changes (delta),
+plus the new turn documents appended to the history collection
+
+When mongomock is installed both kinds of updates are also applied to an in-memory collection to check they leave
+the same document.
+
+Usage (from the backend folder):
+    python -m benchmarks.update_size_benchmark
+"""
+import random
+import bson
+import numpy
+from App.database import server
+from App.models import InteractiveGame
+from App.util.constants import CARDS_TO_USE, NUM_RANKS, SUITS, SPECIAL_RANKS
+from App.util.helpers import get_closest_index_cards
+from benchmarks.codec_benchmark import build_long_game
+
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+
+FULL_UPDATE_FIELDS = [*server.FIELDS_TO_UPDATE, *server.STATUS_FIELDS]
+
+
+def full_update_size(game: InteractiveGame) -> int:
+    return len(bson.encode({'$set': game.to_document(FULL_UPDATE_FIELDS)}))
+
+
+def main(seed: int = 5) -> None:
+    random.seed(seed)
+    numpy.random.seed(seed)
+    game = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Benchmark')
+    full_collection = delta_collection = None
+    if mongomock is not None:
+        client = mongomock.MongoClient()
+        full_collection = client.db.full
+        delta_collection = client.db.delta
+        full_collection.insert_one(game.to_document())
+        delta_collection.insert_one(game.to_document())
+    game.clear_changes()
+
+    print(f"{'turn':>5} {'action':>7} {'full (bytes)':>13} {'delta (bytes)':>14} {'history (bytes)':>16}")
+    while not game.get_winner(CARDS_TO_USE):
+        for action in ['hand', 'play']:
+            if action == 'hand':
+                game.take_hand()
+            elif game.get_winner(CARDS_TO_USE):
+                break
+            else:
+                game.play_turn(get_closest_index_cards(game.get_hand_player(1, False), game.get_target_rank(),
+                                                       CARDS_TO_USE))
+            full = game.to_document(FULL_UPDATE_FIELDS)
+            operators = server.build_update_operators(game)
+            _, new_turns = server.build_history_writes(game)
+            history_size = sum(len(bson.encode(turn_document)) for turn_document in new_turns)
+            print(f'{game.get_num_turns():>5} {action:>7} {full_update_size(game):>13} '
+                  f'{len(bson.encode(operators)):>14} {history_size:>16}')
+            if mongomock is not None:
+                full_collection.update_one({'_id': game.get_id()}, {'$set': full})
+                delta_collection.update_one({'_id': game.get_id()}, operators)
+                assert full_collection.find_one() == delta_collection.find_one()
+            game.clear_changes()
+
+    long_game = build_long_game()
+    print(f'Rewriting the fields of a game with a {len(long_game.get_history()) - 1} turns history: '
+          f'{full_update_size(long_game)} bytes per update')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+Payload bytes and serialization time of the game responses: Flask's jsonify of the verbose bodies (before) vs the
+negotiated formats of App.controllers.wire_formats (verbose JSON, compact JSON, MessagePack when msgpack is installed)
+and a sparse fieldset of GET /game/<id>
+
+The bodies are built from a game played until it ends, the hand and turn responses are averaged over its turns.
+
+Usage (from the backend folder):
+    python -m benchmarks.wire_format_benchmark [--repetitions 2000]
+"""
+import argparse
+import random
+import timeit
+from typing import Callable, Dict, List, Tuple
+import numpy
+from flask import Flask
+from App.controllers.game_responses import GAME_FIELDS, SUMMARY, build_game_response, build_hand_response
+from App.controllers.game_responses import build_play_response, parse_fields
+from App.controllers.wire_formats import COMPACT_JSON_FORMAT, JSON_FORMAT, MSGPACK_FORMAT, Representation
+from App.controllers.wire_formats import encode_body, msgpack, orjson
+from App.models import InteractiveGame
+from App.util.constants import CARDS_TO_USE, NUM_RANKS, SUITS, SPECIAL_RANKS
+from App.util.helpers import get_closest_index_cards
+
+
+def play_game(seed: int, representations: List[Representation]) -> Tuple[InteractiveGame, Dict, Dict]:
+    """
+    Plays a game until it ends, building the hand and turn responses of every turn in each representation
+    """
+    random.seed(seed)
+    numpy.random.seed(seed)
+    game = InteractiveGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Benchmark')
+    hands = {representation: [] for representation in representations}
+    turns = {representation: [] for representation in representations}
+    while not game.get_winner(CARDS_TO_USE):
+        game.take_hand()
+        for representation in representations:
+            hands[representation].append(build_hand_response(game, representation))
+        if game.get_winner(CARDS_TO_USE):
+            break
+        hand_p1, hand_p2 = game.get_hand_player(1, False), game.get_hand_player(2, False)
+        idx_hand_p1 = get_closest_index_cards(hand_p1, game.get_target_rank(), CARDS_TO_USE)
+        turn_winner, idx_hand_p2 = game.play_turn(idx_hand_p1)
+        for representation in representations:
+            turns[representation].append(build_play_response(game, hand_p1, hand_p2, idx_hand_p1, idx_hand_p2,
+                                                             turn_winner, representation))
+    return game, hands, turns
+
+
+def measure(bodies: List[Dict], encode: Callable[[Dict], bytes], repetitions: int) -> Tuple[float, float]:
+    """
+    Mean bytes and mean encoding time (us) of a list of bodies
+    """
+    size = sum(len(encode(body)) for body in bodies) / len(bodies)
+    number = max(1, repetitions // len(bodies))
+    elapsed = timeit.timeit(lambda: [encode(body) for body in bodies], number=number)
+    return size, elapsed / (number * len(bodies)) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Payload bytes and serialization time of the game responses')
+    parser.add_argument('--seed', type=int, default=3)
+    parser.add_argument('--repetitions', type=int, default=2000)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    formats = [JSON_FORMAT, COMPACT_JSON_FORMAT, *([MSGPACK_FORMAT] if msgpack is not None else [])]
+    representations = [Representation(wire_format, None) for wire_format in formats]
+    game, hands, turns = play_game(args.seed, representations)
+    summary = Representation(JSON_FORMAT, parse_fields(SUMMARY, GAME_FIELDS))
+    endpoints: Dict[str, Callable[[Representation], List[Dict]]] = {
+        'GET /game/<id>/hand': lambda representation: hands[representation],
+        'PUT /game/<id>/hand': lambda representation: turns[representation],
+        'GET /game/<id>': lambda representation: [build_game_response(game, representation)]
+    }
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}, msgpack: {msgpack is not None}, "
+          f'game turns: {game.get_num_turns()}')
+    print(f"{'endpoint':>20} {'format':>20} {'bytes':>8} {'encode (us)':>12}")
+    with app.app_context():
+        for endpoint, get_bodies in endpoints.items():
+            # jsonify encodes the verbose bodies with Flask's JSON provider
+            size, elapsed = measure(get_bodies(representations[0]), lambda body: app.json.dumps(body).encode(),
+                                    args.repetitions)
+            print(f"{endpoint:>20} {'jsonify (before)':>20} {size:>8.0f} {elapsed:>12.1f}")
+            for representation in [*representations, *([summary] if endpoint == 'GET /game/<id>' else [])]:
+                size, elapsed = measure(get_bodies(representation),
+                                        lambda body: encode_body(body, representation), args.repetitions)
+                name = representation.wire_format.name + (', fields=summary' if representation.fields else '')
+                print(f'{endpoint:>20} {name:>20} {size:>8.0f} {elapsed:>12.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1 +1,21 @@
 from .mongo import MONGO_STR_CONNECTION, MONGO_DB_NAME
+from .mongo import MONGO_MAX_POOL_SIZE, MONGO_MIN_POOL_SIZE, MONGO_WAIT_QUEUE_TIMEOUT_MS
+from .mongo import MONGO_SERVER_SELECTION_TIMEOUT_MS
+from .cache import GAME_CACHE_MAX_ENTRIES, GAME_CACHE_TTL_SECONDS, GAME_CACHE_MAX_BYTES, GAME_CACHE_VERIFY_VERSION
+from .cache import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES
+from .storage import STORAGE_BACKEND, SQLITE_PATH, SQLITE_BUSY_TIMEOUT_MS
+from .game import GAME_EVENT_SOURCING, GAME_SNAPSHOT_INTERVAL
+from .broker import BROKER_FANOUT, BROKER_SQLITE_PATH, BROKER_POLL_SECONDS, BROKER_MAX_QUEUED_EVENTS
+from .broker import BROKER_KEEPALIVE_SECONDS, BROKER_MAX_STREAMS
+from .archive import GAME_ARCHIVE_AFTER_SECONDS, GAME_RETENTION_SECONDS, GAME_ARCHIVE_BATCH_SIZE
+from .archive import GAME_ARCHIVE_INTERVAL_SECONDS
+
+__all__ = [
+    'MONGO_STR_CONNECTION', 'MONGO_DB_NAME', 'MONGO_MAX_POOL_SIZE', 'MONGO_MIN_POOL_SIZE',
+    'MONGO_WAIT_QUEUE_TIMEOUT_MS', 'MONGO_SERVER_SELECTION_TIMEOUT_MS', 'GAME_CACHE_MAX_ENTRIES',
+    'GAME_CACHE_TTL_SECONDS', 'GAME_CACHE_MAX_BYTES', 'GAME_CACHE_VERIFY_VERSION', 'RESPONSE_CACHE_MAX_ENTRIES',
+    'RESPONSE_CACHE_MAX_BYTES', 'STORAGE_BACKEND', 'SQLITE_PATH', 'SQLITE_BUSY_TIMEOUT_MS', 'GAME_EVENT_SOURCING',
+    'GAME_SNAPSHOT_INTERVAL', 'BROKER_FANOUT', 'BROKER_SQLITE_PATH', 'BROKER_POLL_SECONDS', 'BROKER_MAX_QUEUED_EVENTS',
+    'BROKER_KEEPALIVE_SECONDS', 'BROKER_MAX_STREAMS', 'GAME_ARCHIVE_AFTER_SECONDS', 'GAME_RETENTION_SECONDS',
+    'GAME_ARCHIVE_BATCH_SIZE', 'GAME_ARCHIVE_INTERVAL_SECONDS'
+]
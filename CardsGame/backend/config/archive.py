@@ -0,0 +1,12 @@
+import os
+
+# Background sweep of the Game collection (App.database.archiver), run by every worker. Finished games without
+# activity for GAME_ARCHIVE_AFTER_SECONDS are moved to the GameArchive collection with their history, unfinished games
+# without activity for GAME_RETENTION_SECONDS are deleted as abandoned. 0 disables each policy, the archival is
+# disabled by default (e.g. 86400 to archive the games finished for a day, they are still read from GameArchive)
+GAME_ARCHIVE_AFTER_SECONDS = float(os.environ.get('GAME_ARCHIVE_AFTER_SECONDS', 0))
+GAME_RETENTION_SECONDS = float(os.environ.get('GAME_RETENTION_SECONDS', 7 * 24 * 60 * 60))
+# Games moved or deleted by batch, each batch is a few bulk reads and writes
+GAME_ARCHIVE_BATCH_SIZE = int(os.environ.get('GAME_ARCHIVE_BATCH_SIZE', 500))
+# Seconds between two sweeps, 0 disables the background thread (e.g. to run archive_games.py from cron instead)
+GAME_ARCHIVE_INTERVAL_SECONDS = float(os.environ.get('GAME_ARCHIVE_INTERVAL_SECONDS', 600))
@@ -0,0 +1,16 @@
+import os
+
+# Publish/subscribe of the game events pushed to the clients (App.util.broker). The fan-out sends the events of a
+# worker to the other workers: 'local' (a single worker, nothing to send) or 'sqlite' (the workers of one host share a
+# SQLite table, a stand-in for a message bus)
+BROKER_FANOUT = os.environ.get('BROKER_FANOUT', 'local').lower()
+BROKER_SQLITE_PATH = os.environ.get('BROKER_SQLITE_PATH', 'cards_game_events.sqlite3')
+# Seconds between two reads of the events published by the other workers
+BROKER_POLL_SECONDS = float(os.environ.get('BROKER_POLL_SECONDS', 0.05))
+# Events kept for a subscriber that doesn't keep up, the oldest are dropped
+BROKER_MAX_QUEUED_EVENTS = int(os.environ.get('BROKER_MAX_QUEUED_EVENTS', 100))
+# Seconds between the comments sent to idle event streams, so proxies keep them open and closed clients are detected
+BROKER_KEEPALIVE_SECONDS = float(os.environ.get('BROKER_KEEPALIVE_SECONDS', 15))
+# Event streams open at the same time in a worker, the next clients get a 503. Every stream holds a thread of a WSGI
+# worker, gunicorn.conf.py adds these threads to the ones serving the API
+BROKER_MAX_STREAMS = int(os.environ.get('BROKER_MAX_STREAMS', 32))
@@ -0,0 +1,11 @@
+import os
+
+# In-process cache of the games served by this worker (App.database.game_cache)
+GAME_CACHE_MAX_ENTRIES = int(os.environ.get('GAME_CACHE_MAX_ENTRIES', 1024))
+GAME_CACHE_TTL_SECONDS = float(os.environ.get('GAME_CACHE_TTL_SECONDS', 300))
+GAME_CACHE_MAX_BYTES = int(os.environ.get('GAME_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# Checks the cached version against the database before serving a cached game, needed with several workers
+GAME_CACHE_VERIFY_VERSION = os.environ.get('GAME_CACHE_VERIFY_VERSION', 'true').lower() in ['true', '1', 'yes']
+# Rendered GET /game/<id> responses of this worker (App.database.response_cache), one by game and version
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', 256))
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', 16 * 1024 * 1024))
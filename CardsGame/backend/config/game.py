@@ -0,0 +1,5 @@
+import os
+# New games are event-sourced (App.models.interactive_game): a seed plus one small event by action is saved instead of
+# the whole state, which is saved as a snapshot every GAME_SNAPSHOT_INTERVAL turns and when the game is over
+GAME_EVENT_SOURCING = os.environ.get('GAME_EVENT_SOURCING', 'false').lower() in ['true', '1', 'yes']
+GAME_SNAPSHOT_INTERVAL = int(os.environ.get('GAME_SNAPSHOT_INTERVAL', 20))
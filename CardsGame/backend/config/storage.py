@@ -0,0 +1,8 @@
+import os
+
+# Storage of the games (App.database.storage): 'mongo', 'memory' (single process, for development and benchmarks) or
+# 'sqlite' (embedded, one file shared by the workers of a host)
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo').lower()
+SQLITE_PATH = os.environ.get('SQLITE_PATH', 'cards_game.sqlite3')
+# Milliseconds a SQLite writer waits for the lock held by another connection
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
@@ -1,7 +1,26 @@
+import argparse
+import time
+import numpy
 from App.models import ClassicGame
+from App.models.classic_simulator import ClassicGameSimulator
+from App.models.events import TerminalEventSink
 from App.util.constants import NUM_RANKS, SUITS, SPECIAL_RANKS
 
+parser = argparse.ArgumentParser(description='Classic cards game on the terminal')
+parser.add_argument('--simulate', type=int, metavar='N', help='Plays N headless games and reports statistics')
+parser.add_argument('--seed', type=int, default=0, help='First seed used by --simulate')
+args = parser.parse_args()
+
 # %% MAIN
-game = ClassicGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Luis', 'Victor')
-game.print_decks()
-game.play_classic_game_on_terminal()
+if args.simulate is not None:
+    simulator = ClassicGameSimulator(NUM_RANKS, SUITS)
+    start = time.perf_counter()
+    result = simulator.simulate(numpy.arange(args.seed, args.seed + args.simulate))
+    elapsed = time.perf_counter() - start
+    for stat, value in simulator.summarize(result).items():
+        print(f'{stat:>18}: {value:.4f}' if isinstance(value, float) else f'{stat:>18}: {value}')
+    print(f"{'seconds':>18}: {elapsed:.2f}")
+else:
+    game = ClassicGame(NUM_RANKS, SUITS, SPECIAL_RANKS, 'Luis', 'Victor', event_sink=TerminalEventSink())
+    game.print_decks()
+    game.play_classic_game_on_terminal()
@@ -0,0 +1,52 @@
+import multiprocessing
+import os
+from config import BROKER_MAX_STREAMS
+
+# Production server of the Flask app: gunicorn -c gunicorn.conf.py wsgi:app
+# The settings can be overridden with environment variables, e.g. GUNICORN_WORKERS=4
+
+bind = f"0.0.0.0:{os.environ.get('BACKEND_PORT', 5050)}"
+# A worker process per core plus one to cover the time spent waiting for the database. A few threads by worker overlap
+# the database round trips, more only contend for the GIL (see benchmarks/server_benchmark.py). Every open event
+# stream (GET /game/<id>/events, GET /lobby/events) holds a thread until the client leaves, so each worker gets
+# BROKER_MAX_STREAMS threads more than GUNICORN_THREADS and refuses the streams beyond that (503): the streams never
+# take the threads of the game requests. The idle streams wait on a condition and don't hold the GIL. For many more
+# spectators, route the /events paths to the asyncio app (mongo storage), which serves them without threads
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 4)) + BROKER_MAX_STREAMS
+# Imports the modules and creates the app (ensure_indexes included) once in the master, the workers are forked from
+# it and only open their connections, see post_fork
+preload_app = True
+# Event streams send a keepalive comment every BROKER_KEEPALIVE_SECONDS, idle HTTP connections are closed sooner
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+# Seconds the workers have to finish their requests on a graceful stop or reload (SIGHUP, SIGTERM)
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+# Workers are replaced after this many requests (plus a jitter, so they don't restart together), 0 disables it
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 1000))
+# The heartbeat files of the workers, on a RAM disk when there is one (/tmp is often a container overlay)
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+# '-' logs the requests to stdout, an empty value disables the access log
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-') or None
+errorlog = '-'
+
+
+def on_starting(server) -> None:
+    # The memory storage lives in each process, the workers wouldn't see the games of each other
+    from config import STORAGE_BACKEND
+    if STORAGE_BACKEND == 'memory' and server.cfg.workers > 1:
+        raise Exception('The memory storage needs a single worker, set GUNICORN_WORKERS=1 or use another storage')
+
+
+def post_fork(server, worker) -> None:
+    # The Mongo client and the SQLite connections of the master must not be used by the children
+    from App import init_worker
+    init_worker()
+
+
+def on_reload(server) -> None:
+    # SIGHUP starts new workers with the new configuration, but with preload_app they are forked from the code the
+    # master loaded: deploying new code needs a restart or a binary upgrade (SIGUSR2, then SIGQUIT to the old master)
+    server.log.info('Reloading the workers, the app code loaded by the master is kept (preload_app)')
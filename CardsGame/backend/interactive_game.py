@@ -1,8 +1,16 @@
-from App import create_app
+import os
+from App import create_app, create_async_app
 
-PORT = 5050
+PORT = int(os.environ.get('BACKEND_PORT', 5050))
 HOST = "0.0.0.0"
-app = create_app()
+# 'flask' (WSGI, default) or 'async' (ASGI, Quart + motor), e.g. GAME_SERVER=async python interactive_game.py
+SERVER_FLASK = 'flask'
+SERVER_ASYNC = 'async'
+SERVER = os.environ.get('GAME_SERVER', SERVER_FLASK)
+if SERVER not in [SERVER_FLASK, SERVER_ASYNC]:
+    raise Exception(f"Invalid GAME_SERVER '{SERVER}'. Valid options: {[SERVER_FLASK, SERVER_ASYNC]}")
+app = create_async_app() if SERVER == SERVER_ASYNC else create_app()
 
 if __name__ == '__main__':
+    # Development server with the reloader, production runs gunicorn -c gunicorn.conf.py wsgi:app
     app.run(debug=True, port=PORT, host=HOST)
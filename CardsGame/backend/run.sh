@@ -3,7 +3,8 @@ APP_DIR='cards-game-backend'
 GIT_REVISION='release'
 BACKEND_PORT=5050
 
-docker stop ${APP_DIR}-${GIT_REVISION}
+# Leaves the workers time to finish their requests (GUNICORN_GRACEFUL_TIMEOUT)
+docker stop -t 35 ${APP_DIR}-${GIT_REVISION}
 docker rm ${APP_DIR}-${GIT_REVISION}
 
 docker run -dit \
@@ -0,0 +1,21 @@
+import argparse
+import time
+from App.models.strategy import STRATEGIES
+from App.models.tournament import Tournament
+
+parser = argparse.ArgumentParser(description='Plays InteractiveGame strategies against each other')
+parser.add_argument('--games', type=int, default=1000, help='Games played by each matchup')
+parser.add_argument('--seed', type=int, default=0, help='Seed of the first game')
+parser.add_argument('--workers', type=int, default=None, help='Worker processes (Default: number of CPUs)')
+parser.add_argument('--strategies', nargs='+', default=list(STRATEGIES), choices=list(STRATEGIES),
+                    help='Strategies to compare in a round robin')
+args = parser.parse_args()
+
+# %% MAIN
+if __name__ == '__main__':
+    tournament = Tournament(args.games, base_seed=args.seed, workers=args.workers)
+    start = time.perf_counter()
+    results = tournament.round_robin([STRATEGIES[name]() for name in args.strategies])
+    elapsed = time.perf_counter() - start
+    print(Tournament.format_table(results))
+    print(f'{len(results) * args.games} games in {elapsed:.2f}s with {tournament.workers} workers')
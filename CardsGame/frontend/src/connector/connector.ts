@@ -42,7 +42,7 @@ export class BackendConnector {
   async getGames(finished: boolean): Promise<Game[]> {
     try {
       const ONLY_ID = false;
-      const url = `${BACKEND_URL}/game?finished=${finished}&onlyId=${ONLY_ID}`;
+      const url = `${BACKEND_URL}/game?finished=${finished}&onlyId=${ONLY_ID}&fields=summary`;
       const response = await axios.get(url);
       const games: Game[] = response.data;
       return games;